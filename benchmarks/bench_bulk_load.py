@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark COPY vs to_sql(method='multi') loading into raw_data.historical_data
+
+Usage:
+    python benchmarks/bench_bulk_load.py --rows 100000
+
+Each method loads the same synthetic rows into a scratch copy of the raw
+table (created with LIKE ... INCLUDING ALL and dropped afterwards), so the
+real table is never touched.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.bulk_loader import RAW_TABLE_COLUMNS
+from src.utils.db_connection import DatabaseConnection
+
+SCRATCH_TABLE = 'raw_data.bench_historical_data'
+
+
+def make_rows(rows: int, coins: int = 250) -> pd.DataFrame:
+    """Build synthetic hourly history rows for ``coins`` coins"""
+    rng = np.random.default_rng(42)
+    per_coin = max(1, rows // coins)
+    coin_ids = np.repeat([f'coin-{i}' for i in range(coins)], per_coin)[:rows]
+    start = np.datetime64('2024-01-01T00:00:00')
+    hours = np.tile(np.arange(per_coin), coins)[:rows]
+
+    return pd.DataFrame({
+        'coin_id': coin_ids,
+        'timestamp': start + hours.astype('timedelta64[h]'),
+        'price': rng.lognormal(3, 2, len(coin_ids)),
+        'market_cap': rng.integers(1e6, 1e12, len(coin_ids)).astype('float64'),
+        'volume': rng.integers(1e3, 1e10, len(coin_ids)).astype('float64'),
+        'extracted_at': datetime.utcnow().isoformat(),
+    })
+
+
+def execute(db: DatabaseConnection, statement: str) -> None:
+    """Run a DDL/DML statement in its own transaction"""
+    with db.engine.begin() as conn:
+        conn.execute(text(statement))
+
+
+def run(db: DatabaseConnection, df: pd.DataFrame, method: str) -> float:
+    """Load ``df`` into the scratch table and return rows per second"""
+    execute(db, f"TRUNCATE TABLE {SCRATCH_TABLE}")
+    started = time.perf_counter()
+    loaded = db._load_dataframe(df, SCRATCH_TABLE, method=method)
+    elapsed = time.perf_counter() - started
+    return loaded / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=100000, help='Synthetic rows to load per method')
+    args = parser.parse_args()
+
+    db = DatabaseConnection()
+    if not db.test_connection():
+        print("❌ Database connection failed. Please check your setup.")
+        return 1
+
+    RAW_TABLE_COLUMNS[SCRATCH_TABLE] = RAW_TABLE_COLUMNS['raw_data.historical_data']
+    execute(db, f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+    execute(db, f"CREATE TABLE {SCRATCH_TABLE} (LIKE raw_data.historical_data INCLUDING ALL)")
+
+    try:
+        df = make_rows(args.rows)
+        print(f"Loading {len(df):,} rows into {SCRATCH_TABLE}")
+
+        results = {method: run(db, df, method) for method in ('insert', 'copy')}
+        for method, rows_per_second in results.items():
+            print(f"   {method:>6}: {rows_per_second:>12,.0f} rows/s")
+        print(f"   speedup: {results['copy'] / results['insert']:.1f}x")
+    finally:
+        execute(db, f"DROP TABLE IF EXISTS {SCRATCH_TABLE}")
+        db.close_connection()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Guard the cold-start latency of src/cli.py
+
+Usage:
+    python benchmarks/bench_cli_startup.py
+    python benchmarks/bench_cli_startup.py --runs 20 --max-ms 250
+
+Starts fresh interpreters running ``src/cli.py --help`` (and each
+subcommand's --help) and reports the median and p90 wall time next to a
+bare interpreter and an eager import of the ETL modules. Fails if startup
+imports a heavy module (checked with ``-X importtime``) or the median is
+above --max-ms.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join('src', 'cli.py')
+
+# Modules that must only be imported inside a subcommand
+HEAVY_MODULES = ('pandas', 'numpy', 'sqlalchemy', 'requests', 'pyarrow', 'psycopg2')
+
+EAGER_IMPORTS = (
+    "import sys; sys.path.append('.'); "
+    "import src.utils.db_connection, src.extractors.coingecko_extractor, src.pipeline.jobs"
+)
+
+
+def time_command(command: list, runs: int) -> list:
+    """Wall time in milliseconds of ``runs`` fresh runs of ``command``"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def imported_modules(command: list) -> set:
+    """Top-level packages imported by ``command``, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *command], cwd=REPO_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.rsplit('|', 1)[1].strip().split('.')[0])
+    return modules
+
+
+def summarize(timings: list) -> str:
+    p90 = statistics.quantiles(timings, n=10)[-1] if len(timings) > 1 else timings[0]
+    return f"median {statistics.median(timings):7.1f} ms   p90 {p90:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters per command')
+    parser.add_argument('--max-ms', type=float, default=300.0, help='Fail if the --help median exceeds this')
+    args = parser.parse_args()
+
+    commands = {
+        'python (bare)': [sys.executable, '-c', 'pass'],
+        'cli --help': [sys.executable, CLI, '--help'],
+        **{f'cli {name} --help': [sys.executable, CLI, name, '--help']
+           for name in ('extract-markets', 'extract-history', 'extract-global', 'extract-rates', 'prices',
+                        'refresh-metrics', 'backfill', 'schedule', 'status')},
+        'eager imports': [sys.executable, '-c', EAGER_IMPORTS],
+    }
+
+    results = {}
+    for label, command in commands.items():
+        results[label] = time_command(command, args.runs)
+        print(f"   {label:<32} {summarize(results[label])}")
+
+    failed = False
+    for label, command in commands.items():
+        if not label.startswith('cli'):
+            continue
+        heavy = sorted(imported_modules(command[1:]) & set(HEAVY_MODULES))
+        if heavy:
+            print(f"❌ {label} imports {', '.join(heavy)}")
+            failed = True
+
+    median = statistics.median(results['cli --help'])
+    if median > args.max_ms:
+        print(f"❌ cli --help median {median:.1f} ms is above {args.max_ms:.0f} ms")
+        failed = True
+
+    eager = statistics.median(results['eager imports'])
+    print(f"   speedup vs eager imports: {eager / median:.1f}x")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark the daily OHLC aggregation and the incremental dbt models
+
+Usage:
+    python benchmarks/bench_dbt_models.py --coins 250 --days 90
+
+Seeds a scratch ``bench_raw`` schema with deterministic hourly history
+(setseed) and daily market snapshots, then:
+
+1. Times the previous two-pass aggregation (GROUP BY + FIRST_VALUE/LAST_VALUE
+   window joined with SELECT DISTINCT) against the single-pass ARRAY_AGG
+   aggregation over the full window, and the single pass over the incremental
+   lookback window only. Results of the two full queries are checked to match.
+2. If ``dbt`` is on PATH, times ``dbt run --full-refresh`` against a plain
+   incremental ``dbt run`` of int_daily_price_aggregates and
+   fact_daily_metrics, using the ``bench`` profile target and
+   ``--vars raw_schema: bench_raw`` so the real raw tables are never read.
+
+Both scratch schemas are dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from sqlalchemy import text
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.db_connection import DatabaseConnection
+
+DBT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dbt')
+BENCH_SCHEMAS = ('bench_raw', 'bench_analytics')
+
+SEED_SQL = """
+CREATE SCHEMA bench_raw;
+CREATE TABLE bench_raw.historical_data (LIKE raw_data.historical_data INCLUDING DEFAULTS);
+CREATE TABLE bench_raw.cryptocurrency_data (LIKE raw_data.cryptocurrency_data INCLUDING DEFAULTS);
+CREATE TABLE bench_raw.extraction_log (LIKE raw_data.extraction_log INCLUDING DEFAULTS);
+
+SELECT setseed(0.42);
+
+INSERT INTO bench_raw.historical_data (coin_id, timestamp, price, market_cap, volume, extracted_at)
+SELECT
+    'coin-' || c,
+    ts,
+    c * (1 + random()),
+    (c * 1e7 * (1 + random()))::BIGINT,
+    (c * 1e5 * (1 + random()))::BIGINT,
+    now()
+FROM generate_series(1, :coins) c,
+     generate_series(date_trunc('hour', now()) - make_interval(days => :days),
+                     date_trunc('hour', now()), INTERVAL '1 hour') ts;
+
+INSERT INTO bench_raw.cryptocurrency_data (
+    id, symbol, name, current_price, market_cap, market_cap_rank, total_volume,
+    high_24h, low_24h, price_change_24h, price_change_percentage_24h, extracted_at
+)
+SELECT
+    'coin-' || c,
+    'c' || c,
+    'Coin ' || c,
+    c * (1 + random()),
+    (c * 1e7 * (1 + random()))::BIGINT,
+    c,
+    (c * 1e5 * (1 + random()))::BIGINT,
+    c * 2.1,
+    c * 0.9,
+    random() - 0.5,
+    (random() - 0.5) * 10,
+    day + INTERVAL '12 hours'
+FROM generate_series(1, :coins) c,
+     generate_series(CURRENT_DATE - 29, CURRENT_DATE - 1, INTERVAL '1 day') day;
+
+CREATE VIEW bench_raw.stg_historical_data AS
+SELECT coin_id, timestamp, DATE(timestamp) as date, price, market_cap, volume
+FROM bench_raw.historical_data
+WHERE timestamp >= CURRENT_DATE - INTERVAL '90 days'
+  AND price > 0;
+
+ANALYZE bench_raw.historical_data;
+ANALYZE bench_raw.cryptocurrency_data;
+"""
+
+# int_daily_price_aggregates before it became incremental
+TWO_PASS_SQL = """
+WITH daily_aggregates AS (
+    SELECT coin_id, date, MIN(price) as low_price, MAX(price) as high_price,
+           AVG(price) as avg_price, SUM(volume) as total_volume,
+           AVG(market_cap) as avg_market_cap, COUNT(*) as price_points
+    FROM bench_raw.stg_historical_data
+    GROUP BY coin_id, date
+),
+daily_ohlc AS (
+    SELECT coin_id, date,
+        FIRST_VALUE(price) OVER (PARTITION BY coin_id, date ORDER BY timestamp ASC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) as open_price,
+        LAST_VALUE(price) OVER (PARTITION BY coin_id, date ORDER BY timestamp ASC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) as close_price
+    FROM bench_raw.stg_historical_data
+)
+SELECT DISTINCT o.coin_id, o.date, a.low_price, a.high_price, a.avg_price, a.total_volume,
+       a.avg_market_cap, a.price_points, o.open_price, o.close_price
+FROM daily_ohlc o
+JOIN daily_aggregates a ON o.coin_id = a.coin_id AND o.date = a.date
+"""
+
+# int_daily_price_aggregates' single-pass aggregate
+SINGLE_PASS_SQL = """
+SELECT coin_id, date, MIN(price) as low_price, MAX(price) as high_price,
+       AVG(price) as avg_price, SUM(volume) as total_volume,
+       AVG(market_cap) as avg_market_cap, COUNT(*) as price_points,
+       (ARRAY_AGG(price ORDER BY timestamp ASC))[1] as open_price,
+       (ARRAY_AGG(price ORDER BY timestamp DESC))[1] as close_price
+FROM bench_raw.stg_historical_data
+{where}
+GROUP BY coin_id, date
+"""
+
+
+def execute(db: DatabaseConnection, statement: str, params=None) -> None:
+    """Run a DDL/DML statement in its own transaction"""
+    with db.engine.begin() as conn:
+        conn.execute(text(statement), params or {})
+
+
+def drop_schemas(db: DatabaseConnection) -> None:
+    for schema in BENCH_SCHEMAS:
+        execute(db, f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+
+
+def time_query(db: DatabaseConnection, query: str, repeat: int) -> float:
+    """Median seconds to materialise ``query`` into a temp table, as dbt does"""
+    timings = []
+    for _ in range(repeat):
+        with db.engine.begin() as conn:
+            started = time.perf_counter()
+            conn.execute(text(f"CREATE TEMP TABLE bench_result ON COMMIT DROP AS {query}"))
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def results_match(db: DatabaseConnection, left: str, right: str) -> bool:
+    with db.engine.connect() as conn:
+        differences = conn.execute(text(
+            f"SELECT COUNT(*) FROM (({left}) EXCEPT ({right})) a"
+            f" UNION ALL SELECT COUNT(*) FROM (({right}) EXCEPT ({left})) b"
+        )).scalars().all()
+    return not any(differences)
+
+
+def run_dbt(*args: str) -> float:
+    """Run a dbt command against the bench target and return elapsed seconds"""
+    command = [
+        'dbt', 'run', '--profiles-dir', '.', '--target', 'bench',
+        '--select', '+int_daily_price_aggregates', '+fact_daily_metrics',
+        '--vars', json.dumps({'raw_schema': 'bench_raw'}), *args,
+    ]
+    started = time.perf_counter()
+    subprocess.run(command, cwd=DBT_DIR, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--coins', type=int, default=250, help='Number of synthetic coins')
+    parser.add_argument('--days', type=int, default=90, help='Days of hourly history per coin')
+    parser.add_argument('--lookback', type=int, default=3, help='Incremental lookback in days')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per query')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch schemas')
+    args = parser.parse_args()
+
+    db = DatabaseConnection()
+    if not db.test_connection():
+        print("❌ Database connection failed. Please check your setup.")
+        return 1
+
+    drop_schemas(db)
+    try:
+        started = time.perf_counter()
+        execute(db, SEED_SQL, {'coins': args.coins, 'days': args.days})
+        rows = db.get_table_row_count('bench_raw.historical_data')
+        print(f"Seeded {rows:,} history rows for {args.coins} coins in {time.perf_counter() - started:.1f}s")
+
+        full = SINGLE_PASS_SQL.format(where='')
+        incremental = SINGLE_PASS_SQL.format(
+            where=f"WHERE timestamp >= CURRENT_DATE - {args.lookback}"
+        )
+        if not results_match(db, TWO_PASS_SQL, full):
+            print("❌ Single-pass aggregation does not match the two-pass query")
+            return 1
+
+        print("\nDaily OHLC aggregation (median seconds)")
+        two_pass = time_query(db, TWO_PASS_SQL, args.repeat)
+        single_pass = time_query(db, full, args.repeat)
+        lookback = time_query(db, incremental, args.repeat)
+        print(f"   two-pass, full window:        {two_pass:8.3f}")
+        print(f"   single-pass, full window:     {single_pass:8.3f}  ({two_pass / single_pass:.1f}x)")
+        print(f"   single-pass, {args.lookback}-day lookback: {lookback:8.3f}  ({two_pass / lookback:.1f}x)")
+
+        if shutil.which('dbt') is None:
+            print("\ndbt not found on PATH; skipping model runs")
+            return 0
+
+        print("\ndbt run (seconds)")
+        print(f"   --full-refresh: {run_dbt('--full-refresh'):8.3f}")
+        print(f"   incremental:    {run_dbt():8.3f}")
+    finally:
+        if not args.keep:
+            drop_schemas(db)
+        db.close_connection()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NumPy metrics engine and the set-based calculate_volatility
+
+Usage:
+    python benchmarks/bench_market_metrics.py --coins 500 --days 365
+    python benchmarks/bench_market_metrics.py --no-db
+
+1. Times compute_market_metrics over synthetic daily closes for every coin
+   against the equivalent pandas groupby().rolling() code, and checks that
+   the results match.
+2. Unless --no-db is given, times the previous PL/pgSQL calculate_volatility
+   (created as pg_temp.calculate_volatility_loop for the run) against the
+   SQL function from 07_create_functions_views.sql and a plain
+   stddev_pop/avg GROUP BY, over one price array per coin.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.market_metrics import compute_market_metrics
+
+LOOP_FUNCTION = """
+CREATE FUNCTION pg_temp.calculate_volatility_loop(prices DECIMAL[])
+RETURNS DECIMAL AS $$
+DECLARE
+    avg_price DECIMAL;
+    variance DECIMAL := 0;
+    price DECIMAL;
+BEGIN
+    SELECT AVG(unnest) INTO avg_price FROM unnest(prices);
+    FOR price IN SELECT unnest(prices) LOOP
+        variance := variance + POWER(price - avg_price, 2);
+    END LOOP;
+    variance := variance / array_length(prices, 1);
+    RETURN SQRT(variance) / avg_price * 100;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+SEED_PRICES = """
+CREATE TEMP TABLE bench_prices AS
+SELECT 'coin-' || coin AS coin_id,
+       day,
+       (100 * exp(random() * 0.2))::DECIMAL(20, 8) AS close_price
+FROM generate_series(1, :coins) AS coin, generate_series(1, :days) AS day
+"""
+
+QUERIES = {
+    'plpgsql loop': """
+        SELECT coin_id, pg_temp.calculate_volatility_loop(array_agg(close_price))
+        FROM bench_prices GROUP BY coin_id
+    """,
+    'sql function': """
+        SELECT coin_id, calculate_volatility(array_agg(close_price))
+        FROM bench_prices GROUP BY coin_id
+    """,
+    'group by': """
+        SELECT coin_id, stddev_pop(close_price) / NULLIF(avg(close_price), 0) * 100
+        FROM bench_prices GROUP BY coin_id
+    """,
+}
+
+
+def make_prices(coins: int, days: int) -> pd.DataFrame:
+    """Random-walk daily closes for ``coins`` coins, rows shuffled"""
+    rng = np.random.default_rng(42)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (coins, days)), axis=1))
+    frame = pd.DataFrame({
+        'coin_id': np.repeat([f'coin-{i}' for i in range(coins)], days),
+        'date': np.tile(pd.date_range('2024-01-01', periods=days).to_numpy(), coins),
+        'close_price': closes.ravel(),
+        'volume': rng.lognormal(15, 1, coins * days),
+        'market_cap': rng.lognormal(20, 1, coins * days),
+    })
+    return frame.sample(frac=1, random_state=0)
+
+
+def pandas_metrics(prices: pd.DataFrame) -> pd.DataFrame:
+    """The same metrics with pandas groupby/rolling, for timing and checking"""
+    frame = prices.sort_values(['coin_id', 'date']).reset_index(drop=True)
+    close = frame.groupby('coin_id')['close_price']
+    frame['return_1d'] = close.pct_change() * 100
+    returns = frame.groupby('coin_id')['return_1d']
+    frame['moving_average_7d'] = close.rolling(7).mean().reset_index(level=0, drop=True)
+    frame['moving_average_30d'] = close.rolling(30).mean().reset_index(level=0, drop=True)
+    frame['volatility_7d'] = returns.rolling(7).std().reset_index(level=0, drop=True)
+    frame['volatility_30d'] = returns.rolling(30).std().reset_index(level=0, drop=True)
+    frame['price_change_percentage_7d'] = close.pct_change(7) * 100
+    frame['price_change_percentage_30d'] = close.pct_change(30) * 100
+    frame['volume_to_market_cap_ratio'] = frame['volume'] / frame['market_cap']
+    return frame
+
+
+def timed(func, *args) -> tuple:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def bench_sql(coins: int, days: int) -> None:
+    from src.utils.db_connection import DatabaseConnection
+
+    db = DatabaseConnection()
+    if not db.test_connection():
+        print("❌ Database connection failed; skipping the SQL comparison")
+        return
+
+    with db.engine.begin() as conn:
+        conn.execute(text(LOOP_FUNCTION))
+        conn.execute(text(SEED_PRICES), {'coins': coins, 'days': days})
+
+        results = {}
+        for label, query in QUERIES.items():
+            started = time.perf_counter()
+            results[label] = dict(conn.execute(text(query)).fetchall())
+            print(f"   {label:<14} {time.perf_counter() - started:8.3f}s")
+
+    baseline = results['plpgsql loop']
+    for label, values in results.items():
+        worst = max(abs(float(values[coin]) - float(baseline[coin])) for coin in baseline)
+        print(f"   {label:<14} max abs difference from the loop: {worst:.2e}")
+    db.close_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--coins', type=int, default=500, help='Synthetic coins')
+    parser.add_argument('--days', type=int, default=365, help='Daily closes per coin')
+    parser.add_argument('--no-db', action='store_true', help='Skip the SQL function comparison')
+    args = parser.parse_args()
+
+    prices = make_prices(args.coins, args.days)
+    print(f"Computing metrics for {args.coins} coins x {args.days} days ({len(prices):,} rows)")
+
+    vectorized, numpy_seconds = timed(compute_market_metrics, prices)
+    reference, pandas_seconds = timed(pandas_metrics, prices)
+    print(f"   numpy          {numpy_seconds:8.3f}s")
+    print(f"   pandas rolling {pandas_seconds:8.3f}s   ({pandas_seconds / numpy_seconds:.1f}x slower)")
+
+    vectorized = vectorized.sort_values(['coin_id', 'date']).reset_index(drop=True)
+    for column in vectorized.columns[2:]:
+        if not np.allclose(vectorized[column], reference[column], equal_nan=True):
+            print(f"❌ {column} differs from the pandas reference")
+            return 1
+
+    if not args.no_db:
+        print("calculate_volatility over one array per coin")
+        bench_sql(args.coins, args.days)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
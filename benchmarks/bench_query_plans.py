@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression harness and index advisor for the analytics SQL
+
+Usage:
+    python benchmarks/bench_query_plans.py
+    python benchmarks/bench_query_plans.py --history-rows 10000000 --coins 1000
+    python benchmarks/bench_query_plans.py --update-baselines
+    python benchmarks/bench_query_plans.py --output plans.json
+
+Seeds a disposable database (see disposable_postgres.py) with synthetic
+history, market snapshots and analytics rows generated server-side with
+generate_series, then captures EXPLAIN (ANALYZE, BUFFERS) for:
+
+    every dbt model    rendered from dbt/models (full refresh, plus the
+                       incremental branch of incremental models) and built
+                       into a scratch schema in dependency order, as dbt would
+    analytics.v_*      the views from sql/init/07_create_functions_views.sql
+
+For each query it reports execution time, buffers and sequential scans over
+--seq-scan-rows rows, with index suggestions for the scanned columns (BRIN
+for range filters on columns that follow the physical row order, B-tree
+otherwise). Plan shapes, times and flagged scans are compared with
+benchmarks/query_plan_baselines.json recorded at the same scale; the run
+exits with status 1 on a changed plan, a new sequential scan, or a time
+more than --tolerance over its baseline.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psycopg2
+import yaml
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disposable_postgres import disposable_database
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_plan_baselines.json')
+DBT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dbt')
+MODEL_SCHEMA = 'bench_models'
+
+# Views and the query explained for each; currency views are read for one currency, as reports do
+VIEWS = {
+    'analytics.v_latest_prices': "SELECT * FROM analytics.v_latest_prices",
+    'analytics.v_daily_movers': "SELECT * FROM analytics.v_daily_movers",
+    'analytics.v_market_overview': "SELECT * FROM analytics.v_market_overview",
+    'analytics.v_latest_prices_by_currency':
+        "SELECT * FROM analytics.v_latest_prices_by_currency WHERE currency = 'eur'",
+    'analytics.v_daily_prices_by_currency':
+        "SELECT * FROM analytics.v_daily_prices_by_currency WHERE currency = 'eur'",
+}
+
+# Options that define a scenario; baselines only apply to the same scenario
+SCENARIO_OPTIONS = ('history_rows', 'coins', 'snapshot_days', 'snapshots_per_day')
+
+# Differences below this are timing noise, whatever the relative change
+MIN_REGRESSION_MS = 5.0
+
+# Correlation between a column and the physical row order above which a
+# BRIN index is suggested for range filters
+BRIN_CORRELATION = 0.9
+
+# Largest fraction of scanned rows a filter may keep for a B-tree index,
+# or a BRIN index on a correlated column, to beat the sequential scan
+INDEX_SELECTIVITY = 0.1
+BRIN_SELECTIVITY = 0.5
+
+SEED_SQL = """
+SELECT setseed(0.42);
+
+INSERT INTO raw_data.historical_data (coin_id, timestamp, price, market_cap, volume, extracted_at)
+SELECT
+    CASE c WHEN 1 THEN 'bitcoin' WHEN 2 THEN 'ethereum' ELSE 'coin-' || c END,
+    ts,
+    c * (1 + random()),
+    (c * 1e7 * (1 + random()))::BIGINT,
+    (c * 1e5 * (1 + random()))::BIGINT,
+    ts + INTERVAL '1 hour'
+FROM generate_series(date_trunc('hour', now()) - make_interval(hours => %(hours)s - 1),
+                     date_trunc('hour', now()), INTERVAL '1 hour') ts,
+     generate_series(1, %(coins)s) c;
+
+INSERT INTO raw_data.cryptocurrency_data (
+    id, symbol, name, current_price, market_cap, market_cap_rank, total_volume,
+    high_24h, low_24h, price_change_24h, price_change_percentage_24h,
+    circulating_supply, last_updated, extracted_at
+)
+SELECT
+    CASE c WHEN 1 THEN 'bitcoin' WHEN 2 THEN 'ethereum' ELSE 'coin-' || c END,
+    'c' || c,
+    'Coin ' || c,
+    c * (1 + random()),
+    (1e12 / c * (1 + random()))::BIGINT,
+    c,
+    (1e10 / c * (1 + random()))::BIGINT,
+    c * 2.1,
+    c * 0.9,
+    random() - 0.5,
+    (random() - 0.5) * 10,
+    (1e9 / c)::BIGINT,
+    ts - INTERVAL '1 minute',
+    ts
+FROM generate_series(date_trunc('hour', now()) - make_interval(days => %(snapshot_days)s),
+                     date_trunc('hour', now()), make_interval(secs => 86400.0 / %(snapshots_per_day)s)) ts,
+     generate_series(1, %(coins)s) c;
+
+INSERT INTO analytics.latest_prices
+SELECT DISTINCT ON (id)
+    id, symbol, name, current_price, market_cap, market_cap_rank, total_volume,
+    high_24h, low_24h, price_change_24h, price_change_percentage_24h,
+    circulating_supply, last_updated, extracted_at
+FROM raw_data.cryptocurrency_data
+ORDER BY id, extracted_at DESC;
+
+INSERT INTO analytics.dim_cryptocurrencies (coin_id, symbol, name, first_seen, last_seen)
+SELECT coin_id, symbol, name, CURRENT_DATE - %(snapshot_days)s, CURRENT_DATE
+FROM analytics.latest_prices;
+
+INSERT INTO staging.daily_prices (coin_id, date, open_price, high_price, low_price, close_price, volume, market_cap)
+SELECT coin_id, timestamp::DATE, MIN(price), MAX(price), MIN(price), MAX(price), MAX(volume), MAX(market_cap)
+FROM raw_data.historical_data
+GROUP BY coin_id, timestamp::DATE;
+
+INSERT INTO analytics.daily_top_performers (date, coin_id, performance_type, rank_position, metric_value)
+SELECT day, coin_id, kind, position, random() * 100
+FROM generate_series(CURRENT_DATE - %(snapshot_days)s, CURRENT_DATE - 1, INTERVAL '1 day') day,
+     (VALUES ('gainer'), ('loser'), ('volume')) kinds(kind),
+     LATERAL (
+         SELECT coin_id, row_number() OVER () as position
+         FROM analytics.dim_cryptocurrencies
+         ORDER BY random() + extract(epoch FROM day) * 0
+         LIMIT 10
+     ) picked;
+
+INSERT INTO analytics.market_performance (date, total_market_cap, total_volume_24h, bitcoin_dominance,
+                                          ethereum_dominance, active_cryptocurrencies, market_cap_change_24h)
+SELECT day, (2e12 * (1 + random()))::BIGINT, (1e11 * (1 + random()))::BIGINT, 50 + random() * 5,
+       15 + random() * 3, %(coins)s, (random() - 0.5) * 10
+FROM generate_series(CURRENT_DATE - %(snapshot_days)s, CURRENT_DATE - 1, INTERVAL '1 day') day;
+
+INSERT INTO raw_data.exchange_rates (currency, date, rate_type, btc_rate, usd_rate, extracted_at)
+SELECT currency, day, 'fiat', usd_rate * 60000, usd_rate * (0.95 + random() * 0.1), day + INTERVAL '23 hours'
+FROM generate_series(CURRENT_DATE - %(snapshot_days)s, CURRENT_DATE, INTERVAL '1 day') day,
+     (VALUES ('usd', 1.0), ('eur', 0.92), ('gbp', 0.79), ('jpy', 150.0)) rates(currency, usd_rate);
+"""
+
+INDEX_SQL = """
+SELECT
+    n.nspname || '.' || t.relname,
+    i.relname,
+    am.amname,
+    a.attname
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_class t ON t.oid = x.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_am am ON am.oid = i.relam
+JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+WHERE n.nspname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+  AND NOT i.relispartition
+"""
+
+PARENT_SQL = """
+SELECT cn.nspname || '.' || c.relname, pn.nspname || '.' || p.relname
+FROM pg_inherits h
+JOIN pg_class c ON c.oid = h.inhrelid
+JOIN pg_namespace cn ON cn.oid = c.relnamespace
+JOIN pg_class p ON p.oid = h.inhparent
+JOIN pg_namespace pn ON pn.oid = p.relnamespace
+"""
+
+
+# --- dbt model rendering ----------------------------------------------------
+
+CONFIG_CALL = re.compile(r'\{\{\s*config\((.*?)\)\s*\}\}', re.DOTALL)
+INCREMENTAL_BLOCK = re.compile(r'\{%-?\s*if is_incremental\(\)\s*-?%\}(.*?)\{%-?\s*endif\s*-?%\}', re.DOTALL)
+SET_BLOCK = re.compile(r'\{%-?\s*set (\w+)\s*-?%\}(.*?)\{%-?\s*endset\s*-?%\}', re.DOTALL)
+EXPRESSION = re.compile(r'\{\{(.*?)\}\}', re.DOTALL)
+REF = re.compile(r"""ref\(\s*['"](\w+)['"]\s*\)""")
+SOURCE = re.compile(r"""source\(\s*['"](\w+)['"]\s*,\s*['"](\w+)['"]\s*\)""")
+VAR = re.compile(r"""var\(\s*['"](\w+)['"]\s*\)""")
+MATERIALIZED = re.compile(r"""materialized\s*=\s*['"](\w+)['"]""")
+
+
+class DbtProject:
+    """
+    The dbt models rendered to plain SQL without dbt
+    
+    Supports what the models in dbt/models use: config(), ref(), source(),
+    var(), this, {% set %} blocks and {% if is_incremental() %} branches.
+    Anything else raises ValueError naming the model, so a model using new
+    Jinja is noticed instead of silently mis-rendered.
+    """
+    
+    def __init__(self, project_dir: str = DBT_DIR, schema: str = MODEL_SCHEMA):
+        self.schema = schema
+        with open(os.path.join(project_dir, 'dbt_project.yml')) as f:
+            project = yaml.safe_load(f)
+        self.variables = project.get('vars', {})
+        folder_defaults = project.get('models', {}).get(project['name'], {})
+        
+        self.models: Dict[str, Dict] = {}
+        for path in sorted(glob.glob(os.path.join(project_dir, 'models', '**', '*.sql'), recursive=True)):
+            name = os.path.splitext(os.path.basename(path))[0]
+            folder = os.path.relpath(os.path.dirname(path), os.path.join(project_dir, 'models')).split(os.sep)[0]
+            with open(path) as f:
+                sql = f.read()
+            
+            config = CONFIG_CALL.search(sql)
+            materialized = MATERIALIZED.search(config.group(1)) if config else None
+            self.models[name] = {
+                'sql': sql,
+                'materialized': (materialized.group(1) if materialized
+                                 else folder_defaults.get(folder, {}).get('+materialized', 'view')),
+                'refs': sorted(set(REF.findall(sql))),
+            }
+    
+    def build_order(self) -> List[str]:
+        """Model names with every model after the models it refs"""
+        order, visiting = [], set()
+        
+        def visit(name: str):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"ref() cycle through {name}")
+            visiting.add(name)
+            for ref in self.models[name]['refs']:
+                visit(ref)
+            order.append(name)
+        
+        for name in self.models:
+            visit(name)
+        return order
+    
+    def render(self, name: str, incremental: bool = False) -> str:
+        """
+        Model SQL as dbt would run it
+        
+        Args:
+            name: Model name
+            incremental: Render the is_incremental() branches, with ``this``
+                pointing at the already built model
+        """
+        sets = {}
+        
+        def expression(match) -> str:
+            expr = match.group(1).strip()
+            if expr == 'this':
+                return f"{self.schema}.{name}"
+            if expr in sets:
+                return sets[expr]
+            for pattern, replace in ((REF, lambda m: f"{self.schema}.{m.group(1)}"),
+                                     (SOURCE, lambda m: f"{m.group(1)}.{m.group(2)}"),
+                                     (VAR, lambda m: str(self.variables[m.group(1)]))):
+                found = pattern.fullmatch(expr)
+                if found:
+                    return replace(found)
+            raise ValueError(f"{name}: unsupported Jinja expression {{{{ {expr} }}}}")
+        
+        def set_block(match) -> str:
+            sets[match.group(1)] = EXPRESSION.sub(expression, match.group(2)).strip()
+            return ''
+        
+        sql = CONFIG_CALL.sub('', self.models[name]['sql'])
+        sql = INCREMENTAL_BLOCK.sub(lambda m: m.group(1) if incremental else '', sql)
+        sql = SET_BLOCK.sub(set_block, sql)
+        sql = EXPRESSION.sub(expression, sql)
+        if '{%' in sql or '{{' in sql:
+            raise ValueError(f"{name}: unsupported Jinja left after rendering")
+        return sql.strip()
+
+
+# --- plan analysis ----------------------------------------------------------
+
+def walk(node: Dict) -> Iterator[Dict]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def summarize_plan(explain: Dict, parents: Dict[str, str], seq_scan_rows: int) -> Dict:
+    """
+    Reduce one EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON) result
+    
+    Partitions are reported under their parent table, so the shape doesn't
+    change when a new month's partition is added.
+    
+    Returns:
+        Dictionary with execution/planning time, shared buffers, the plan
+        shape and the sequential scans reading at least ``seq_scan_rows`` rows
+    """
+    root = explain['Plan']
+    shape, seq_scans = [], []
+    for node in walk(root):
+        relation = None
+        if 'Relation Name' in node:
+            relation = f"{node['Schema']}.{node['Relation Name']}"
+            relation = parents.get(relation, relation)
+        
+        step = node['Node Type'] + (f" {relation}" if relation else '')
+        if not shape or shape[-1] != step:
+            shape.append(step)
+        
+        if node['Node Type'] == 'Seq Scan':
+            loops = node.get('Actual Loops', 1)
+            scanned = (node.get('Actual Rows', 0) + node.get('Rows Removed by Filter', 0)) * loops
+            if scanned >= seq_scan_rows:
+                condition = node.get('Filter')
+                if condition:
+                    # Partitions differ only in the qualifier VERBOSE puts on columns
+                    condition = re.sub(rf'\b{re.escape(node["Alias"])}\.', '', condition)
+                seq_scans.append({
+                    'relation': relation,
+                    'rows_scanned': int(scanned),
+                    'rows_returned': int(node.get('Actual Rows', 0) * loops),
+                    'filter': condition,
+                })
+    
+    return {
+        'execution_ms': round(explain['Execution Time'], 3),
+        'planning_ms': round(explain['Planning Time'], 3),
+        'shared_buffers': root.get('Shared Hit Blocks', 0) + root.get('Shared Read Blocks', 0),
+        'shape': shape,
+        'seq_scans': _merge_scans(seq_scans),
+    }
+
+
+def _merge_scans(seq_scans: List[Dict]) -> List[Dict]:
+    """Combine the per-partition scans of one table and filter"""
+    merged: Dict[Tuple, Dict] = {}
+    for scan in seq_scans:
+        key = (scan['relation'], scan['filter'])
+        if key in merged:
+            merged[key]['rows_scanned'] += scan['rows_scanned']
+            merged[key]['rows_returned'] += scan['rows_returned']
+        else:
+            merged[key] = dict(scan)
+    return list(merged.values())
+
+
+class IndexAdvisor:
+    """Suggests indexes for the columns a sequential scan filters on"""
+    
+    def __init__(self, cursor):
+        cursor.execute(INDEX_SQL)
+        self.indexes: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        for table, index, method, column in cursor.fetchall():
+            self.indexes.setdefault((table, column), []).append((index, method))
+        
+        cursor.execute("""
+            SELECT table_schema || '.' || table_name, column_name
+            FROM information_schema.columns
+            WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+        """)
+        self.columns: Dict[str, List[str]] = {}
+        for table, column in cursor.fetchall():
+            self.columns.setdefault(table, []).append(column)
+        
+        # Partitioned parents carry inherited stats, leaf tables plain ones
+        cursor.execute("SELECT schemaname || '.' || tablename, attname, correlation FROM pg_stats "
+                       "WHERE correlation IS NOT NULL")
+        self.correlation: Dict[Tuple[str, str], float] = {}
+        for table, column, correlation in cursor.fetchall():
+            key = (table, column)
+            self.correlation[key] = max(self.correlation.get(key, 0.0), abs(correlation))
+    
+    def advise(self, scan: Dict) -> List[str]:
+        table, condition = scan['relation'], scan['filter']
+        if not condition:
+            return [f"{table}: no filter, the whole table is read"]
+        
+        kept = scan['rows_returned'] / scan['rows_scanned'] if scan['rows_scanned'] else 0.0
+        if kept > BRIN_SELECTIVITY:
+            return [f"{table}: the filter keeps {kept:.0%} of rows; a sequential scan is the right plan"]
+        
+        advice = []
+        for column in self.columns.get(table, []):
+            mention = re.search(rf'\b{re.escape(column)}\b"?\)?(?:::[\w ]+)?\s*(>=|<=|>|<|=)', condition)
+            if not mention:
+                continue
+            
+            is_range = mention.group(1) != '='
+            correlation = self.correlation.get((table, column), 0.0)
+            existing = self.indexes.get((table, column), [])
+            brin = f"CREATE INDEX ON {table} USING brin ({column})"
+            if existing:
+                names = ', '.join(f"{index} ({method})" for index, method in existing)
+                line = f"{table}.{column}: {names} not used for a filter keeping {kept:.0%} of rows"
+                if is_range and correlation >= BRIN_CORRELATION and all(m != 'brin' for _, m in existing):
+                    line += f"; rows follow {column} (correlation {correlation:.2f}), try {brin}"
+                advice.append(line)
+            elif is_range and correlation >= BRIN_CORRELATION:
+                advice.append(f"{table}.{column}: {brin}  -- range filter keeping {kept:.0%} of rows, "
+                              f"correlation {correlation:.2f}")
+            elif kept <= INDEX_SELECTIVITY:
+                advice.append(f"{table}.{column}: CREATE INDEX ON {table} ({column})  "
+                              f"-- {'range' if is_range else 'equality'} filter keeping {kept:.0%} of rows")
+        
+        if advice and re.search(r'\$\d', condition):
+            advice.append(f"{table}: the filter compares with a subquery result the planner cannot "
+                          f"estimate, so an index may still be skipped; a literal bound lets it be used")
+        return advice or [f"{table}: no index candidate in filter {condition}"]
+
+
+# --- harness ----------------------------------------------------------------
+
+def explain(cursor, query: str, repeat: int) -> Dict:
+    """EXPLAIN ANALYZE ``query`` ``repeat`` times; the last plan with the median time"""
+    runs = []
+    for _ in range(repeat):
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON) {query}")
+        runs.append(cursor.fetchone()[0][0])
+    result = runs[-1]
+    result['Execution Time'] = statistics.median(run['Execution Time'] for run in runs)
+    return result
+
+
+def seed(cursor, args) -> int:
+    hours = math.ceil(args.history_rows / args.coins)
+    months_back = math.ceil(max(hours / 24, args.snapshot_days) / 28) + 1
+    cursor.execute("SELECT raw_data.ensure_monthly_partitions('raw_data.historical_data', %s, 1)", (months_back,))
+    cursor.execute("SELECT raw_data.ensure_monthly_partitions('raw_data.cryptocurrency_data', %s, 1)", (months_back,))
+    cursor.execute(SEED_SQL, {'hours': hours, 'coins': args.coins, 'snapshot_days': args.snapshot_days,
+                              'snapshots_per_day': args.snapshots_per_day})
+    cursor.execute("VACUUM ANALYZE")
+    cursor.execute("SELECT COUNT(*) FROM raw_data.historical_data")
+    return cursor.fetchone()[0]
+
+
+def capture_plans(cursor, args) -> Dict[str, Dict]:
+    """Build the dbt models and explain every model and view"""
+    cursor.execute(PARENT_SQL)
+    parents = dict(cursor.fetchall())
+    
+    project = DbtProject()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {MODEL_SCHEMA} CASCADE; CREATE SCHEMA {MODEL_SCHEMA}")
+    
+    plans = {}
+    for name in project.build_order():
+        model = project.models[name]
+        sql = project.render(name)
+        plans[name] = explain(cursor, sql, args.repeat)
+        
+        kind = 'VIEW' if model['materialized'] == 'view' else 'TABLE'
+        cursor.execute(f"CREATE {kind} {MODEL_SCHEMA}.{name} AS {sql}")
+        if kind == 'TABLE':
+            cursor.execute(f"ANALYZE {MODEL_SCHEMA}.{name}")
+        if model['materialized'] == 'incremental':
+            plans[f"{name} (incremental)"] = explain(cursor, project.render(name, incremental=True), args.repeat)
+    
+    for view, query in VIEWS.items():
+        plans[view] = explain(cursor, query, args.repeat)
+    
+    summaries = {target: summarize_plan(plan, parents, args.seq_scan_rows) for target, plan in plans.items()}
+    for target, plan in plans.items():
+        summaries[target]['plan'] = plan
+    return summaries
+
+
+def compare(results: Dict, baselines: Dict, tolerance: float) -> List[str]:
+    """
+    Compare plans with baselines
+    
+    Returns:
+        Descriptions of changed plans, new sequential scans and slower queries
+    """
+    regressions = []
+    for target, result in results.items():
+        baseline = baselines.get(target)
+        if not baseline:
+            continue
+        
+        if result['shape'] != baseline['shape']:
+            regressions.append(f"{target}: plan changed\n      was: {' > '.join(baseline['shape'])}"
+                               f"\n      now: {' > '.join(result['shape'])}")
+        
+        known = {(scan['relation'], scan['filter']) for scan in baseline['seq_scans']}
+        for scan in result['seq_scans']:
+            if (scan['relation'], scan['filter']) not in known:
+                regressions.append(f"{target}: new sequential scan of {scan['relation']} "
+                                   f"({scan['rows_scanned']:,} rows)")
+        
+        value, expected = result['execution_ms'], baseline['execution_ms']
+        if expected and value - expected > MIN_REGRESSION_MS and (value - expected) / expected > tolerance:
+            regressions.append(f"{target}: {value:.1f} ms vs baseline {expected:.1f} ms "
+                               f"({(value - expected) / expected:+.0%})")
+    return regressions
+
+
+def print_report(results: Dict, baselines: Dict, advisor: IndexAdvisor) -> None:
+    header = f"{'query':<42} {'ms':>10} {'baseline':>10} {'buffers':>10} {'seq scans':>10}"
+    print(f"\n{header}\n{'-' * len(header)}")
+    for target, result in results.items():
+        expected = baselines.get(target, {}).get('execution_ms')
+        print(f"{target:<42} {result['execution_ms']:>10.1f} "
+              f"{'-' if expected is None else f'{expected:.1f}':>10} "
+              f"{result['shared_buffers']:>10,} {len(result['seq_scans']):>10}")
+    
+    flagged = [(target, scan) for target, result in results.items() for scan in result['seq_scans']]
+    if not flagged:
+        return
+    
+    print("\nSequential scans and index suggestions")
+    for target, scan in flagged:
+        print(f"   {target}: Seq Scan on {scan['relation']} ({scan['rows_scanned']:,} rows read, "
+              f"{scan['rows_returned']:,} kept)")
+        for line in advisor.advise(scan):
+            print(f"      {line}")
+
+
+def load_baselines(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--history-rows', type=int, default=1_000_000, help='Rows in raw_data.historical_data')
+    parser.add_argument('--coins', type=int, default=250, help='Synthetic coins')
+    parser.add_argument('--snapshot-days', type=int, default=60, help='Days of market snapshots')
+    parser.add_argument('--snapshots-per-day', type=int, default=24, help='Market snapshots per day')
+    parser.add_argument('--seq-scan-rows', type=int, default=10000, help='Flag sequential scans reading this many rows')
+    parser.add_argument('--repeat', type=int, default=3, help='EXPLAIN ANALYZE runs per query (median time)')
+    parser.add_argument('--database', choices=['auto', 'cluster', 'scratch'], default='auto',
+                        help='Temporary initdb cluster, scratch database on DB_HOST, or auto')
+    parser.add_argument('--baselines', default=BASELINES_FILE, help='Baselines JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed relative slowdown (0.5 = 50%%)')
+    parser.add_argument('--update-baselines', action='store_true', help='Record this run as the baseline')
+    parser.add_argument('--output', help='Also write summaries and full plans to this JSON file')
+    args = parser.parse_args()
+    
+    with disposable_database(args.database) as settings:
+        connection = psycopg2.connect(host=settings['DB_HOST'], port=settings['DB_PORT'], dbname=settings['DB_NAME'],
+                                      user=settings['DB_USER'], password=settings['DB_PASSWORD'])
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT current_setting('server_version_num')::INT / 10000")
+                scenario = {option: getattr(args, option) for option in SCENARIO_OPTIONS}
+                scenario['postgres'] = cursor.fetchone()[0]
+                
+                rows = seed(cursor, args)
+                print(f"Seeded {rows:,} history rows for {args.coins} coins in {settings['DB_NAME']}")
+                results = capture_plans(cursor, args)
+                advisor = IndexAdvisor(cursor)
+        finally:
+            connection.close()
+    
+    stored = load_baselines(args.baselines)
+    baselines = stored['queries'] if stored and stored.get('scenario') == scenario else {}
+    print_report(results, baselines, advisor)
+    
+    summaries = {target: {key: value for key, value in result.items() if key != 'plan'}
+                 for target, result in results.items()}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'scenario': scenario, 'queries': results}, f, indent=2, default=str)
+    
+    if args.update_baselines:
+        with open(args.baselines, 'w') as f:
+            json.dump({'scenario': scenario, 'queries': summaries}, f, indent=2)
+            f.write('\n')
+        print(f"\nBaselines written to {args.baselines}")
+        return 0
+    
+    if not baselines:
+        print("\nNo baselines recorded for this scenario; run with --update-baselines to create them")
+        return 0
+    
+    regressions = compare(summaries, baselines, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} plan regressions:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    
+    print(f"\n✅ All plans match their baselines and are within {args.tolerance:.0%} of baseline times")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Throwaway Postgres databases for benchmarks
+
+``disposable_database()`` yields DB_* settings for an empty database with the
+schema from sql/init applied, and removes it afterwards. When ``initdb`` and
+``pg_ctl`` are available (on PATH or in PG_BIN) and the process is not root,
+a temporary cluster is started on a free port. Otherwise a scratch database
+is created on the server configured by the DB_* environment variables.
+"""
+
+import contextlib
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import uuid
+from typing import Dict, Iterator, Optional
+
+import psycopg2
+
+INIT_SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sql', 'init')
+
+
+def _pg_tool(name: str) -> Optional[str]:
+    pg_bin = os.getenv('PG_BIN')
+    if pg_bin and os.path.exists(os.path.join(pg_bin, name)):
+        return os.path.join(pg_bin, name)
+    return shutil.which(name)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def apply_init_sql(settings: Dict[str, str]) -> None:
+    """Run sql/init/*.sql, in order, against the database in ``settings``"""
+    connection = psycopg2.connect(
+        host=settings['DB_HOST'], port=settings['DB_PORT'], dbname=settings['DB_NAME'],
+        user=settings['DB_USER'], password=settings['DB_PASSWORD']
+    )
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            for path in sorted(glob.glob(os.path.join(INIT_SQL_DIR, '*.sql'))):
+                with open(path) as f:
+                    cursor.execute(f.read())
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def _temporary_cluster(initdb: str, pg_ctl: str) -> Iterator[Dict[str, str]]:
+    data_dir = tempfile.mkdtemp(prefix='bench-pg-')
+    port = _free_port()
+    try:
+        subprocess.run(
+            [initdb, '-D', data_dir, '-U', 'airflow', '--auth=trust', '-E', 'UTF8'],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        subprocess.run(
+            [pg_ctl, '-D', data_dir, '-l', os.path.join(data_dir, 'server.log'), '-w',
+             '-o', f'-p {port} -k {data_dir} -c listen_addresses=127.0.0.1 -c fsync=off', 'start'],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        try:
+            connection = psycopg2.connect(host='127.0.0.1', port=port, dbname='postgres', user='airflow')
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE DATABASE coingecko_bench")
+            connection.close()
+            
+            yield {
+                'DB_HOST': '127.0.0.1',
+                'DB_PORT': str(port),
+                'DB_NAME': 'coingecko_bench',
+                'DB_USER': 'airflow',
+                'DB_PASSWORD': '',
+            }
+        finally:
+            subprocess.run([pg_ctl, '-D', data_dir, '-m', 'fast', 'stop'], check=False, stdout=subprocess.DEVNULL)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+@contextlib.contextmanager
+def _scratch_database() -> Iterator[Dict[str, str]]:
+    settings = {
+        'DB_HOST': os.getenv('DB_HOST', 'localhost'),
+        'DB_PORT': os.getenv('DB_PORT', '5432'),
+        'DB_NAME': f"coingecko_bench_{uuid.uuid4().hex[:8]}",
+        'DB_USER': os.getenv('DB_USER', 'airflow'),
+        'DB_PASSWORD': os.getenv('DB_PASSWORD', 'airflow'),
+    }
+    connection = psycopg2.connect(
+        host=settings['DB_HOST'], port=settings['DB_PORT'], dbname='postgres',
+        user=settings['DB_USER'], password=settings['DB_PASSWORD']
+    )
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE {settings['DB_NAME']}")
+        try:
+            yield settings
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS {settings['DB_NAME']} WITH (FORCE)")
+    finally:
+        connection.close()
+
+
+@contextlib.contextmanager
+def disposable_database(mode: str = 'auto') -> Iterator[Dict[str, str]]:
+    """
+    Create an empty, initialised database and remove it on exit
+    
+    Args:
+        mode: 'cluster' (temporary initdb cluster), 'scratch' (scratch database
+            on the configured server) or 'auto' (cluster when possible)
+    
+    Yields:
+        DB_HOST/DB_PORT/DB_NAME/DB_USER/DB_PASSWORD settings for the database
+    """
+    initdb, pg_ctl = _pg_tool('initdb'), _pg_tool('pg_ctl')
+    can_run_cluster = initdb and pg_ctl and os.geteuid() != 0
+    
+    if mode == 'cluster' and not can_run_cluster:
+        raise RuntimeError("initdb/pg_ctl not found (set PG_BIN) or running as root")
+    
+    if mode == 'cluster' or (mode == 'auto' and can_run_cluster):
+        context = _temporary_cluster(initdb, pg_ctl)
+    else:
+        context = _scratch_database()
+    
+    with context as settings:
+        apply_init_sql(settings)
+        yield settings
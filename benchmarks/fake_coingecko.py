@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the CoinGecko API serving synthetic payloads
+
+Usage:
+    python benchmarks/fake_coingecko.py --port 18080 --coins 1000 --latency-ms 50
+
+Serves /coins/markets (paged), /coins/{id}/market_chart,
+/coins/{id}/market_chart/range, /global and /exchange_rates. Every response
+is delayed by ``latency_ms`` (plus up to ``jitter_ms``), and a fraction
+``throttle_rate`` of requests is answered with HTTP 429 and a Retry-After
+header, so the extractor's concurrency, rate limiting and retries can be
+exercised without touching the real API. Payloads are generated from a
+fixed seed and are identical between runs.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+MS_PER_HOUR = 3600 * 1000
+MS_PER_DAY = 24 * MS_PER_HOUR
+
+CHART_PATH = re.compile(r'/coins/(?P<coin_id>[^/]+)/market_chart(?P<range>/range)?$')
+
+
+class FakeCoinGecko:
+    """
+    Threaded fake CoinGecko server
+    
+    Use as a context manager, or call start()/stop(). ``base_url`` is the
+    value to put in COINGECKO_API_URL.
+    """
+    
+    def __init__(self, port: int = 0, coins: int = 1000, latency_ms: float = 0,
+                 jitter_ms: float = 0, throttle_rate: float = 0, retry_after: float = 1, seed: int = 42):
+        """
+        Args:
+            port: Port to bind on 127.0.0.1 (0 picks a free one)
+            coins: Number of coins listed by /coins/markets
+            latency_ms: Fixed delay added to every response
+            jitter_ms: Extra uniformly random delay added to every response
+            throttle_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Seed for payloads and for 429 injection
+        """
+        self.coins = coins
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+    
+    def start(self) -> 'FakeCoinGecko':
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-coingecko', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def stats(self) -> Dict[str, int]:
+        """Requests served, how many were throttled, and response bytes"""
+        with self._lock:
+            return {'requests': self.requests, 'throttled': self.throttled, 'bytes': self.bytes_sent}
+    
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests = self.throttled = self.bytes_sent = 0
+    
+    def _should_throttle(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            throttle = self.throttle_rate > 0 and self._random.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+            return throttle
+    
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._random.random() * self.jitter if self.jitter else 0)
+    
+    def markets(self, page: int, per_page: int) -> List[Dict]:
+        start = (page - 1) * per_page
+        now = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+        rows = []
+        for rank in range(start + 1, min(start + per_page, self.coins) + 1):
+            price = 1e5 / rank
+            rows.append({
+                'id': f'coin-{rank}',
+                'symbol': f'c{rank}',
+                'name': f'Coin {rank}',
+                'image': f'https://example.invalid/coin-{rank}.png',
+                'current_price': price,
+                'market_cap': int(1e12 / rank),
+                'market_cap_rank': rank,
+                'fully_diluted_valuation': int(1.2e12 / rank),
+                'total_volume': int(1e10 / rank),
+                'high_24h': price * 1.05,
+                'low_24h': price * 0.95,
+                'price_change_24h': price * 0.01,
+                'price_change_percentage_24h': 1.0,
+                'market_cap_change_24h': 1e10 / rank,
+                'market_cap_change_percentage_24h': 1.0,
+                'circulating_supply': 1e7,
+                'total_supply': 2e7,
+                'max_supply': 2.1e7,
+                'ath': price * 2,
+                'ath_change_percentage': -50.0,
+                'ath_date': '2021-11-10T14:24:11.849Z',
+                'atl': price / 100,
+                'atl_change_percentage': 9900.0,
+                'atl_date': '2013-07-06T00:00:00.000Z',
+                'roi': None,
+                'last_updated': now,
+            })
+        return rows
+    
+    def market_chart(self, coin_id: str, start_ms: int, end_ms: int, step_ms: int) -> Dict:
+        # Align to the step so repeated requests return the same points
+        timestamps = np.arange(start_ms - start_ms % step_ms + step_ms, end_ms + 1, step_ms, dtype='int64')
+        rng = np.random.default_rng([self.seed, sum(map(ord, coin_id))])
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(timestamps))))
+        return {
+            'prices': np.column_stack([timestamps, prices]).tolist(),
+            'market_caps': np.column_stack([timestamps, prices * 1e7]).tolist(),
+            'total_volumes': np.column_stack([timestamps, prices * 1e5]).tolist(),
+        }
+    
+    def global_data(self) -> Dict:
+        return {'data': {
+            'active_cryptocurrencies': self.coins,
+            'markets': 1000,
+            'total_market_cap': {'usd': 2.5e12},
+            'total_volume': {'usd': 1e11},
+            'market_cap_percentage': {'coin-1': 50.0, 'coin-2': 17.0},
+            'market_cap_change_percentage_24h_usd': 1.0,
+            'updated_at': int(time.time()),
+        }}
+    
+    def exchange_rates(self) -> Dict:
+        return {'rates': {
+            'btc': {'name': 'Bitcoin', 'unit': 'BTC', 'value': 1.0, 'type': 'crypto'},
+            'usd': {'name': 'US Dollar', 'unit': '$', 'value': 100000.0, 'type': 'fiat'},
+            'eur': {'name': 'Euro', 'unit': '€', 'value': 92000.0, 'type': 'fiat'},
+            'gbp': {'name': 'British Pound Sterling', 'unit': '£', 'value': 79000.0, 'type': 'fiat'},
+        }}
+    
+    def route(self, path: str, query: Dict[str, List[str]]) -> Optional[object]:
+        """Build the JSON body for a request, or None for an unknown path"""
+        def param(name, default=None):
+            return query.get(name, [default])[0]
+        
+        if path.endswith('/coins/markets'):
+            return self.markets(int(param('page', 1)), int(param('per_page', 100)))
+        
+        chart = CHART_PATH.search(path)
+        if chart:
+            now_ms = int(time.time() * 1000)
+            if chart.group('range'):
+                start_ms, end_ms = int(float(param('from')) * 1000), int(float(param('to')) * 1000)
+            else:
+                days = param('days', '7')
+                days = 365 if days == 'max' else float(days)
+                start_ms, end_ms = now_ms - int(days * MS_PER_DAY), now_ms
+            
+            # Same automatic granularity as the real API: hourly up to 90 days
+            step_ms = MS_PER_DAY if param('interval') == 'daily' or end_ms - start_ms > 90 * MS_PER_DAY else MS_PER_HOUR
+            return self.market_chart(chart.group('coin_id'), start_ms, end_ms, step_ms)
+        
+        if path.endswith('/global'):
+            return self.global_data()
+        if path.endswith('/exchange_rates'):
+            return self.exchange_rates()
+        return None
+    
+    def _handler_class(self):
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, *args):
+                pass
+            
+            def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with fake._lock:
+                    fake.bytes_sent += len(body)
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                time.sleep(fake._delay())
+                
+                if fake._should_throttle():
+                    self._send(429, b'{"status":{"error_code":429}}', {'Retry-After': str(fake.retry_after)})
+                    return
+                
+                body = fake.route(url.path, parse_qs(url.query))
+                if body is None:
+                    self._send(404, b'{"error":"not found"}')
+                    return
+                self._send(200, json.dumps(body).encode())
+        
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=float, default=0, help='Fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=float, default=1, help='Retry-After seconds on 429')
+    args = parser.parse_args()
+    
+    server = FakeCoinGecko(args.port, args.coins, args.latency_ms, args.jitter_ms,
+                           args.throttle_rate, args.retry_after)
+    print(f"Serving fake CoinGecko API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
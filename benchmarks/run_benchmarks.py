@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+End-to-end ETL benchmark against a fake CoinGecko API and a disposable Postgres
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --latency-ms 50 --throttle-rate 0.02
+    python benchmarks/run_benchmarks.py --update-baselines
+
+Starts benchmarks/fake_coingecko.py in-process and a throwaway database (see
+disposable_postgres.py), then runs each pipeline stage once:
+
+    extract_markets    CoinGeckoExtractor.get_market_snapshot
+    extract_history    CoinGeckoExtractor.extract_batch_data
+    transform_history  flatten_historical_data
+    load_markets       DatabaseConnection.insert_cryptocurrency_data
+    load_history       DatabaseConnection.insert_historical_data
+
+and reports rows/s, requests/s, p50/p99 request latency and peak RSS per
+stage. Results are compared with benchmarks/baselines.json, recorded with the
+same scenario options; the run exits with status 1 if any metric is worse
+than its baseline by more than --tolerance.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disposable_postgres import disposable_database
+from fake_coingecko import FakeCoinGecko
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# Metrics compared against baselines and whether higher values are better
+COMPARED_METRICS = {
+    'rows_per_s': True,
+    'requests_per_s': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'peak_rss_mb': False,
+}
+
+# Options that define a scenario; baselines only apply to the same scenario
+SCENARIO_OPTIONS = ('coins', 'history_coins', 'days', 'latency_ms', 'jitter_ms', 'throttle_rate',
+                    'workers')
+
+
+class RssSampler:
+    """Samples this process' resident set size in a background thread"""
+    
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+    
+    def current(self) -> int:
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            # No procfs: fall back to the lifetime peak (kilobytes on Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+    
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+class StageRunner:
+    """Times stages and collects their request latencies and peak RSS"""
+    
+    def __init__(self, server: FakeCoinGecko):
+        self.server = server
+        self.latencies: List[float] = []
+        self.results: Dict[str, Dict[str, float]] = {}
+    
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook; list.append is atomic across worker threads"""
+        self.latencies.append(response.elapsed.total_seconds())
+    
+    def run(self, name: str, stage: Callable[[], int]):
+        self.latencies = []
+        self.server.reset_stats()
+        
+        with RssSampler() as rss:
+            started = time.perf_counter()
+            rows = stage()
+            elapsed = time.perf_counter() - started
+        
+        requests_made = self.server.stats()
+        latencies_ms = np.array(self.latencies) * 1000
+        result = {
+            'seconds': round(elapsed, 3),
+            'rows': rows,
+            'rows_per_s': round(rows / elapsed, 1) if elapsed else 0.0,
+            'requests': requests_made['requests'],
+            'throttled': requests_made['throttled'],
+            'requests_per_s': round(requests_made['requests'] / elapsed, 1) if requests_made['requests'] else None,
+            'p50_ms': round(float(np.percentile(latencies_ms, 50)), 2) if len(latencies_ms) else None,
+            'p99_ms': round(float(np.percentile(latencies_ms, 99)), 2) if len(latencies_ms) else None,
+            'peak_rss_mb': round(rss.peak / 1024 ** 2, 1),
+        }
+        self.results[name] = result
+        return result
+
+
+def run_stages(args, server: FakeCoinGecko) -> Dict[str, Dict[str, float]]:
+    # Imported late so they pick up the environment set in main()
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.utils.db_connection import DatabaseConnection
+    from src.utils.transforms import flatten_historical_data
+    
+    runner = StageRunner(server)
+    extractor = CoinGeckoExtractor(max_workers=args.workers)
+    extractor.session.hooks['response'].append(runner.record_response)
+    db = DatabaseConnection()
+    state = {}
+    
+    def extract_markets():
+        state['coins'] = extractor.get_market_snapshot(limit=args.coins)
+        return len(state['coins'])
+    
+    def extract_history():
+        coin_ids = state['coins'].ids[:args.history_coins]
+        state['history'] = extractor.extract_batch_data(coin_ids, days=args.days)
+        return sum(len(coin.get('prices', [])) for coin in state['history'])
+    
+    def transform_history():
+        return len(flatten_historical_data(state['history']))
+    
+    def load_markets():
+        return db.insert_cryptocurrency_data(state['coins'])
+    
+    def load_history():
+        return db.insert_historical_data(state['history'])
+    
+    try:
+        for name, stage in [
+            ('extract_markets', extract_markets),
+            ('extract_history', extract_history),
+            ('transform_history', transform_history),
+            ('load_markets', load_markets),
+            ('load_history', load_history),
+        ]:
+            result = runner.run(name, stage)
+            print(f"   {name:<18} {result['rows']:>9,} rows {result['seconds']:>8.2f}s "
+                  f"{result['rows_per_s']:>12,.0f} rows/s")
+    finally:
+        db.close_connection()
+    
+    return runner.results
+
+
+def compare(results: Dict, baselines: Dict, tolerance: float) -> List[str]:
+    """
+    Compare stage metrics with baselines
+    
+    Returns:
+        Descriptions of metrics that regressed by more than ``tolerance``
+    """
+    regressions = []
+    for stage, metrics in results.items():
+        baseline = baselines.get(stage, {})
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value, expected = metrics.get(metric), baseline.get(metric)
+            if value is None or not expected:
+                continue
+            
+            change = (value - expected) / expected
+            if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+                regressions.append(f"{stage}.{metric}: {value} vs baseline {expected} ({change:+.0%})")
+    return regressions
+
+
+def print_table(results: Dict, baselines: Dict) -> None:
+    header = f"{'stage':<18} {'rows/s':>12} {'req/s':>9} {'429s':>6} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8}"
+    print(f"\n{header}\n{'-' * len(header)}")
+    
+    def fmt(value, width, spec):
+        return f"{'-':>{width}}" if value is None else f"{value:>{width}{spec}}"
+    
+    for stage, m in results.items():
+        throttled = m['throttled'] if m['requests'] else None
+        print(f"{stage:<18} {fmt(m['rows_per_s'], 12, ',.0f')} {fmt(m['requests_per_s'], 9, ',.1f')} "
+              f"{fmt(throttled, 6, 'd')} "
+              f"{fmt(m['p50_ms'], 8, '.1f')} {fmt(m['p99_ms'], 8, '.1f')} {fmt(m['peak_rss_mb'], 8, '.1f')}")
+        base = baselines.get(stage)
+        if base:
+            print(f"{'  baseline':<18} {fmt(base.get('rows_per_s'), 12, ',.0f')} "
+                  f"{fmt(base.get('requests_per_s'), 9, ',.1f')} {'':>6} {fmt(base.get('p50_ms'), 8, '.1f')} "
+                  f"{fmt(base.get('p99_ms'), 8, '.1f')} {fmt(base.get('peak_rss_mb'), 8, '.1f')}")
+
+
+def load_baselines(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--coins', type=int, default=2000, help='Coins listed and loaded as market data')
+    parser.add_argument('--history-coins', type=int, default=250, help='Coins whose history is extracted')
+    parser.add_argument('--days', type=int, default=365, help='Days of daily history per coin')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Fake API response latency')
+    parser.add_argument('--jitter-ms', type=float, default=10, help='Random extra latency per response')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--workers', type=int, default=8, help='Extractor concurrency')
+    parser.add_argument('--database', choices=['auto', 'cluster', 'scratch'], default='auto',
+                        help='Temporary initdb cluster, scratch database on DB_HOST, or auto')
+    parser.add_argument('--baselines', default=BASELINES_FILE, help='Baselines JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed relative regression (0.5 = 50%%)')
+    parser.add_argument('--update-baselines', action='store_true', help='Record this run as the baseline')
+    parser.add_argument('--output', help='Also write results to this JSON file')
+    args = parser.parse_args()
+    
+    scenario = {option: getattr(args, option) for option in SCENARIO_OPTIONS}
+    
+    with FakeCoinGecko(coins=args.coins, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                       throttle_rate=args.throttle_rate, retry_after=0.1) as server, \
+            disposable_database(args.database) as db_settings:
+        os.environ.update(db_settings)
+        os.environ.update({
+            'COINGECKO_API_URL': server.base_url,
+            'HTTP_CACHE_DIR': '',
+            'API_CALLS_PER_MINUTE': '600000',
+            'API_MAX_RETRIES': '10',
+        })
+        print(f"Fake API at {server.base_url}, database {db_settings['DB_NAME']} on port {db_settings['DB_PORT']}")
+        results = run_stages(args, server)
+    
+    stored = load_baselines(args.baselines)
+    baselines = stored['stages'] if stored and stored.get('scenario') == scenario else {}
+    print_table(results, baselines)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'scenario': scenario, 'stages': results}, f, indent=2)
+    
+    if args.update_baselines:
+        with open(args.baselines, 'w') as f:
+            json.dump({'scenario': scenario, 'stages': results}, f, indent=2)
+            f.write('\n')
+        print(f"\nBaselines written to {args.baselines}")
+        return 0
+    
+    if not baselines:
+        print("\nNo baselines recorded for this scenario; run with --update-baselines to create them")
+        return 0
+    
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} metrics regressed by more than {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"   {regression}")
+        return 1
+    
+    print(f"\n✅ All metrics within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,53 +1,46 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized='incremental',
+    unique_key=['coin_id', 'date'],
+    incremental_strategy='delete+insert',
+    indexes=[{'columns': ['coin_id', 'date'], 'unique': True}]
+) }}
 
-WITH daily_aggregates AS (
+WITH source_data AS (
     SELECT
         coin_id,
+        timestamp,
         date,
-        MIN(price) as low_price,
-        MAX(price) as high_price,
-        AVG(price) as avg_price,
-        SUM(volume) as total_volume,
-        AVG(market_cap) as avg_market_cap,
-        COUNT(*) as price_points
+        price,
+        volume,
+        market_cap
     FROM {{ ref('stg_historical_data') }}
-    GROUP BY coin_id, date
+    
+    {% if is_incremental() %}
+    -- Only reprocess days at or after the last loaded day, minus a lookback
+    -- for late-arriving points. Filtering on timestamp lets Postgres prune
+    -- raw_data.historical_data partitions.
+    WHERE timestamp >= (
+        SELECT COALESCE(MAX(date), DATE '{{ var("start_date") }}') - {{ var('incremental_lookback_days') }}
+        FROM {{ this }}
+    )
+    {% endif %}
 ),
 
 daily_ohlc AS (
+    -- Single pass: open/close come from ordered aggregates in the same GROUP BY
     SELECT
         coin_id,
         date,
-        
-        -- Window functions to get open/close prices
-        FIRST_VALUE(price) OVER (
-            PARTITION BY coin_id, date 
-            ORDER BY timestamp ASC 
-            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-        ) as open_price,
-        LAST_VALUE(price) OVER (
-            PARTITION BY coin_id, date 
-            ORDER BY timestamp ASC 
-            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
-        ) as close_price
-    FROM {{ ref('stg_historical_data') }}
-),
-
-combined_data AS (
-    SELECT DISTINCT
-        o.coin_id,
-        o.date,
-        a.low_price,
-        a.high_price,
-        a.avg_price,
-        a.total_volume,
-        a.avg_market_cap,
-        a.price_points,
-        o.open_price,
-        o.close_price
-    FROM daily_ohlc o
-    JOIN daily_aggregates a 
-        ON o.coin_id = a.coin_id AND o.date = a.date
+        (ARRAY_AGG(price ORDER BY timestamp ASC))[1] as open_price,
+        (ARRAY_AGG(price ORDER BY timestamp DESC))[1] as close_price,
+        MIN(price) as low_price,
+        MAX(price) as high_price,
+        AVG(price) as avg_price,
+        SUM(volume) as total_volume,
+        AVG(market_cap) as avg_market_cap,
+        COUNT(*) as price_points
+    FROM source_data
+    GROUP BY coin_id, date
 ),
 
 final AS (
@@ -73,8 +66,7 @@ final AS (
             THEN (high_price - low_price) / avg_price * 100 
             ELSE NULL 
         END as daily_volatility
-    FROM combined_data
+    FROM daily_ohlc
 )
 
 SELECT * FROM final
-ORDER BY coin_id, date
@@ -1,4 +1,16 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key=['coin_id', 'date'],
+    incremental_strategy='delete+insert',
+    indexes=[{'columns': ['coin_id', 'date'], 'unique': True}]
+) }}
+
+{% if is_incremental() %}
+-- First day to (re)write: the last loaded day minus a lookback for late data
+{% set window_start %}
+    (SELECT COALESCE(MAX(date), DATE '{{ var("start_date") }}') - {{ var('incremental_lookback_days') }} FROM {{ this }})
+{% endset %}
+{% endif %}
 
 WITH latest_daily_data AS (
     SELECT
@@ -21,6 +33,11 @@ WITH latest_daily_data AS (
         
     FROM {{ ref('stg_cryptocurrency_data') }}
     WHERE is_valid_record = TRUE
+    
+    {% if is_incremental() %}
+    -- Read enough earlier days for the 30-day LAG and 7-day volatility windows
+    AND extraction_date >= {{ window_start }} - {{ var('incremental_context_days') }}
+    {% endif %}
 ),
 
 daily_metrics AS (
@@ -94,6 +111,11 @@ final AS (
         CURRENT_TIMESTAMP as created_at
         
     FROM with_additional_metrics
+    
+    {% if is_incremental() %}
+    -- Context days only feed the window functions; they are already loaded
+    WHERE date >= {{ window_start }}
+    {% endif %}
 )
 
 SELECT * FROM final
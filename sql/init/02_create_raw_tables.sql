@@ -1,4 +1,5 @@
--- Raw cryptocurrency market data table
+-- Raw cryptocurrency market data table, range-partitioned by month on
+-- extracted_at (partitions are managed in 08_create_partitions.sql)
 CREATE TABLE IF NOT EXISTS raw_data.cryptocurrency_data (
     id VARCHAR(100),
     symbol VARCHAR(20),
@@ -28,18 +29,35 @@ CREATE TABLE IF NOT EXISTS raw_data.cryptocurrency_data (
     last_updated TIMESTAMP,
     extracted_at TIMESTAMP NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+) PARTITION BY RANGE (extracted_at);
 
--- Raw historical price data table
+-- Raw historical price data table, range-partitioned by month on timestamp
+-- (the primary key must include the partition key)
 CREATE TABLE IF NOT EXISTS raw_data.historical_data (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     coin_id VARCHAR(100) NOT NULL,
     timestamp TIMESTAMP NOT NULL,
     price DECIMAL(20, 8),
     market_cap BIGINT,
     volume BIGINT,
     extracted_at TIMESTAMP NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catch-all partitions so a load never fails for a month that hasn't been
+-- created yet; create_monthly_partition() moves such rows out again
+CREATE TABLE IF NOT EXISTS raw_data.cryptocurrency_data_default
+    PARTITION OF raw_data.cryptocurrency_data DEFAULT;
+CREATE TABLE IF NOT EXISTS raw_data.historical_data_default
+    PARTITION OF raw_data.historical_data DEFAULT;
+
+-- Newest extracted_at loaded into each raw table, maintained at load time so
+-- freshness checks don't scan the raw tables
+CREATE TABLE IF NOT EXISTS raw_data.extraction_watermarks (
+    table_name VARCHAR(100) PRIMARY KEY,
+    last_extracted_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Raw global market data table
@@ -59,10 +77,24 @@ CREATE TABLE IF NOT EXISTS raw_data.global_market_data (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Exchange rates from /exchange_rates, one row per currency and day (the
+-- day's latest fetch); values in other currencies are derived from USD
+CREATE TABLE IF NOT EXISTS raw_data.exchange_rates (
+    currency VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    name VARCHAR(100),
+    unit VARCHAR(20),
+    rate_type VARCHAR(20), -- 'fiat', 'crypto', 'commodity'
+    btc_rate DECIMAL(30, 10), -- Units of the currency per BTC, as returned
+    usd_rate DECIMAL(38, 18), -- Units of the currency per USD
+    extracted_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (currency, date)
+);
+
 -- Data extraction log table
 CREATE TABLE IF NOT EXISTS raw_data.extraction_log (
     id SERIAL PRIMARY KEY,
-    extraction_type VARCHAR(50) NOT NULL, -- 'market_data', 'historical', 'global'
+    extraction_type VARCHAR(50) NOT NULL, -- 'market_data', 'historical', 'global', 'exchange_rates'
     status VARCHAR(20) NOT NULL, -- 'success', 'failed', 'partial'
     records_extracted INTEGER,
     records_inserted INTEGER,
@@ -77,4 +109,6 @@ CREATE TABLE IF NOT EXISTS raw_data.extraction_log (
 COMMENT ON TABLE raw_data.cryptocurrency_data IS 'Raw cryptocurrency market data from CoinGecko API';
 COMMENT ON TABLE raw_data.historical_data IS 'Raw historical price and volume data';
 COMMENT ON TABLE raw_data.global_market_data IS 'Raw global cryptocurrency market statistics';
+COMMENT ON TABLE raw_data.exchange_rates IS 'Daily exchange rates used to report in currencies other than USD';
+COMMENT ON TABLE raw_data.extraction_watermarks IS 'Latest extraction time loaded into each raw table';
 COMMENT ON TABLE raw_data.extraction_log IS 'Log of all data extraction operations';
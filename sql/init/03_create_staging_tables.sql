@@ -30,6 +30,8 @@ CREATE TABLE IF NOT EXISTS staging.daily_prices (
     id SERIAL PRIMARY KEY,
     coin_id VARCHAR(100) NOT NULL,
     date DATE NOT NULL,
+    open_time TIMESTAMP,  -- Timestamps of the points behind open/close, so
+    close_time TIMESTAMP, -- partial days can be extended by later batches
     open_price DECIMAL(20, 8),
     high_price DECIMAL(20, 8),
     low_price DECIMAL(20, 8),
@@ -33,6 +33,42 @@ CREATE TABLE IF NOT EXISTS analytics.fact_daily_metrics (
     UNIQUE(coin_id, date)
 );
 
+-- Newest market snapshot per coin, upserted by every market data load
+CREATE TABLE IF NOT EXISTS analytics.latest_prices (
+    coin_id VARCHAR(100) PRIMARY KEY,
+    symbol VARCHAR(20),
+    name VARCHAR(200),
+    current_price DECIMAL(20, 8),
+    market_cap BIGINT,
+    market_cap_rank INTEGER,
+    total_volume BIGINT,
+    high_24h DECIMAL(20, 8),
+    low_24h DECIMAL(20, 8),
+    price_change_24h DECIMAL(20, 8),
+    price_change_percentage_24h DECIMAL(10, 4),
+    circulating_supply BIGINT,
+    last_updated TIMESTAMP,
+    extracted_at TIMESTAMP NOT NULL
+);
+
+-- Rolling per-coin metrics computed from staging.daily_prices by
+-- src/utils/market_metrics.py
+CREATE TABLE IF NOT EXISTS analytics.coin_daily_metrics (
+    coin_id VARCHAR(100) NOT NULL,
+    date DATE NOT NULL,
+    close_price DECIMAL(20, 8),
+    return_1d DECIMAL(10, 4),
+    moving_average_7d DECIMAL(20, 8),
+    moving_average_30d DECIMAL(20, 8),
+    volatility_7d DECIMAL(10, 4),
+    volatility_30d DECIMAL(10, 4),
+    price_change_percentage_7d DECIMAL(10, 4),
+    price_change_percentage_30d DECIMAL(10, 4),
+    volume_to_market_cap_ratio DECIMAL(10, 6),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (coin_id, date)
+);
+
 -- Aggregated market performance table
 CREATE TABLE IF NOT EXISTS analytics.market_performance (
     id SERIAL PRIMARY KEY,
@@ -64,5 +100,7 @@ CREATE TABLE IF NOT EXISTS analytics.daily_top_performers (
 -- Comments
 COMMENT ON TABLE analytics.dim_cryptocurrencies IS 'Master dimension table for cryptocurrencies';
 COMMENT ON TABLE analytics.fact_daily_metrics IS 'Daily metrics and KPIs for each cryptocurrency';
+COMMENT ON TABLE analytics.latest_prices IS 'Most recently extracted market data for each cryptocurrency';
+COMMENT ON TABLE analytics.coin_daily_metrics IS 'Daily returns, moving averages, volatility and volume ratios per cryptocurrency';
 COMMENT ON TABLE analytics.market_performance IS 'Overall market performance and dominance metrics';
 COMMENT ON TABLE analytics.daily_top_performers IS 'Daily top gainers, losers, and volume leaders';
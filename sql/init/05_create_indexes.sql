@@ -19,6 +19,8 @@ CREATE INDEX IF NOT EXISTS idx_fact_daily_date ON analytics.fact_daily_metrics(d
 CREATE INDEX IF NOT EXISTS idx_fact_daily_coin_date ON analytics.fact_daily_metrics(coin_id, date DESC);
 CREATE INDEX IF NOT EXISTS idx_fact_daily_rank ON analytics.fact_daily_metrics(market_cap_rank);
 
+CREATE INDEX IF NOT EXISTS idx_latest_prices_rank ON analytics.latest_prices(market_cap_rank);
+
 CREATE INDEX IF NOT EXISTS idx_market_performance_date ON analytics.market_performance(date DESC);
 CREATE INDEX IF NOT EXISTS idx_top_performers_date_type ON analytics.daily_top_performers(date DESC, performance_type);
 
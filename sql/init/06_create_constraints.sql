@@ -39,3 +39,8 @@ ADD CONSTRAINT chk_dominance_values CHECK (
     bitcoin_dominance >= 0 AND bitcoin_dominance <= 100 AND
     ethereum_dominance >= 0 AND ethereum_dominance <= 100
 );
+
+-- One row per coin and point in time, so reloads of overlapping windows merge
+-- instead of duplicating (see DatabaseConnection upsert loads)
+ALTER TABLE raw_data.historical_data 
+ADD CONSTRAINT uq_historical_coin_timestamp UNIQUE (coin_id, timestamp);
@@ -2,49 +2,40 @@
 CREATE OR REPLACE FUNCTION get_latest_extraction_time()
 RETURNS TIMESTAMP AS $$
 BEGIN
-    RETURN (SELECT MAX(extracted_at) FROM raw_data.cryptocurrency_data);
+    RETURN (
+        SELECT last_extracted_at
+        FROM raw_data.extraction_watermarks
+        WHERE table_name = 'raw_data.cryptocurrency_data'
+    );
 END;
 $$ LANGUAGE plpgsql;
 
--- Function to calculate price volatility
+-- Function to calculate price volatility: population standard deviation
+-- as a percentage of the mean, in one aggregate pass over the array. For
+-- many coins at once aggregate the rows directly, e.g.
+--   SELECT coin_id, stddev_pop(close_price) / NULLIF(avg(close_price), 0) * 100
+--   FROM staging.daily_prices GROUP BY coin_id;
 CREATE OR REPLACE FUNCTION calculate_volatility(prices DECIMAL[])
 RETURNS DECIMAL AS $$
-DECLARE
-    avg_price DECIMAL;
-    variance DECIMAL := 0;
-    price DECIMAL;
-BEGIN
-    -- Calculate average
-    SELECT AVG(unnest) INTO avg_price FROM unnest(prices);
-    
-    -- Calculate variance
-    FOR price IN SELECT unnest(prices) LOOP
-        variance := variance + POWER(price - avg_price, 2);
-    END LOOP;
-    
-    variance := variance / array_length(prices, 1);
-    
-    -- Return standard deviation as percentage
-    RETURN SQRT(variance) / avg_price * 100;
-END;
-$$ LANGUAGE plpgsql;
+    SELECT stddev_pop(price) / NULLIF(avg(price), 0) * 100
+    FROM unnest(prices) AS price;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
 
 -- View for latest cryptocurrency prices
+-- (reads the per-coin latest_prices table maintained at load time)
 CREATE OR REPLACE VIEW analytics.v_latest_prices AS
 SELECT 
-    d.coin_id,
-    d.symbol,
-    d.name,
-    f.price_usd,
-    f.market_cap_usd,
-    f.volume_24h_usd,
-    f.market_cap_rank,
-    f.price_change_percentage_24h,
-    f.date as last_updated
-FROM analytics.dim_cryptocurrencies d
-JOIN analytics.fact_daily_metrics f ON d.coin_id = f.coin_id
-WHERE f.date = (SELECT MAX(date) FROM analytics.fact_daily_metrics WHERE coin_id = f.coin_id)
-ORDER BY f.market_cap_rank;
+    coin_id,
+    symbol,
+    name,
+    current_price as price_usd,
+    market_cap as market_cap_usd,
+    total_volume as volume_24h_usd,
+    market_cap_rank,
+    price_change_percentage_24h,
+    DATE(extracted_at) as last_updated
+FROM analytics.latest_prices
+ORDER BY market_cap_rank;
 
 -- View for top gainers/losers
 CREATE OR REPLACE VIEW analytics.v_daily_movers AS
@@ -71,7 +62,68 @@ SELECT
 FROM analytics.market_performance
 ORDER BY date DESC;
 
+-- Latest cached exchange rate per currency
+CREATE OR REPLACE VIEW analytics.v_exchange_rates AS
+SELECT DISTINCT ON (currency)
+    currency,
+    name,
+    unit,
+    rate_type,
+    usd_rate,
+    date,
+    extracted_at
+FROM raw_data.exchange_rates
+ORDER BY currency, date DESC;
+
+-- Latest prices in every cached currency (filter on currency); converted
+-- from the USD snapshot, so a reporting currency costs no API calls
+CREATE OR REPLACE VIEW analytics.v_latest_prices_by_currency AS
+SELECT 
+    p.coin_id,
+    p.symbol,
+    p.name,
+    r.currency,
+    p.current_price * r.usd_rate as price,
+    p.market_cap * r.usd_rate as market_cap,
+    p.total_volume * r.usd_rate as volume_24h,
+    p.high_24h * r.usd_rate as high_24h,
+    p.low_24h * r.usd_rate as low_24h,
+    p.price_change_24h * r.usd_rate as price_change_24h,
+    p.price_change_percentage_24h,
+    p.market_cap_rank,
+    r.extracted_at as rate_extracted_at
+FROM analytics.latest_prices p
+CROSS JOIN analytics.v_exchange_rates r;
+
+-- Daily OHLCV in every cached currency at each day's rate (the latest rate
+-- on or before the day; days before the first stored rate use the earliest)
+CREATE OR REPLACE VIEW analytics.v_daily_prices_by_currency AS
+WITH rates AS (
+    SELECT
+        currency,
+        usd_rate,
+        CASE WHEN ROW_NUMBER() OVER w = 1 THEN DATE '-infinity' ELSE date END as valid_from,
+        COALESCE(LEAD(date) OVER w, DATE 'infinity') as valid_to
+    FROM raw_data.exchange_rates
+    WINDOW w AS (PARTITION BY currency ORDER BY date)
+)
+SELECT 
+    d.coin_id,
+    d.date,
+    r.currency,
+    d.open_price * r.usd_rate as open_price,
+    d.high_price * r.usd_rate as high_price,
+    d.low_price * r.usd_rate as low_price,
+    d.close_price * r.usd_rate as close_price,
+    d.volume * r.usd_rate as volume,
+    d.market_cap * r.usd_rate as market_cap
+FROM staging.daily_prices d
+JOIN rates r ON d.date >= r.valid_from AND d.date < r.valid_to;
+
 -- Comments on views
 COMMENT ON VIEW analytics.v_latest_prices IS 'Latest prices and market data for all cryptocurrencies';
 COMMENT ON VIEW analytics.v_daily_movers IS 'Daily top gainers and losers';
 COMMENT ON VIEW analytics.v_market_overview IS 'Overall market performance metrics';
+COMMENT ON VIEW analytics.v_exchange_rates IS 'Latest cached exchange rate per currency';
+COMMENT ON VIEW analytics.v_latest_prices_by_currency IS 'Latest prices converted to every cached currency';
+COMMENT ON VIEW analytics.v_daily_prices_by_currency IS 'Daily OHLCV converted to every cached currency at the rate of the day';
@@ -0,0 +1,119 @@
+-- Monthly partition management for the raw tables.
+-- DatabaseConnection.maintain_partitions() calls these functions before each
+-- load to pre-create upcoming months and retire months past retention.
+
+-- Create (or adopt rows from the default partition into) one monthly partition
+CREATE OR REPLACE FUNCTION raw_data.create_monthly_partition(parent_table TEXT, month_start DATE)
+RETURNS TEXT AS $$
+DECLARE
+    parent_schema TEXT := split_part(parent_table, '.', 1);
+    parent_name TEXT := split_part(parent_table, '.', 2);
+    range_start DATE := date_trunc('month', month_start)::DATE;
+    range_end DATE := (date_trunc('month', month_start) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := parent_name || '_' || to_char(range_start, 'YYYY_MM');
+    default_name TEXT := parent_name || '_default';
+    partition_key TEXT;
+BEGIN
+    IF to_regclass(format('%I.%I', parent_schema, partition_name)) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    -- e.g. 'RANGE ("timestamp")' -> '"timestamp"'
+    partition_key := substring(pg_get_partkeydef(parent_table::regclass) FROM '\((.*)\)');
+
+    EXECUTE format(
+        'CREATE TABLE %I.%I (LIKE %I.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        parent_schema, partition_name, parent_schema, parent_name
+    );
+
+    -- Rows for this month that landed in the default partition must move
+    -- before the range can be attached
+    IF to_regclass(format('%I.%I', parent_schema, default_name)) IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I.%I WHERE %s >= %L AND %s < %L RETURNING *) '
+            'INSERT INTO %I.%I SELECT * FROM moved',
+            parent_schema, default_name, partition_key, range_start, partition_key, range_end,
+            parent_schema, partition_name
+        );
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE %I.%I ATTACH PARTITION %I.%I FOR VALUES FROM (%L) TO (%L)',
+        parent_schema, parent_name, parent_schema, partition_name, range_start, range_end
+    );
+
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create partitions from months_back months ago through months_ahead months ahead
+CREATE OR REPLACE FUNCTION raw_data.ensure_monthly_partitions(
+    parent_table TEXT, months_back INTEGER, months_ahead INTEGER
+)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    month_offset INTEGER;
+BEGIN
+    FOR month_offset IN -months_back..months_ahead LOOP
+        RETURN NEXT raw_data.create_monthly_partition(
+            parent_table,
+            (date_trunc('month', CURRENT_DATE) + make_interval(months => month_offset))::DATE
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detach (and unless detach_only, drop) partitions whose whole month is older
+-- than retain_months; retention becomes a metadata-only operation
+CREATE OR REPLACE FUNCTION raw_data.drop_expired_partitions(
+    parent_table TEXT, retain_months INTEGER, detach_only BOOLEAN DEFAULT FALSE
+)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    parent_schema TEXT := split_part(parent_table, '.', 1);
+    default_name TEXT := split_part(parent_table, '.', 2) || '_default';
+    cutoff DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => retain_months))::DATE;
+    child RECORD;
+BEGIN
+    -- Stray expired rows in the default partition (normally empty) are deleted
+    IF NOT detach_only AND to_regclass(format('%I.%I', parent_schema, default_name)) IS NOT NULL THEN
+        EXECUTE format(
+            'DELETE FROM %I.%I WHERE %s < %L',
+            parent_schema, default_name,
+            substring(pg_get_partkeydef(parent_table::regclass) FROM '\((.*)\)'), cutoff
+        );
+    END IF;
+
+    FOR child IN
+        SELECT c.relname,
+               to_date(substring(c.relname FROM '_(\d{4}_\d{2})$'), 'YYYY_MM') as month_start
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = parent_table::regclass
+          AND c.relname ~ '_\d{4}_\d{2}$'
+    LOOP
+        -- A partition covers [month_start, month_start + 1 month)
+        IF child.month_start + INTERVAL '1 month' <= cutoff THEN
+            EXECUTE format('ALTER TABLE %s DETACH PARTITION %I.%I', parent_table, parent_schema, child.relname);
+            IF NOT detach_only THEN
+                EXECUTE format('DROP TABLE %I.%I', parent_schema, child.relname);
+            END IF;
+            RETURN NEXT child.relname;
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for the recent past and the next few months (skipped on
+-- databases whose raw tables predate partitioning; see
+-- sql/migrations/002_partition_raw_tables.sql)
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'raw_data.cryptocurrency_data'::regclass) = 'p' THEN
+        PERFORM raw_data.ensure_monthly_partitions('raw_data.cryptocurrency_data', 1, 2);
+    END IF;
+    IF (SELECT relkind FROM pg_class WHERE oid = 'raw_data.historical_data'::regclass) = 'p' THEN
+        PERFORM raw_data.ensure_monthly_partitions('raw_data.historical_data', 12, 2);
+    END IF;
+END;
+$$;
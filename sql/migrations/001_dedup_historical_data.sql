@@ -0,0 +1,29 @@
+-- One-off migration for databases created before uq_historical_coin_timestamp
+-- existed: remove duplicate (coin_id, timestamp) rows left behind by repeated
+-- extractions, then add the unique constraint used by upsert loads.
+--
+-- Usage: psql -d coingecko_db -f sql/migrations/001_dedup_historical_data.sql
+
+BEGIN;
+
+-- Keep the most recently extracted row for each coin and timestamp
+DELETE FROM raw_data.historical_data h
+USING (
+    SELECT
+        id,
+        ROW_NUMBER() OVER (
+            PARTITION BY coin_id, timestamp
+            ORDER BY extracted_at DESC, id DESC
+        ) as rn
+    FROM raw_data.historical_data
+) ranked
+WHERE h.id = ranked.id
+  AND ranked.rn > 1;
+
+ALTER TABLE raw_data.historical_data 
+ADD CONSTRAINT uq_historical_coin_timestamp UNIQUE (coin_id, timestamp);
+
+COMMIT;
+
+-- Reclaim the space held by deleted rows and refresh planner statistics
+VACUUM (ANALYZE) raw_data.historical_data;
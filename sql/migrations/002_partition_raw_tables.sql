@@ -0,0 +1,69 @@
+-- One-off migration converting raw_data.cryptocurrency_data and
+-- raw_data.historical_data into monthly range-partitioned tables.
+--
+-- Run after 001_dedup_historical_data.sql and after loading
+-- sql/init/08_create_partitions.sql (for the partition functions):
+--   psql -d coingecko_db -f sql/init/08_create_partitions.sql
+--   psql -d coingecko_db -f sql/migrations/002_partition_raw_tables.sql
+--
+-- The dbt staging views depend on the raw tables and are dropped with them;
+-- rebuild them with `dbt run` afterwards.
+
+BEGIN;
+
+ALTER TABLE raw_data.cryptocurrency_data RENAME TO cryptocurrency_data_unpartitioned;
+ALTER TABLE raw_data.historical_data RENAME TO historical_data_unpartitioned;
+
+CREATE TABLE raw_data.cryptocurrency_data (
+    LIKE raw_data.cryptocurrency_data_unpartitioned INCLUDING DEFAULTS
+) PARTITION BY RANGE (extracted_at);
+
+CREATE TABLE raw_data.historical_data (
+    LIKE raw_data.historical_data_unpartitioned INCLUDING DEFAULTS,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE raw_data.cryptocurrency_data_default
+    PARTITION OF raw_data.cryptocurrency_data DEFAULT;
+CREATE TABLE raw_data.historical_data_default
+    PARTITION OF raw_data.historical_data DEFAULT;
+
+-- One partition per month present in the existing data, plus the usual window
+SELECT raw_data.create_monthly_partition('raw_data.cryptocurrency_data', month_start::DATE)
+FROM (SELECT DISTINCT date_trunc('month', extracted_at) as month_start
+      FROM raw_data.cryptocurrency_data_unpartitioned) months;
+SELECT raw_data.create_monthly_partition('raw_data.historical_data', month_start::DATE)
+FROM (SELECT DISTINCT date_trunc('month', timestamp) as month_start
+      FROM raw_data.historical_data_unpartitioned) months;
+SELECT raw_data.ensure_monthly_partitions('raw_data.cryptocurrency_data', 1, 2);
+SELECT raw_data.ensure_monthly_partitions('raw_data.historical_data', 12, 2);
+
+INSERT INTO raw_data.cryptocurrency_data SELECT * FROM raw_data.cryptocurrency_data_unpartitioned;
+INSERT INTO raw_data.historical_data SELECT * FROM raw_data.historical_data_unpartitioned;
+
+-- Keep the id sequence with the new table
+ALTER SEQUENCE raw_data.historical_data_id_seq OWNED BY raw_data.historical_data.id;
+
+DROP TABLE raw_data.cryptocurrency_data_unpartitioned CASCADE;
+DROP TABLE raw_data.historical_data_unpartitioned CASCADE;
+
+-- Indexes and constraints from 05/06, now defined on the partitioned parents
+CREATE INDEX idx_raw_crypto_extracted_at ON raw_data.cryptocurrency_data(extracted_at DESC);
+CREATE INDEX idx_raw_crypto_coin_id ON raw_data.cryptocurrency_data(id);
+CREATE INDEX idx_raw_crypto_rank ON raw_data.cryptocurrency_data(market_cap_rank);
+CREATE INDEX idx_raw_historical_coin_timestamp ON raw_data.historical_data(coin_id, timestamp DESC);
+CREATE INDEX idx_raw_historical_extracted_at ON raw_data.historical_data(extracted_at DESC);
+
+ALTER TABLE raw_data.cryptocurrency_data ADD CONSTRAINT chk_positive_price CHECK (current_price >= 0);
+ALTER TABLE raw_data.cryptocurrency_data ADD CONSTRAINT chk_positive_market_cap CHECK (market_cap >= 0);
+ALTER TABLE raw_data.cryptocurrency_data ADD CONSTRAINT chk_valid_rank CHECK (market_cap_rank > 0);
+ALTER TABLE raw_data.historical_data
+ADD CONSTRAINT uq_historical_coin_timestamp UNIQUE (coin_id, timestamp);
+
+COMMENT ON TABLE raw_data.cryptocurrency_data IS 'Raw cryptocurrency market data from CoinGecko API';
+COMMENT ON TABLE raw_data.historical_data IS 'Raw historical price and volume data';
+
+COMMIT;
+
+ANALYZE raw_data.cryptocurrency_data;
+ANALYZE raw_data.historical_data;
@@ -0,0 +1,65 @@
+-- One-off migration adding the open/close point timestamps used by
+-- src/utils/daily_rollup.py to staging.daily_prices, then backfilling daily
+-- bars from the history already in raw_data.historical_data.
+--
+-- Usage: psql -d coingecko_db -f sql/migrations/003_daily_prices_rollup.sql
+
+BEGIN;
+
+ALTER TABLE staging.daily_prices ADD COLUMN IF NOT EXISTS open_time TIMESTAMP;
+ALTER TABLE staging.daily_prices ADD COLUMN IF NOT EXISTS close_time TIMESTAMP;
+
+-- Same bars DailyRollup builds: open/close from the first/last point of the
+-- day, volume and market cap as of the close
+INSERT INTO staging.daily_prices AS bar (
+    coin_id, date, open_time, open_price, high_price, low_price,
+    close_time, close_price, volume, market_cap, price_change, price_change_percentage
+)
+SELECT
+    coin_id,
+    date,
+    open_time,
+    open_price,
+    high_price,
+    low_price,
+    close_time,
+    close_price,
+    volume,
+    market_cap,
+    close_price - open_price,
+    CASE
+        WHEN open_price > 0 AND ABS((close_price - open_price) / open_price * 100) < 1e6
+        THEN (close_price - open_price) / open_price * 100
+        ELSE NULL
+    END
+FROM (
+    SELECT
+        coin_id,
+        DATE(timestamp) as date,
+        MIN(timestamp) as open_time,
+        (ARRAY_AGG(price ORDER BY timestamp ASC))[1] as open_price,
+        MAX(price) as high_price,
+        MIN(price) as low_price,
+        MAX(timestamp) as close_time,
+        (ARRAY_AGG(price ORDER BY timestamp DESC))[1] as close_price,
+        (ARRAY_AGG(volume ORDER BY timestamp DESC))[1] as volume,
+        (ARRAY_AGG(market_cap ORDER BY timestamp DESC))[1] as market_cap
+    FROM raw_data.historical_data
+    WHERE price IS NOT NULL
+    GROUP BY coin_id, DATE(timestamp)
+) daily
+ON CONFLICT (coin_id, date) DO UPDATE SET
+    open_time = EXCLUDED.open_time,
+    open_price = EXCLUDED.open_price,
+    high_price = EXCLUDED.high_price,
+    low_price = EXCLUDED.low_price,
+    close_time = EXCLUDED.close_time,
+    close_price = EXCLUDED.close_price,
+    volume = EXCLUDED.volume,
+    market_cap = EXCLUDED.market_cap,
+    price_change = EXCLUDED.price_change,
+    price_change_percentage = EXCLUDED.price_change_percentage;
+
+COMMIT;
+
+ANALYZE staging.daily_prices;
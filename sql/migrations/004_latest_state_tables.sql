@@ -0,0 +1,81 @@
+-- One-off migration adding the load-time latest-state tables
+-- (analytics.latest_prices, raw_data.extraction_watermarks), seeding them
+-- from the raw tables and switching v_latest_prices and
+-- get_latest_extraction_time() over to them.
+--
+-- Usage: psql -d coingecko_db -f sql/migrations/004_latest_state_tables.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS raw_data.extraction_watermarks (
+    table_name VARCHAR(100) PRIMARY KEY,
+    last_extracted_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS analytics.latest_prices (
+    coin_id VARCHAR(100) PRIMARY KEY,
+    symbol VARCHAR(20),
+    name VARCHAR(200),
+    current_price DECIMAL(20, 8),
+    market_cap BIGINT,
+    market_cap_rank INTEGER,
+    total_volume BIGINT,
+    high_24h DECIMAL(20, 8),
+    low_24h DECIMAL(20, 8),
+    price_change_24h DECIMAL(20, 8),
+    price_change_percentage_24h DECIMAL(10, 4),
+    circulating_supply BIGINT,
+    last_updated TIMESTAMP,
+    extracted_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_latest_prices_rank ON analytics.latest_prices(market_cap_rank);
+
+INSERT INTO analytics.latest_prices
+SELECT DISTINCT ON (id)
+    id, symbol, name, current_price, market_cap, market_cap_rank, total_volume,
+    high_24h, low_24h, price_change_24h, price_change_percentage_24h,
+    circulating_supply, last_updated, extracted_at
+FROM raw_data.cryptocurrency_data
+WHERE id IS NOT NULL
+ORDER BY id, extracted_at DESC
+ON CONFLICT (coin_id) DO NOTHING;
+
+INSERT INTO raw_data.extraction_watermarks (table_name, last_extracted_at)
+SELECT 'raw_data.cryptocurrency_data', MAX(extracted_at) FROM raw_data.cryptocurrency_data
+HAVING MAX(extracted_at) IS NOT NULL
+UNION ALL
+SELECT 'raw_data.historical_data', MAX(extracted_at) FROM raw_data.historical_data
+HAVING MAX(extracted_at) IS NOT NULL
+ON CONFLICT (table_name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION get_latest_extraction_time()
+RETURNS TIMESTAMP AS $$
+BEGIN
+    RETURN (
+        SELECT last_extracted_at
+        FROM raw_data.extraction_watermarks
+        WHERE table_name = 'raw_data.cryptocurrency_data'
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE VIEW analytics.v_latest_prices AS
+SELECT 
+    coin_id,
+    symbol,
+    name,
+    current_price as price_usd,
+    market_cap as market_cap_usd,
+    total_volume as volume_24h_usd,
+    market_cap_rank,
+    price_change_percentage_24h,
+    DATE(extracted_at) as last_updated
+FROM analytics.latest_prices
+ORDER BY market_cap_rank;
+
+COMMENT ON TABLE raw_data.extraction_watermarks IS 'Latest extraction time loaded into each raw table';
+COMMENT ON TABLE analytics.latest_prices IS 'Most recently extracted market data for each cryptocurrency';
+
+COMMIT;
@@ -0,0 +1,36 @@
+-- One-off migration adding analytics.coin_daily_metrics (filled by
+-- src/utils/market_metrics.py) and replacing the row-looping PL/pgSQL
+-- calculate_volatility() with a single-pass SQL aggregate.
+--
+-- Usage: psql -d coingecko_db -f sql/migrations/005_coin_daily_metrics.sql
+-- Then fill the table: python src/cli.py refresh-metrics --full
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS analytics.coin_daily_metrics (
+    coin_id VARCHAR(100) NOT NULL,
+    date DATE NOT NULL,
+    close_price DECIMAL(20, 8),
+    return_1d DECIMAL(10, 4),
+    moving_average_7d DECIMAL(20, 8),
+    moving_average_30d DECIMAL(20, 8),
+    volatility_7d DECIMAL(10, 4),
+    volatility_30d DECIMAL(10, 4),
+    price_change_percentage_7d DECIMAL(10, 4),
+    price_change_percentage_30d DECIMAL(10, 4),
+    volume_to_market_cap_ratio DECIMAL(10, 6),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (coin_id, date)
+);
+
+COMMENT ON TABLE analytics.coin_daily_metrics IS 'Daily returns, moving averages, volatility and volume ratios per cryptocurrency';
+
+-- Same result as before (population stddev / mean * 100), NULL instead of a
+-- division error when the mean is zero
+CREATE OR REPLACE FUNCTION calculate_volatility(prices DECIMAL[])
+RETURNS DECIMAL AS $$
+    SELECT stddev_pop(price) / NULLIF(avg(price), 0) * 100
+    FROM unnest(prices) AS price;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+COMMIT;
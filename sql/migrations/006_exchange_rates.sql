@@ -0,0 +1,86 @@
+-- One-off migration adding the exchange-rate cache (raw_data.exchange_rates,
+-- filled from /exchange_rates by src/utils/exchange_rates.py) and the views
+-- that report prices in every cached currency.
+--
+-- Usage: psql -d coingecko_db -f sql/migrations/006_exchange_rates.sql
+-- Then load the first rates: python src/cli.py extract-rates
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS raw_data.exchange_rates (
+    currency VARCHAR(10) NOT NULL,
+    date DATE NOT NULL,
+    name VARCHAR(100),
+    unit VARCHAR(20),
+    rate_type VARCHAR(20), -- 'fiat', 'crypto', 'commodity'
+    btc_rate DECIMAL(30, 10), -- Units of the currency per BTC, as returned
+    usd_rate DECIMAL(38, 18), -- Units of the currency per USD
+    extracted_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (currency, date)
+);
+
+COMMENT ON TABLE raw_data.exchange_rates IS 'Daily exchange rates used to report in currencies other than USD';
+
+-- Latest cached exchange rate per currency
+CREATE OR REPLACE VIEW analytics.v_exchange_rates AS
+SELECT DISTINCT ON (currency)
+    currency,
+    name,
+    unit,
+    rate_type,
+    usd_rate,
+    date,
+    extracted_at
+FROM raw_data.exchange_rates
+ORDER BY currency, date DESC;
+
+-- Latest prices in every cached currency (filter on currency); converted
+-- from the USD snapshot, so a reporting currency costs no API calls
+CREATE OR REPLACE VIEW analytics.v_latest_prices_by_currency AS
+SELECT 
+    p.coin_id,
+    p.symbol,
+    p.name,
+    r.currency,
+    p.current_price * r.usd_rate as price,
+    p.market_cap * r.usd_rate as market_cap,
+    p.total_volume * r.usd_rate as volume_24h,
+    p.high_24h * r.usd_rate as high_24h,
+    p.low_24h * r.usd_rate as low_24h,
+    p.price_change_24h * r.usd_rate as price_change_24h,
+    p.price_change_percentage_24h,
+    p.market_cap_rank,
+    r.extracted_at as rate_extracted_at
+FROM analytics.latest_prices p
+CROSS JOIN analytics.v_exchange_rates r;
+
+-- Daily OHLCV in every cached currency at each day's rate (the latest rate
+-- on or before the day; days before the first stored rate use the earliest)
+CREATE OR REPLACE VIEW analytics.v_daily_prices_by_currency AS
+WITH rates AS (
+    SELECT
+        currency,
+        usd_rate,
+        CASE WHEN ROW_NUMBER() OVER w = 1 THEN DATE '-infinity' ELSE date END as valid_from,
+        COALESCE(LEAD(date) OVER w, DATE 'infinity') as valid_to
+    FROM raw_data.exchange_rates
+    WINDOW w AS (PARTITION BY currency ORDER BY date)
+)
+SELECT 
+    d.coin_id,
+    d.date,
+    r.currency,
+    d.open_price * r.usd_rate as open_price,
+    d.high_price * r.usd_rate as high_price,
+    d.low_price * r.usd_rate as low_price,
+    d.close_price * r.usd_rate as close_price,
+    d.volume * r.usd_rate as volume,
+    d.market_cap * r.usd_rate as market_cap
+FROM staging.daily_prices d
+JOIN rates r ON d.date >= r.valid_from AND d.date < r.valid_to;
+
+COMMENT ON VIEW analytics.v_exchange_rates IS 'Latest cached exchange rate per currency';
+COMMENT ON VIEW analytics.v_latest_prices_by_currency IS 'Latest prices converted to every cached currency';
+COMMENT ON VIEW analytics.v_daily_prices_by_currency IS 'Daily OHLCV converted to every cached currency at the rate of the day';
+
+COMMIT;
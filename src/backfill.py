@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Backfill historical prices for many coins
+
+Usage:
+    python src/backfill.py --top 500 --days 365
+    python src/backfill.py --coins bitcoin,ethereum --start 2023-01-01 --end 2024-01-01
+    python src/backfill.py --journal backfill.jsonl            # resume
+    python src/backfill.py --journal backfill.jsonl --retry-dead-letter
+
+Shards (coin, date range) units across a process pool that shares one API
+rate budget, checkpoints every finished unit to the journal file, and
+resumes from it when re-run with the same --journal.
+"""
+
+import argparse
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import Settings
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Backfill options, shared with the ``backfill`` subcommand of src/cli.py"""
+    coins = parser.add_mutually_exclusive_group()
+    coins.add_argument('--coins', help='Comma-separated CoinGecko coin IDs')
+    coins.add_argument('--top', type=int, default=Settings.DEFAULT_CRYPTO_LIMIT,
+                       help='Backfill the top N coins by market cap')
+    parser.add_argument('--days', type=int, default=365, help='Days of history ending at --end')
+    parser.add_argument('--start', type=datetime.fromisoformat, help='Start date (overrides --days)')
+    parser.add_argument('--end', type=datetime.fromisoformat, help='End date (defaults to now)')
+    parser.add_argument('--interval', choices=['daily', 'hourly'], help='Granularity (API default if omitted)')
+    parser.add_argument('--journal', default=Settings.BACKFILL_JOURNAL, help='Checkpoint file; resumed if present')
+    parser.add_argument('--processes', type=int, default=Settings.BACKFILL_PROCESSES, help='Worker processes')
+    parser.add_argument('--shard-days', type=int, default=Settings.BACKFILL_SHARD_DAYS, help='Days per unit')
+    parser.add_argument('--max-attempts', type=int, default=5, help='Attempts before a unit is dead-lettered')
+    parser.add_argument('--retry-dead-letter', action='store_true', help='Retry units dead-lettered earlier')
+
+
+def run(args: argparse.Namespace) -> int:
+    from src.pipeline.backfill import BackfillJournal, run_backfill
+    
+    print("🚀 Starting CoinGecko Backfill")
+    print("=" * 50)
+    
+    end = args.end or datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    start = args.start or end - timedelta(days=args.days)
+    
+    coin_ids = []
+    if BackfillJournal(args.journal).plan is not None:
+        print(f"Resuming the backfill recorded in {args.journal}")
+    elif args.coins:
+        coin_ids = [coin_id.strip() for coin_id in args.coins.split(',') if coin_id.strip()]
+    else:
+        from src.extractors.coingecko_extractor import CoinGeckoExtractor
+        coin_ids = [coin['id'] for coin in CoinGeckoExtractor().get_top_cryptocurrencies(limit=args.top)]
+    
+    stats = run_backfill(
+        coin_ids, start, end, args.journal,
+        processes=args.processes,
+        shard_days=args.shard_days,
+        interval=args.interval,
+        max_attempts=args.max_attempts,
+        retry_dead_letter=args.retry_dead_letter,
+    )
+    
+    print(f"   ✅ {stats['already_done'] + stats['completed']}/{stats['units']} units done "
+          f"({stats['completed']} this run, {stats['rows_loaded']} rows, {stats['retried']} retries)")
+    if stats['dead_letter']:
+        print(f"   ❌ {len(stats['dead_letter'])} units dead-lettered; rerun with --retry-dead-letter:")
+        for key, error in list(stats['dead_letter'].items())[:10]:
+            print(f"      {key}: {error}")
+    
+    print("=" * 50)
+    return 1 if stats['dead_letter'] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    add_arguments(parser)
+    return run(parser.parse_args())
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+CoinGecko ETL command line
+
+Usage:
+    python src/cli.py extract-markets --limit 250
+    python src/cli.py extract-history --days 7 --top 100
+    python src/cli.py extract-global
+    python src/cli.py extract-rates
+    python src/cli.py prices --currency eur,gbp --top 10
+    python src/cli.py refresh-metrics --days 7
+    python src/cli.py backfill --top 500 --days 365
+    python src/cli.py schedule
+    python src/cli.py status
+
+Only argparse and the settings module are imported at startup. pandas,
+SQLAlchemy, requests and the extractors are imported inside the subcommand
+that needs them, so `--help` and `status` start in a fraction of the time
+of src/main.py.
+"""
+
+import argparse
+import sys
+import os
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import Settings
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def _format_number(value, spec: str) -> str:
+    """``value`` formatted with ``spec``, or '-' when it is None or NaN"""
+    if value is None or value != value:
+        return '-'
+    return format(value, spec)
+
+
+def _pipeline(name: str):
+    from src.pipeline.streaming import StreamingPipeline
+    return StreamingPipeline(Settings.PIPELINE_CHUNK_SIZE, Settings.PIPELINE_QUEUE_SIZE, name)
+
+
+def _change_detector(db):
+    if not Settings.SNAPSHOT_CHANGE_DETECTION:
+        return None
+    from src.utils.change_detection import SnapshotChangeDetector
+    return SnapshotChangeDetector.from_database(db)
+
+
+def _rate_cache(db, extractor):
+    """Exchange-rate cache when a reporting currency other than USD is configured"""
+    from src.utils.exchange_rates import ExchangeRateCache, parse_currencies
+    
+    if parse_currencies(Settings.REPORTING_CURRENCIES) in ([], ['usd']):
+        return None
+    return ExchangeRateCache(db, extractor, Settings.EXCHANGE_RATE_TTL)
+
+
+def _connect():
+    from src.utils.db_connection import DatabaseConnection
+    
+    db = DatabaseConnection()
+    if not db.test_connection():
+        print("❌ Database connection failed. Please check your setup.")
+        sys.exit(1)
+    return db
+
+
+def extract_markets(args: argparse.Namespace) -> int:
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.pipeline.jobs import run_market_snapshot
+    from src.utils.metrics import ExtractionLogWriter
+    
+    db = _connect()
+    db.maintain_partitions()
+    with ExtractionLogWriter(db) as log_writer:
+        stats = run_market_snapshot(CoinGeckoExtractor(), db, args.limit, _pipeline('market_snapshot'), log_writer,
+                                    _change_detector(db))
+    
+    print(f"✅ Loaded {stats['records_loaded']} of {stats['records_extracted']} records "
+          f"({stats['records_skipped']} unchanged)")
+    return 0
+
+
+def extract_history(args: argparse.Namespace) -> int:
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.pipeline.jobs import run_history_sweep
+    from src.utils.metrics import ExtractionLogWriter
+    
+    db = _connect()
+    extractor = CoinGeckoExtractor()
+    
+    if args.coins:
+        coin_ids = [coin_id.strip() for coin_id in args.coins.split(',') if coin_id.strip()]
+    else:
+        # Rank from the last snapshot; ask the API only if there is none yet
+        latest = db.get_latest_prices()
+        if latest.empty:
+            coin_ids = extractor.get_market_snapshot(args.top).ids
+        else:
+            coin_ids = latest.index[:args.top].tolist()
+    
+    with ExtractionLogWriter(db) as log_writer:
+        stats = run_history_sweep(extractor, db, coin_ids, args.days, _pipeline('history_sweep'), log_writer)
+    
+    print(f"✅ Loaded {stats['records_loaded']} historical records for {stats['records_extracted']} coins")
+    return 0
+
+
+def extract_global(args: argparse.Namespace) -> int:
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.pipeline.jobs import run_global_snapshot
+    from src.utils.metrics import ExtractionLogWriter
+    
+    db = _connect()
+    with ExtractionLogWriter(db) as log_writer:
+        stats = run_global_snapshot(CoinGeckoExtractor(), db, log_writer)
+    
+    print(f"✅ Loaded {stats['records_loaded']} global market data record(s)")
+    return 0
+
+
+def extract_rates(args: argparse.Namespace) -> int:
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.pipeline.jobs import run_exchange_rates
+    from src.utils.exchange_rates import ExchangeRateCache
+    from src.utils.metrics import ExtractionLogWriter
+    
+    db = _connect()
+    cache = ExchangeRateCache(db, CoinGeckoExtractor(), Settings.EXCHANGE_RATE_TTL)
+    with ExtractionLogWriter(db) as log_writer:
+        stats = run_exchange_rates(cache, log_writer, force=args.force)
+    
+    if stats['fetched']:
+        print(f"✅ Fetched {stats['records_extracted']} exchange rates ({stats['records_loaded']} changed)")
+    else:
+        print(f"✅ Cached exchange rates are {cache.age() / 60:.0f} min old; "
+              f"next fetch after {Settings.EXCHANGE_RATE_TTL / 60:.0f} min")
+    return 0
+
+
+def prices(args: argparse.Namespace) -> int:
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.utils.exchange_rates import ExchangeRateCache, parse_currencies
+    
+    db = _connect()
+    latest = db.get_latest_prices().head(args.top).reset_index()
+    currencies = parse_currencies(args.currency)
+    if currencies != ['usd']:
+        # At most one /exchange_rates call, and only if the cached rates expired
+        cache = ExchangeRateCache(db, CoinGeckoExtractor(), Settings.EXCHANGE_RATE_TTL)
+        try:
+            latest = cache.convert(latest, ['current_price', 'market_cap', 'total_volume'], currencies)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    else:
+        latest.insert(0, 'currency', 'usd')
+    
+    for row in latest.itertuples():
+        print(f"   {_format_number(row.market_cap_rank, '.0f'):>4} {row.coin_id:<24} {row.currency.upper():<5} "
+              f"{_format_number(row.current_price, ',.6f'):>18} {_format_number(row.market_cap, ',.0f'):>22}")
+    return 0
+
+
+def refresh_metrics(args: argparse.Namespace) -> int:
+    from datetime import datetime, timedelta
+    
+    db = _connect()
+    start = None if args.full else datetime.utcnow().date() - timedelta(days=args.days)
+    rows = db.refresh_market_metrics(start)
+    db.close_connection()
+    
+    print(f"✅ Refreshed daily metrics ({rows} rows changed)")
+    return 0
+
+
+def backfill(args: argparse.Namespace) -> int:
+    from src.backfill import run
+    return run(args)
+
+
+def schedule(args: argparse.Namespace) -> int:
+    import signal
+    from src.extractors.coingecko_extractor import CoinGeckoExtractor
+    from src.main import write_metrics
+    from src.pipeline.scheduler import PollingScheduler, schedule_extraction_jobs
+    from src.utils.metrics import ExtractionLogWriter
+    
+    # One extractor and one connection pool for every job, so they share a rate budget
+    db = _connect()
+    extractor = CoinGeckoExtractor()
+    scheduler = PollingScheduler()
+    
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: scheduler.stop())
+    
+    print("🚀 Starting CoinGecko scheduler (Ctrl+C to stop)")
+    print("=" * 50)
+    with ExtractionLogWriter(db) as log_writer:
+        schedule_extraction_jobs(
+            scheduler, extractor, db, args.limit, args.days,
+            snapshot_interval=args.snapshot_interval,
+            global_interval=args.global_interval,
+            history_interval=args.history_interval,
+            history_unit_size=args.history_unit_size,
+            log_writer=log_writer,
+            make_pipeline=_pipeline,
+            detector=_change_detector(db),
+            rate_cache=_rate_cache(db, extractor),
+        )
+        scheduler.run_forever(after_task=write_metrics)
+    
+    db.close_connection()
+    print("✅ Scheduler stopped")
+    return 0
+
+
+def status(args: argparse.Namespace) -> int:
+    # psycopg2 alone keeps this cheap enough to poll from a scheduler
+    import psycopg2
+    
+    connection = psycopg2.connect(host=Settings.DB_HOST, port=Settings.DB_PORT, dbname=Settings.DB_NAME,
+                                  user=Settings.DB_USER, password=Settings.DB_PASSWORD, connect_timeout=10)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT table_name, last_extracted_at FROM raw_data.extraction_watermarks ORDER BY 1")
+            print("Latest extractions:")
+            for table_name, last_extracted_at in cursor.fetchall():
+                print(f"   {table_name:<32} {last_extracted_at:%Y-%m-%d %H:%M:%S}")
+            
+            cursor.execute("""
+                SELECT extraction_type, status, records_extracted, records_inserted, start_time, duration_seconds
+                FROM raw_data.extraction_log
+                ORDER BY start_time DESC
+                LIMIT %s
+            """, (args.runs,))
+            print("Recent runs:")
+            for extraction_type, run_status, extracted, inserted, start_time, duration in cursor.fetchall():
+                icon = '✅' if run_status == 'success' else '❌'
+                print(f"   {icon} {start_time:%Y-%m-%d %H:%M:%S} {extraction_type:<12} {run_status:<8} "
+                      f"{extracted or 0:>7} extracted {inserted or 0:>9} loaded {duration or 0:>5}s")
+    finally:
+        connection.close()
+    
+    if args.journal and os.path.exists(args.journal):
+        from src.pipeline.backfill import BackfillJournal
+        
+        journal = BackfillJournal(args.journal)
+        units = len(journal.plan['units']) if journal.plan else 0
+        print(f"Backfill {args.journal}: {len(journal.done)}/{units} units done, "
+              f"{len(journal.dead_letter)} dead-lettered")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    commands = parser.add_subparsers(dest='command', required=True, metavar='command')
+    
+    markets = commands.add_parser('extract-markets', help='Load the top coins market snapshot')
+    markets.add_argument('--limit', type=_positive_int, default=Settings.DEFAULT_CRYPTO_LIMIT, help='Number of coins')
+    markets.set_defaults(handler=extract_markets)
+    
+    history = commands.add_parser('extract-history', help='Load missing price history')
+    coins = history.add_mutually_exclusive_group()
+    coins.add_argument('--coins', help='Comma-separated CoinGecko coin IDs')
+    coins.add_argument('--top', type=int, default=Settings.DEFAULT_CRYPTO_LIMIT,
+                       help='Top N coins by the latest snapshot rank')
+    history.add_argument('--days', type=int, default=Settings.DEFAULT_HISTORICAL_DAYS, help='History window')
+    history.set_defaults(handler=extract_history)
+    
+    global_data = commands.add_parser('extract-global', help='Load global market statistics')
+    global_data.set_defaults(handler=extract_global)
+    
+    rates = commands.add_parser('extract-rates', help='Refresh the cached exchange rates if they expired')
+    rates.add_argument('--force', action='store_true', help='Fetch even if the cached rates are fresh')
+    rates.set_defaults(handler=extract_rates)
+    
+    prices_parser = commands.add_parser('prices', help='Show the latest prices in one or more currencies')
+    prices_parser.add_argument('--currency', default=Settings.REPORTING_CURRENCIES,
+                               help='Comma-separated currency codes')
+    prices_parser.add_argument('--top', type=int, default=10, help='Top N coins by rank')
+    prices_parser.set_defaults(handler=prices)
+    
+    metrics_parser = commands.add_parser('refresh-metrics', help='Recompute analytics.coin_daily_metrics')
+    metrics_span = metrics_parser.add_mutually_exclusive_group()
+    metrics_span.add_argument('--days', type=int, default=Settings.DEFAULT_HISTORICAL_DAYS,
+                              help='Refresh the last N days')
+    metrics_span.add_argument('--full', action='store_true', help='Recompute every day')
+    metrics_parser.set_defaults(handler=refresh_metrics)
+    
+    backfill_parser = commands.add_parser('backfill', help='Resumable multi-process history backfill')
+    from src.backfill import add_arguments
+    add_arguments(backfill_parser)
+    backfill_parser.set_defaults(handler=backfill)
+    
+    scheduler = commands.add_parser('schedule', help='Run every job on its own cadence until stopped')
+    scheduler.add_argument('--limit', type=_positive_int, default=Settings.DEFAULT_CRYPTO_LIMIT, help='Coins per snapshot and sweep')
+    scheduler.add_argument('--days', type=int, default=Settings.DEFAULT_HISTORICAL_DAYS, help='History window')
+    scheduler.add_argument('--snapshot-interval', type=float, default=Settings.SCHEDULER_SNAPSHOT_INTERVAL,
+                           help='Seconds between market snapshots')
+    scheduler.add_argument('--global-interval', type=float, default=Settings.SCHEDULER_GLOBAL_INTERVAL,
+                           help='Seconds between global statistics loads')
+    scheduler.add_argument('--history-interval', type=float, default=Settings.SCHEDULER_HISTORY_INTERVAL,
+                           help='Seconds between history sweeps')
+    scheduler.add_argument('--history-unit-size', type=int, default=Settings.SCHEDULER_HISTORY_UNIT_SIZE,
+                           help='Coins per history task')
+    scheduler.set_defaults(handler=schedule)
+    
+    status_parser = commands.add_parser('status', help='Show watermarks and recent runs')
+    status_parser.add_argument('--runs', type=int, default=10, help='Recent extraction_log rows to show')
+    status_parser.add_argument('--journal', default=Settings.BACKFILL_JOURNAL, help='Backfill journal to report on')
+    status_parser.set_defaults(handler=status)
+    
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
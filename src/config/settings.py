@@ -1,8 +1,16 @@
+import functools
 import os
 from dotenv import load_dotenv
 
+
+@functools.lru_cache(maxsize=None)
+def load_environment() -> bool:
+    """Load .env into os.environ; later calls in the same process are free"""
+    return load_dotenv()
+
+
 # Load environment variables
-load_dotenv()
+load_environment()
 
 class Settings:
     # Database Configuration
@@ -15,11 +23,49 @@ class Settings:
     # API Configuration
     COINGECKO_API_URL = os.getenv('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
     API_RATE_LIMIT_DELAY = float(os.getenv('API_RATE_LIMIT_DELAY', '1.2'))
+    API_CALLS_PER_MINUTE = float(os.getenv('API_CALLS_PER_MINUTE', str(60.0 / API_RATE_LIMIT_DELAY)))
+    API_RATE_LIMIT_STATE_FILE = os.getenv('API_RATE_LIMIT_STATE_FILE', '')  # Shared across processes when set
+    API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '3'))
+    API_MAX_CONCURRENCY = int(os.getenv('API_MAX_CONCURRENCY', '4'))
+    HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', '.cache/http')  # Empty string disables the response cache
+    HTTP_CACHE_MAX_MB = int(os.getenv('HTTP_CACHE_MAX_MB', '256'))
     
     # Extraction Configuration
     DEFAULT_CRYPTO_LIMIT = int(os.getenv('DEFAULT_CRYPTO_LIMIT', '100'))
     DEFAULT_HISTORICAL_DAYS = int(os.getenv('DEFAULT_HISTORICAL_DAYS', '7'))
     
+    # Load Configuration
+    BULK_LOAD_THRESHOLD = int(os.getenv('BULK_LOAD_THRESHOLD', '1000'))  # Rows at which COPY replaces INSERT
+    HISTORICAL_LOAD_METHOD = os.getenv('HISTORICAL_LOAD_METHOD', 'upsert')  # upsert, copy, insert or auto
+    PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '2'))  # Monthly raw partitions created in advance
+    RAW_MARKET_RETENTION_MONTHS = int(os.getenv('RAW_MARKET_RETENTION_MONTHS', '3'))  # 0 keeps everything
+    RAW_HISTORY_RETENTION_MONTHS = int(os.getenv('RAW_HISTORY_RETENTION_MONTHS', '24'))
+    PARTITION_DETACH_ONLY = os.getenv('PARTITION_DETACH_ONLY', 'false').lower() == 'true'  # Keep retired partitions as tables
+    DAILY_ROLLUP_ENABLED = os.getenv('DAILY_ROLLUP_ENABLED', 'true').lower() == 'true'  # Maintain staging.daily_prices on load
+    LATEST_CACHE_TTL = float(os.getenv('LATEST_CACHE_TTL', '30'))  # Seconds latest-state reads are cached in-process
+    PIPELINE_CHUNK_SIZE = int(os.getenv('PIPELINE_CHUNK_SIZE', '50'))  # Records per load call
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '4'))  # Chunks buffered between extract and load
+    QUERY_CHUNK_SIZE = int(os.getenv('QUERY_CHUNK_SIZE', '50000'))  # Rows per chunk streamed by iter_query
+    SNAPSHOT_CHANGE_DETECTION = os.getenv('SNAPSHOT_CHANGE_DETECTION', 'true').lower() == 'true'  # Skip unchanged coins in snapshots
+    REPORTING_CURRENCIES = os.getenv('REPORTING_CURRENCIES', 'usd')  # Comma-separated; non-USD values are converted from cached rates
+    EXCHANGE_RATE_TTL = float(os.getenv('EXCHANGE_RATE_TTL', '3600'))  # Seconds before /exchange_rates is fetched again
+    LANDING_ZONE_DIR = os.getenv('LANDING_ZONE_DIR', '')  # Parquet copy of raw batches (needs pyarrow); empty disables
+    
+    # Backfill Configuration
+    BACKFILL_JOURNAL = os.getenv('BACKFILL_JOURNAL', 'backfill.jsonl')  # Checkpoint file resumed by src/backfill.py
+    BACKFILL_PROCESSES = int(os.getenv('BACKFILL_PROCESSES', '4'))
+    BACKFILL_SHARD_DAYS = int(os.getenv('BACKFILL_SHARD_DAYS', '90'))  # Days of history per unit of work
+    
+    # Scheduler Configuration
+    SCHEDULER_SNAPSHOT_INTERVAL = float(os.getenv('SCHEDULER_SNAPSHOT_INTERVAL', '60'))  # Seconds between market snapshots
+    SCHEDULER_GLOBAL_INTERVAL = float(os.getenv('SCHEDULER_GLOBAL_INTERVAL', '300'))
+    SCHEDULER_HISTORY_INTERVAL = float(os.getenv('SCHEDULER_HISTORY_INTERVAL', '3600'))
+    SCHEDULER_HISTORY_UNIT_SIZE = int(os.getenv('SCHEDULER_HISTORY_UNIT_SIZE', '10'))  # Coins per preemptible history task
+    
+    # Metrics Configuration
+    METRICS_PROM_FILE = os.getenv('METRICS_PROM_FILE', '')  # Prometheus text file written at the end of a run
+    METRICS_JSON_FILE = os.getenv('METRICS_JSON_FILE', '')  # Same metrics as JSON
+    
     # Project Configuration
     PROJECT_NAME = os.getenv('PROJECT_NAME', 'coingecko-etl')
     ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
@@ -1,61 +1,361 @@
+import math
 import requests
+import numpy as np
 import pandas as pd
 import time
-from typing import Dict, List, Optional
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
-import os
-from dotenv import load_dotenv
+import re
 
-# Load environment variables
-load_dotenv()
+from ..config.settings import Settings
+from .http_cache import ResponseCache
+from .rate_limiter import TokenBucketRateLimiter, parse_retry_after
+from ..utils.market_batch import MarketSnapshotBatch
+from ..utils.metrics import metrics
+
+# Maximum page size accepted by /coins/markets
+MARKETS_PAGE_SIZE = 250
+
+# Spacing between points for each market_chart interval; a coin whose latest
+# stored point is newer than this has nothing new to fetch
+HISTORY_GRANULARITY = {
+    'daily': timedelta(days=1),
+    'hourly': timedelta(hours=1),
+}
+
+# Response header carrying the epoch time the body was received (see received_at)
+RECEIVED_AT_HEADER = 'X-Received-At'
+
+# Coin IDs in request paths, collapsed so metrics have one series per endpoint
+COIN_PATH = re.compile(r'/coins/(?!markets\b)[^/]+')
+
+
+def endpoint_label(base_url: str, url: str) -> str:
+    """Metrics label for a request URL, e.g. '/coins/{id}/market_chart'"""
+    path = url[len(base_url):] if url.startswith(base_url) else url
+    return COIN_PATH.sub('/coins/{id}', path)
+
+
+def received_at(response: requests.Response) -> datetime:
+    """
+    Naive UTC time the response body was received from the API
+    
+    For a cached response this is when the body was first received (or last
+    revalidated), so data served from the cache is stamped with its real age.
+    """
+    return datetime.utcfromtimestamp(float(response.headers[RECEIVED_AT_HEADER]))
+
+
+def history_interval(days: int) -> str:
+    """Granularity requested from market_chart for a window of ``days``"""
+    return 'daily' if days > 1 else 'hourly'
+
+
+def trim_history(history: Dict, watermark: datetime) -> None:
+    """
+    Drop points at or before ``watermark`` from a market_chart payload in place
+    
+    Args:
+        history: Historical data dictionary from get_coin_history
+        watermark: Latest stored timestamp for the coin (naive UTC)
+    """
+    cutoff_ms = (watermark - datetime(1970, 1, 1)) / timedelta(milliseconds=1)
+    for key in ('prices', 'market_caps', 'total_volumes'):
+        if key in history:
+            history[key] = [point for point in history[key] if point[0] > cutoff_ms]
 
 class CoinGeckoExtractor:
-    def __init__(self):
-        self.base_url = os.getenv('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
+    def __init__(self, max_workers: Optional[int] = None,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None,
+                 cache: Optional[ResponseCache] = None, use_cache: bool = True):
+        self.base_url = Settings.COINGECKO_API_URL
+        self.max_workers = max_workers or Settings.API_MAX_CONCURRENCY
+        self.max_retries = Settings.API_MAX_RETRIES
+        
+        # All API calls draw from one token bucket; pass a shared limiter to
+        # coordinate several extractors, or set API_RATE_LIMIT_STATE_FILE to
+        # coordinate processes on the same host
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(
+            calls_per_minute=Settings.API_CALLS_PER_MINUTE,
+            state_file=Settings.API_RATE_LIMIT_STATE_FILE or None
+        )
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'CoinGecko-ETL-Pipeline/1.0'
         })
         
+        # Size the connection pool so concurrent workers don't queue on sockets
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # On-disk response cache shared by all endpoints; set HTTP_CACHE_DIR
+        # to an empty string or pass use_cache=False to disable it
+        self.cache = cache or (ResponseCache(
+            Settings.HTTP_CACHE_DIR,
+            max_bytes=Settings.HTTP_CACHE_MAX_MB * 1024 * 1024
+        ) if Settings.HTTP_CACHE_DIR and use_cache else None)
+        
+        # Per-coin request latency (seconds) from the most recent history fetches
+        self.coin_latencies: Dict[str, float] = {}
+        
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
+    
+    def _request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """
+        Perform a rate-limited, cached GET request against the API
         
-    def get_top_cryptocurrencies(self, limit: int = 250) -> List[Dict]:
+        Fresh cache entries are served without touching the network or the
+        rate budget. Stale entries are revalidated with If-None-Match /
+        If-Modified-Since, and a 304 reuses the cached body. Every network
+        call waits for a token from the shared rate limiter; HTTP 429
+        responses slow the limiter down and are retried after the server's
+        Retry-After period, up to ``max_retries`` times.
+        
+        Args:
+            url: Endpoint URL
+            params: Optional query parameters
+            
+        Returns:
+            Successful response
         """
-        Fetch top cryptocurrencies by market cap
+        endpoint = endpoint_label(self.base_url, url)
+        cache_key, ttl, entry = None, 0, None
+        headers = {}
+        
+        if self.cache is not None:
+            ttl = self.cache.ttl_for(url, params)
+            if ttl > 0:
+                cache_key = self.cache.make_key(url, params)
+                entry = self.cache.get(cache_key)
+        
+        if entry is not None:
+            if entry['fresh']:
+                self.cache.count('hits')
+                metrics.inc('coingecko_cache_total', result='hit')
+                return self._cached_response(url, entry['body'], received=entry['stored_at'])
+            
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            with metrics.timer('coingecko_request_seconds', endpoint=endpoint):
+                response = self.session.get(url, params=params, headers=headers, timeout=30)
+            
+            metrics.inc('coingecko_responses_total', endpoint=endpoint, status=response.status_code)
+            metrics.inc('coingecko_response_bytes_total', len(response.content), endpoint=endpoint)
+            
+            if response.status_code == 304 and entry is not None:
+                self.rate_limiter.record_success()
+                self.cache.touch(cache_key, ttl)
+                self.cache.count('revalidated')
+                metrics.inc('coingecko_cache_total', result='revalidated')
+                return self._cached_response(url, entry['body'], response.elapsed, time.time())
+            
+            if response.status_code != 429:
+                response.raise_for_status()
+                self.rate_limiter.record_success()
+                response.headers[RECEIVED_AT_HEADER] = repr(time.time())
+                
+                if cache_key is not None:
+                    self.cache.count('misses')
+                    metrics.inc('coingecko_cache_total', result='miss')
+                    self.cache.put(
+                        cache_key, response.content, ttl,
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified')
+                    )
+                return response
+            
+            self.rate_limiter.record_throttled(parse_retry_after(response.headers.get('Retry-After')))
+            if attempt < self.max_retries:
+                metrics.inc('coingecko_retries_total', endpoint=endpoint)
+            self.logger.warning(f"HTTP 429 from {url} (attempt {attempt + 1}/{self.max_retries + 1})")
+        
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _cached_response(url: str, body: bytes, elapsed: Optional[timedelta] = None,
+                         received: Optional[float] = None) -> requests.Response:
+        """Wrap a cached body, received at epoch time ``received``, in a Response like a live one"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.headers['Content-Type'] = 'application/json'
+        response.headers['X-Cache'] = 'HIT'
+        response.headers[RECEIVED_AT_HEADER] = repr(received if received is not None else time.time())
+        response.elapsed = elapsed or timedelta(0)
+        return response
+    
+    def _get_market_page(self, page: int, per_page: int) -> Tuple[List[Dict], datetime]:
+        """
+        Fetch a single page of the market snapshot
         
         Args:
-            limit: Number of cryptocurrencies to fetch (max 250 per request)
+            page: 1-based page number
+            per_page: Coins per page (max 250)
             
         Returns:
-            List of cryptocurrency data dictionaries
+            (cryptocurrency data dictionaries for that page, time the page was received)
         """
         url = f"{self.base_url}/coins/markets"
         params = {
             'vs_currency': 'usd',
             'order': 'market_cap_desc',
-            'per_page': min(limit, 250),  # CoinGecko API limit
-            'page': 1,
+            'per_page': per_page,
+            'page': page,
             'sparkline': False,
             'price_change_percentage': '1h,24h,7d'
         }
         
-        try:
-            self.logger.info(f"Fetching top {limit} cryptocurrencies from CoinGecko API")
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
+        response = self._request(url, params=params)
+        return response.json(), received_at(response)
+    
+    def _iter_market_pages(self, limit: int) -> Iterator[Tuple[int, List[Dict], datetime]]:
+        """
+        Fetch every page covering the top ``limit`` coins concurrently
+        
+        Yields:
+            (page number, page data trimmed to ``limit``, receive time) in arrival order
+        """
+        if limit <= 0:
+            return
+        
+        per_page = min(limit, MARKETS_PAGE_SIZE)
+        page_count = math.ceil(limit / per_page)
+        
+        self.logger.info(f"Fetching top {limit} cryptocurrencies from CoinGecko API ({page_count} pages)")
+        
+        workers = max(1, min(self.max_workers, page_count))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='coingecko') as executor:
+            futures = {
+                executor.submit(self._get_market_page, page, per_page): page
+                for page in range(1, page_count + 1)
+            }
             
-            # Add extraction timestamp to each record
-            data = response.json()
-            timestamp = datetime.utcnow().isoformat()
+            for future in as_completed(futures):
+                page = futures[future]
+                
+                # The last page may overshoot the requested limit
+                data, page_received_at = future.result()
+                yield page, data[:limit - (page - 1) * per_page], page_received_at
+    
+    def iter_top_cryptocurrency_pages(self, limit: int = 250) -> Iterator[List[Dict]]:
+        """
+        Fetch the top cryptocurrencies page by page, concurrently
+        
+        All pages needed to cover ``limit`` are requested in parallel (within
+        the rate limiter's budget) and each page is yielded as soon as it
+        arrives. Coins that appear on two pages because rankings shifted
+        mid-fetch are only yielded once.
+        
+        Args:
+            limit: Number of cryptocurrencies to fetch
             
+        Yields:
+            Lists of cryptocurrency data dictionaries, in arrival order
+        """
+        seen_ids = set()
+        
+        for page, data, page_received_at in self._iter_market_pages(limit):
+            timestamp = page_received_at.isoformat()
+            records = []
             for coin in data:
+                if coin.get('id') in seen_ids:
+                    continue
+                seen_ids.add(coin.get('id'))
+                
+                # Add extraction timestamp to each record
                 coin['extracted_at'] = timestamp
                 # Handle None values that might cause issues
                 coin['roi'] = coin.get('roi', {})
-                
+                records.append(coin)
+            
+            duplicates = len(data) - len(records)
+            if duplicates:
+                self.logger.info(f"Dropped {duplicates} duplicate coins on page {page}")
+            
+            yield records
+    
+    def iter_market_snapshot_batches(self, limit: int = 250) -> Iterator[MarketSnapshotBatch]:
+        """
+        Fetch the top cryptocurrencies as typed columnar batches, one per page
+        
+        Same fetching and de-duplication as iter_top_cryptocurrency_pages, but
+        each page is decoded straight into a MarketSnapshotBatch.
+        
+        Args:
+            limit: Number of cryptocurrencies to fetch
+            
+        Yields:
+            MarketSnapshotBatch per page, in arrival order
+        """
+        seen_ids = set()
+        
+        for page, data, page_received_at in self._iter_market_pages(limit):
+            batch = MarketSnapshotBatch.from_records(data, page_received_at)
+            
+            keep = np.ones(len(batch), dtype=bool)
+            for index, coin_id in enumerate(batch['id']):
+                keep[index] = coin_id not in seen_ids
+                seen_ids.add(coin_id)
+            
+            if not keep.all():
+                self.logger.info(f"Dropped {int((~keep).sum())} duplicate coins on page {page}")
+                batch = batch.take(keep)
+            
+            yield batch
+    
+    @metrics.timed('extractor_call_seconds', call='get_market_snapshot')
+    def get_market_snapshot(self, limit: int = 250) -> MarketSnapshotBatch:
+        """
+        Fetch top cryptocurrencies by market cap as one typed columnar batch
+        
+        Args:
+            limit: Number of cryptocurrencies to fetch (paged 250 per request)
+            
+        Returns:
+            MarketSnapshotBatch ordered by market cap rank
+        """
+        try:
+            batch = MarketSnapshotBatch.concat(self.iter_market_snapshot_batches(limit)).sort_by_rank()
+            self.logger.info(f"Successfully fetched {len(batch)} cryptocurrency records")
+            return batch
+            
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error fetching cryptocurrency data: {e}")
+            raise
+    
+    @metrics.timed('extractor_call_seconds', call='get_top_cryptocurrencies')
+    def get_top_cryptocurrencies(self, limit: int = 250) -> List[Dict]:
+        """
+        Fetch top cryptocurrencies by market cap
+        
+        Args:
+            limit: Number of cryptocurrencies to fetch (paged 250 per request)
+            
+        Returns:
+            List of cryptocurrency data dictionaries ordered by market cap rank
+        """
+        try:
+            data = []
+            for page in self.iter_top_cryptocurrency_pages(limit):
+                data.extend(page)
+            
+            data.sort(key=lambda coin: coin.get('market_cap_rank') or float('inf'))
+            
             self.logger.info(f"Successfully fetched {len(data)} cryptocurrency records")
             return data
             
@@ -66,13 +366,15 @@ class CoinGeckoExtractor:
             self.logger.error(f"Unexpected error in get_top_cryptocurrencies: {e}")
             raise
     
-    def get_coin_history(self, coin_id: str, days: int = 7) -> Dict:
+    @metrics.timed('extractor_call_seconds', call='get_coin_history')
+    def get_coin_history(self, coin_id: str, days: int = 7, interval: Optional[str] = None) -> Dict:
         """
         Fetch historical price data for a specific coin
         
         Args:
             coin_id: CoinGecko coin ID (e.g., 'bitcoin', 'ethereum')
             days: Number of days of historical data (1-365)
+            interval: Data granularity; defaults to 'daily' for more than one day
             
         Returns:
             Dictionary containing price, market cap, and volume history
@@ -81,17 +383,17 @@ class CoinGeckoExtractor:
         params = {
             'vs_currency': 'usd',
             'days': days,
-            'interval': 'daily' if days > 1 else 'hourly'
+            'interval': interval or history_interval(days)
         }
         
         try:
             self.logger.info(f"Fetching {days} days of history for {coin_id}")
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
+            response = self._request(url, params=params)
             
             data = response.json()
+            self.coin_latencies[coin_id] = response.elapsed.total_seconds()
             data['coin_id'] = coin_id
-            data['extracted_at'] = datetime.utcnow().isoformat()
+            data['extracted_at'] = received_at(response).isoformat()
             
             return data
             
@@ -99,6 +401,50 @@ class CoinGeckoExtractor:
             self.logger.error(f"Error fetching history for {coin_id}: {e}")
             raise
     
+    @metrics.timed('extractor_call_seconds', call='get_coin_history_range')
+    def get_coin_history_range(self, coin_id: str, start: datetime, end: datetime,
+                               interval: Optional[str] = None) -> Dict:
+        """
+        Fetch historical price data for a coin between two points in time
+        
+        Uses /market_chart/range, so the window can lie anywhere in the past.
+        Without ``interval`` the API picks the granularity (hourly for
+        windows up to 90 days, daily beyond).
+        
+        Args:
+            coin_id: CoinGecko coin ID
+            start: Window start (naive UTC)
+            end: Window end (naive UTC)
+            interval: Optional data granularity ('daily' or 'hourly')
+            
+        Returns:
+            Dictionary containing price, market cap, and volume history
+        """
+        url = f"{self.base_url}/coins/{coin_id}/market_chart/range"
+        params = {
+            'vs_currency': 'usd',
+            'from': int((start - datetime(1970, 1, 1)).total_seconds()),
+            'to': int((end - datetime(1970, 1, 1)).total_seconds()),
+        }
+        if interval:
+            params['interval'] = interval
+        
+        try:
+            self.logger.info(f"Fetching history for {coin_id} from {start:%Y-%m-%d} to {end:%Y-%m-%d}")
+            response = self._request(url, params=params)
+            
+            data = response.json()
+            self.coin_latencies[coin_id] = response.elapsed.total_seconds()
+            data['coin_id'] = coin_id
+            data['extracted_at'] = received_at(response).isoformat()
+            
+            return data
+            
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error fetching history range for {coin_id}: {e}")
+            raise
+    
+    @metrics.timed('extractor_call_seconds', call='get_global_market_data')
     def get_global_market_data(self) -> Dict:
         """
         Fetch global cryptocurrency market statistics
@@ -110,11 +456,10 @@ class CoinGeckoExtractor:
         
         try:
             self.logger.info("Fetching global market data")
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+            response = self._request(url)
             
             data = response.json()
-            data['extracted_at'] = datetime.utcnow().isoformat()
+            data['extracted_at'] = received_at(response).isoformat()
             
             return data
             
@@ -122,41 +467,153 @@ class CoinGeckoExtractor:
             self.logger.error(f"Error fetching global market data: {e}")
             raise
     
-    def rate_limit_delay(self, delay_seconds: float = 1.2):
+    @metrics.timed('extractor_call_seconds', call='get_exchange_rates')
+    def get_exchange_rates(self) -> Dict:
+        """
+        Fetch the BTC exchange rates of every currency CoinGecko quotes
+        
+        One call covers all fiat, crypto and commodity units; see
+        ExchangeRateCache for how they are cached and used.
+        
+        Returns:
+            Dictionary with ``rates`` keyed by currency code
+        """
+        url = f"{self.base_url}/exchange_rates"
+        
+        try:
+            self.logger.info("Fetching exchange rates")
+            response = self._request(url)
+            
+            data = response.json()
+            data['extracted_at'] = received_at(response).isoformat()
+            
+            return data
+            
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error fetching exchange rates: {e}")
+            raise
+    
+    def plan_history_days(self, watermark: Optional[datetime], days: int = 7,
+                          now: Optional[datetime] = None) -> Optional[int]:
+        """
+        Work out the smallest history window that covers what is missing
+        
+        Args:
+            watermark: Latest stored timestamp for the coin (naive UTC), if any
+            days: Full window the caller wants covered
+            now: Reference time (defaults to the current UTC time)
+            
+        Returns:
+            Number of days to request, or None if the coin is already current
+        """
+        if watermark is None:
+            return days
+        
+        gap = (now or datetime.utcnow()) - watermark
+        if gap < HISTORY_GRANULARITY[history_interval(days)]:
+            return None
+        
+        return max(1, min(days, math.ceil(gap / timedelta(days=1))))
+    
+    def iter_batch_data(self, coin_ids: List[str], days: int = 7,
+                        max_workers: Optional[int] = None,
+                        watermarks: Optional[Dict[str, datetime]] = None) -> Iterator[Dict]:
         """
-        Implement rate limiting for CoinGecko API
-        Free tier: 10-50 calls per minute
+        Fetch historical data for multiple coins concurrently
+        
+        Keeps up to ``max_workers`` requests in flight and yields each coin's
+        history as soon as it completes, so callers can start loading before
+        the slowest request finishes. Failed coins are logged and skipped.
+        
+        With ``watermarks`` (see DatabaseConnection.get_history_watermarks),
+        each coin only requests the span after its latest stored point, coins
+        that are already current are skipped entirely, and points at or before
+        the watermark are dropped from the result.
         
         Args:
-            delay_seconds: Seconds to wait between API calls
+            coin_ids: List of CoinGecko coin IDs
+            days: Number of days of historical data per coin
+            max_workers: Maximum concurrent requests (defaults to API_MAX_CONCURRENCY)
+            watermarks: Optional mapping of coin ID to latest stored timestamp
+            
+        Yields:
+            Historical data dictionaries in completion order
         """
-        time.sleep(delay_seconds)
+        watermarks = watermarks or {}
+        interval = history_interval(days)
+        plan = {}
+        for coin_id in coin_ids:
+            window = self.plan_history_days(watermarks.get(coin_id), days)
+            if window is not None:
+                plan[coin_id] = window
+        
+        if len(plan) < len(coin_ids):
+            self.logger.info(f"Skipping {len(coin_ids) - len(plan)} coins whose history is already current")
+        if not plan:
+            return
+        
+        workers = max(1, min(max_workers or self.max_workers, len(plan)))
+        
+        pending_plan = iter(plan.items())
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='coingecko') as executor:
+            # Keep a bounded window of outstanding requests so results never pile
+            # up faster than the caller consumes them
+            futures = {}
+            for coin_id, window in itertools.islice(pending_plan, workers * 2):
+                futures[executor.submit(self.get_coin_history, coin_id, window, interval)] = coin_id
+            
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    coin_id = futures.pop(future)
+                    for next_coin_id, window in itertools.islice(pending_plan, 1):
+                        futures[executor.submit(self.get_coin_history, next_coin_id, window, interval)] = next_coin_id
+                    
+                    try:
+                        history = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Failed to fetch data for {coin_id}: {e}")
+                        continue
+                    
+                    if watermarks.get(coin_id) is not None:
+                        trim_history(history, watermarks[coin_id])
+                    
+                    self.logger.info(
+                        f"Fetched history for {coin_id} in {self.coin_latencies.get(coin_id, 0.0):.3f}s"
+                    )
+                    yield history
     
-    def extract_batch_data(self, coin_ids: List[str], batch_size: int = 10) -> List[Dict]:
+    @metrics.timed('extractor_call_seconds', call='extract_batch_data')
+    def extract_batch_data(self, coin_ids: List[str], batch_size: int = 10, days: int = 7,
+                           watermarks: Optional[Dict[str, datetime]] = None) -> List[Dict]:
         """
-        Extract historical data for multiple coins in batches
+        Extract historical data for multiple coins concurrently
         
         Args:
             coin_ids: List of CoinGecko coin IDs
-            batch_size: Number of coins to process in each batch
+            batch_size: Number of completed coins between progress log lines
+            days: Number of days of historical data per coin
+            watermarks: Optional mapping of coin ID to latest stored timestamp;
+                only the missing span is requested for each coin
             
         Returns:
-            List of historical data for all requested coins
+            List of historical data for all requested coins, in completion order
         """
         all_data = []
+        started = time.perf_counter()
         
-        for i in range(0, len(coin_ids), batch_size):
-            batch = coin_ids[i:i + batch_size]
-            self.logger.info(f"Processing batch {i//batch_size + 1}: {len(batch)} coins")
-            
-            for coin_id in batch:
-                try:
-                    history = self.get_coin_history(coin_id, days=7)
-                    all_data.append(history)
-                    self.rate_limit_delay()  # Respect API rate limits
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to fetch data for {coin_id}: {e}")
-                    continue
+        for history in self.iter_batch_data(coin_ids, days=days, watermarks=watermarks):
+            all_data.append(history)
+            if len(all_data) % batch_size == 0:
+                self.logger.info(f"Processed batch {len(all_data) // batch_size}: {len(all_data)}/{len(coin_ids)} coins")
+        
+        latencies = sorted(self.coin_latencies[h['coin_id']] for h in all_data if h['coin_id'] in self.coin_latencies)
+        if latencies:
+            self.logger.info(
+                f"Fetched {len(all_data)}/{len(coin_ids)} coins in {time.perf_counter() - started:.1f}s "
+                f"(latency p50={latencies[len(latencies) // 2]:.3f}s, max={latencies[-1]:.3f}s)"
+            )
         
         return all_data
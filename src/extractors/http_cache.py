@@ -0,0 +1,203 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+# Default freshness per endpoint, matched against the request path in order.
+# Live snapshot endpoints (/coins/markets, /global) are never cached: they are
+# polled at about their own refresh rate, and a cached page would be loaded
+# again as a new snapshot. market_chart windows that end in the past never
+# change, so those are kept much longer (see ttl_for).
+DEFAULT_TTLS: List[Tuple[str, float]] = [
+    (r'/exchange_rates$', 300),
+    (r'/coins/[^/]+/market_chart/range$', 300),
+    (r'/coins/[^/]+/market_chart$', 300),
+]
+
+# TTL for market_chart/range windows that closed more than a day ago
+CLOSED_WINDOW_TTL = 30 * 24 * 3600
+
+
+class ResponseCache:
+    """
+    Size-bounded on-disk cache for API responses
+    
+    Entries live in a SQLite file keyed by method, URL and query string. Each
+    entry keeps the response body, its ETag/Last-Modified validators and the
+    time it was stored; lookups refresh ``last_access`` so the least recently
+    used entries are evicted first once ``max_bytes`` is exceeded.
+    """
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024,
+                 ttls: Optional[List[Tuple[str, float]]] = None):
+        """
+        Args:
+            cache_dir: Directory holding the cache database
+            max_bytes: Upper bound on the total size of cached bodies
+            ttls: (path regex, seconds) rules; defaults to DEFAULT_TTLS
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'responses.sqlite')
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)]
+        
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+        self.logger = logging.getLogger(__name__)
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Build a stable cache key for a GET request"""
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"GET {url}?{query}".encode()).hexdigest()
+    
+    def ttl_for(self, url: str, params: Optional[Dict] = None) -> float:
+        """
+        Freshness lifetime in seconds for a request
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+        
+        Returns:
+            Seconds the response may be served without contacting the API
+        """
+        path = url.split('?', 1)[0]
+        
+        # A range that ended over a day ago is history that won't change
+        if path.endswith('/market_chart/range') and params and 'to' in params:
+            closed_for = time.time() - float(params['to'])
+            if closed_for > 24 * 3600:
+                return CLOSED_WINDOW_TTL
+        
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return 0
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up an entry, fresh or stale
+        
+        Returns:
+            Dict with ``body``, ``etag``, ``last_modified``, ``stored_at`` (epoch
+            seconds the body was received) and ``fresh``, or None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        
+        body, etag, last_modified, stored_at, expires_at = row
+        return {
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': stored_at,
+            'fresh': expires_at > now,
+        }
+    
+    def put(self, key: str, body: bytes, ttl: float, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store a response body and evict least recently used entries if needed"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, body, etag, last_modified, stored_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now, now + ttl, now, len(body))
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def touch(self, key: str, ttl: float) -> None:
+        """Extend an entry's freshness after a 304 Not Modified (the body is current as of now)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                (now, now + ttl, now, key)
+            )
+            self._conn.commit()
+    
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+    
+    def count(self, counter: str) -> None:
+        """Increment one of the hits/misses/revalidated counters"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': size,
+        }
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
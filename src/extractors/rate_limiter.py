@@ -0,0 +1,172 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional
+
+
+class TokenBucketRateLimiter:
+    """
+    Adaptive token-bucket rate limiter for API calls
+    
+    Tokens refill continuously at ``calls_per_minute``. When the API answers
+    with HTTP 429 the refill rate is halved and the bucket is blocked for the
+    ``Retry-After`` period; each successful call then restores a small part of
+    the rate until the configured target is reached again.
+    
+    With ``state_file`` set, the bucket state lives in a JSON file guarded by
+    an exclusive ``flock``, so every process on the host draws from one budget.
+    """
+    
+    def __init__(self, calls_per_minute: float, burst: Optional[int] = None,
+                 state_file: Optional[str] = None, min_calls_per_minute: Optional[float] = None,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            calls_per_minute: Target sustained request rate
+            burst: Bucket capacity (defaults to 1, i.e. evenly spaced calls)
+            state_file: Optional path of a state file shared across processes
+            min_calls_per_minute: Lower bound for the adaptive rate after 429s
+            clock: Wall-clock time source in seconds (shared state files need epoch time)
+            sleep: Called with the seconds to wait for a token
+        """
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        
+        self.target_rate = float(calls_per_minute)
+        self.min_rate = float(min_calls_per_minute or max(1.0, calls_per_minute / 8))
+        self.capacity = float(burst or 1)
+        self.state_file = state_file
+        self.clock = clock
+        self.sleep = sleep
+        
+        self._lock = threading.Lock()
+        self._state = self._initial_state()
+        self.logger = logging.getLogger(__name__)
+    
+    def _initial_state(self) -> Dict[str, float]:
+        return {
+            'tokens': self.capacity,
+            'updated_at': self.clock(),
+            'rate': self.target_rate,
+            'blocked_until': 0.0,
+        }
+    
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, float]]:
+        """Yield the bucket state under an in-process (and optional file) lock"""
+        with self._lock:
+            if not self.state_file:
+                yield self._state
+                return
+            
+            fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.pread(fd, 4096, 0)
+                try:
+                    state = json.loads(raw) if raw else self._initial_state()
+                except ValueError:
+                    state = self._initial_state()
+                
+                yield state
+                
+                payload = json.dumps(state).encode()
+                os.ftruncate(fd, 0)
+                os.pwrite(fd, payload, 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+    
+    def _refill(self, state: Dict[str, float], now: float) -> None:
+        elapsed = max(0.0, now - state['updated_at'])
+        state['tokens'] = min(self.capacity, state['tokens'] + elapsed * state['rate'] / 60.0)
+        state['updated_at'] = now
+    
+    def acquire(self) -> float:
+        """
+        Block until a call may be made
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        
+        while True:
+            with self._locked_state() as state:
+                now = self.clock()
+                self._refill(state, now)
+                
+                if now < state['blocked_until']:
+                    wait = state['blocked_until'] - now
+                elif state['tokens'] >= 1.0:
+                    state['tokens'] -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - state['tokens']) * 60.0 / state['rate']
+            
+            self.sleep(wait)
+            waited += wait
+    
+    def record_success(self) -> None:
+        """Additively restore the rate after a successful call"""
+        with self._locked_state() as state:
+            if state['rate'] < self.target_rate:
+                state['rate'] = min(self.target_rate, state['rate'] + self.target_rate * 0.05)
+    
+    def record_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after an HTTP 429 response
+        
+        Args:
+            retry_after: Seconds requested by the server's Retry-After header
+        """
+        with self._locked_state() as state:
+            now = self.clock()
+            self._refill(state, now)
+            
+            # In-flight calls from the same throttling episode only extend the pause
+            if now >= state['blocked_until']:
+                state['rate'] = max(self.min_rate, state['rate'] / 2)
+            state['tokens'] = 0.0
+            pause = retry_after if retry_after is not None else 60.0 / state['rate']
+            state['blocked_until'] = max(state['blocked_until'], now + pause)
+            
+            self.logger.warning(
+                f"Rate limited by API; pausing {pause:.1f}s, rate now {state['rate']:.1f} calls/min"
+            )
+    
+    @property
+    def current_rate(self) -> float:
+        """Current adaptive rate in calls per minute"""
+        with self._locked_state() as state:
+            return state['rate']
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date
+    
+    Args:
+        value: Raw header value
+        now: Epoch time an HTTP date is measured from (defaults to the current time)
+    
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (time.time() if now is None else now))
+    except (TypeError, ValueError):
+        return None
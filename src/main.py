@@ -1,21 +1,39 @@
 #!/usr/bin/env python3
 """
-Main script for testing CoinGecko data extraction
+Main script for CoinGecko data extraction
+
+Streams the market snapshot and the missing price history into PostgreSQL
+through the bounded-memory pipeline in src/pipeline.
 """
 
 import sys
 import os
-from datetime import datetime
 
-# Add src to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.settings import Settings
+from src.extractors.coingecko_extractor import CoinGeckoExtractor
+from src.pipeline.jobs import run_exchange_rates, run_history_sweep, run_market_snapshot
+from src.pipeline.streaming import StreamingPipeline
+from src.utils.change_detection import SnapshotChangeDetector
+from src.utils.db_connection import DatabaseConnection
+from src.utils.exchange_rates import ExchangeRateCache, parse_currencies
+from src.utils.metrics import ExtractionLogWriter, metrics
+
+
+def write_metrics():
+    """Write the run's metrics to METRICS_PROM_FILE / METRICS_JSON_FILE if set"""
+    if Settings.METRICS_PROM_FILE:
+        with open(Settings.METRICS_PROM_FILE, 'w') as f:
+            f.write(metrics.to_prometheus())
+    if Settings.METRICS_JSON_FILE:
+        with open(Settings.METRICS_JSON_FILE, 'w') as f:
+            f.write(metrics.to_json(indent=2))
 
-from extractors.coingecko_extractor import CoinGeckoExtractor
-from utils.db_connection import DatabaseConnection
-from config.settings import Settings
 
 def main():
-    print("🚀 Starting CoinGecko Data Extraction Test")
+    print("🚀 Starting CoinGecko Data Extraction")
     print("=" * 50)
     
     # Initialize components
@@ -28,47 +46,66 @@ def main():
         print("❌ Database connection failed. Please check your setup.")
         return
     
-    # Extract cryptocurrency data
-    print("2. Extracting cryptocurrency data...")
+    # Make sure this month's partitions exist and expired ones are retired
+    db.maintain_partitions()
+    
+    # Run summaries are written to raw_data.extraction_log in the background
+    log_writer = ExtractionLogWriter(db)
     try:
-        crypto_data = extractor.get_top_cryptocurrencies(limit=10)  # Start small for testing
-        print(f"   📊 Extracted {len(crypto_data)} cryptocurrency records")
-        
-        # Display sample data
-        if crypto_data:
-            sample = crypto_data[0]
-            print(f"   Sample: {sample['name']} ({sample['symbol']}) - ${sample['current_price']}")
+        completed = run_jobs(extractor, db, log_writer)
+    finally:
+        log_writer.close()
+        write_metrics()
     
-    except Exception as e:
-        print(f"❌ Error extracting data: {e}")
+    if not completed:
         return
     
-    # Insert data into database
-    print("3. Inserting data into database...")
+    print("=" * 50)
+    print("✅ CoinGecko Data Extraction Complete!")
+
+
+def run_jobs(extractor, db, log_writer) -> bool:
+    """Run the market snapshot, history sweep and rate refresh; False if the snapshot failed"""
+    # Stream market data into the database
+    print("2. Extracting and loading cryptocurrency data...")
     try:
-        records_inserted = db.insert_cryptocurrency_data(crypto_data)
-        print(f"   ✅ Successfully inserted {records_inserted} records")
+        pipeline = StreamingPipeline(Settings.PIPELINE_CHUNK_SIZE, Settings.PIPELINE_QUEUE_SIZE, 'market_snapshot')
+        detector = SnapshotChangeDetector.from_database(db) if Settings.SNAPSHOT_CHANGE_DETECTION else None
+        market = run_market_snapshot(extractor, db, Settings.DEFAULT_CRYPTO_LIMIT, pipeline, log_writer, detector)
+        print(f"   ✅ Loaded {market['records_loaded']} of {market['records_extracted']} records "
+              f"({market['records_skipped']} unchanged)")
     
     except Exception as e:
-        print(f"❌ Error inserting data: {e}")
-        return
+        print(f"❌ Error with market data: {e}")
+        return False
     
-    # Test historical data extraction
-    print("4. Testing historical data extraction...")
+    # Stream missing history for the same coins
+    print("3. Extracting and loading historical data...")
     try:
-        # Get historical data for Bitcoin
-        history = extractor.get_coin_history('bitcoin', days=3)
-        print(f"   📈 Extracted {len(history.get('prices', []))} price points for Bitcoin")
-        
-        # Insert historical data
-        historical_records = db.insert_historical_data([history])
-        print(f"   ✅ Successfully inserted {historical_records} historical records")
+        pipeline = StreamingPipeline(Settings.PIPELINE_CHUNK_SIZE, Settings.PIPELINE_QUEUE_SIZE, 'history_sweep')
+        history = run_history_sweep(extractor, db, market['coin_ids'], Settings.DEFAULT_HISTORICAL_DAYS,
+                                    pipeline, log_writer)
+        print(f"   ✅ Loaded {history['records_loaded']} historical records for {history['records_extracted']} coins")
     
     except Exception as e:
         print(f"❌ Error with historical data: {e}")
     
-    print("=" * 50)
-    print("✅ CoinGecko Data Extraction Test Complete!")
+    # One /exchange_rates call covers every reporting currency, once per TTL
+    currencies = parse_currencies(Settings.REPORTING_CURRENCIES)
+    if currencies not in ([], ['usd']):
+        print("4. Refreshing exchange rates...")
+        try:
+            cache = ExchangeRateCache(db, extractor, Settings.EXCHANGE_RATE_TTL)
+            rates = run_exchange_rates(cache, log_writer)
+            if rates['fetched']:
+                print(f"   ✅ Fetched {rates['records_extracted']} exchange rates")
+            else:
+                print("   ✅ Cached exchange rates are still fresh")
+        
+        except Exception as e:
+            print(f"❌ Error with exchange rates: {e}")
+    
+    return True
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,326 @@
+import heapq
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from ..config.settings import Settings
+from ..utils.metrics import ExtractionLogWriter, track_run
+
+# One unit of backfill work: (coin_id, start, end) with ISO-formatted bounds
+Unit = Tuple[str, str, str]
+
+# Per-process extractor and database connection, created by _init_worker
+_worker = {}
+
+
+def plan_units(coin_ids: List[str], start: datetime, end: datetime, shard_days: int = 90) -> List[Unit]:
+    """
+    Split a backfill into (coin, date range) units
+    
+    Args:
+        coin_ids: Coins to backfill
+        start: Earliest point to cover (naive UTC)
+        end: Latest point to cover (naive UTC)
+        shard_days: Days per unit
+    
+    Returns:
+        Units ordered by range, then coin, so early progress covers every coin
+    """
+    if shard_days < 1:
+        raise ValueError("shard_days must be positive")
+    
+    ranges = []
+    shard_start = start
+    while shard_start < end:
+        shard_end = min(shard_start + timedelta(days=shard_days), end)
+        ranges.append((shard_start.isoformat(), shard_end.isoformat()))
+        shard_start = shard_end
+    
+    return [(coin_id, range_start, range_end) for range_start, range_end in ranges for coin_id in coin_ids]
+
+
+def unit_key(unit: Unit) -> str:
+    return '|'.join(unit)
+
+
+class BackfillJournal:
+    """
+    Append-only JSON-lines checkpoint of a backfill
+    
+    The first line records the plan; every later line records one unit that
+    finished ('done'), failed and was re-queued ('retry'), or ran out of
+    attempts ('dead'). Appending a line per event keeps checkpointing O(1)
+    however large the backfill is, and replaying the file restores the
+    exact state after a crash.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.plan: Optional[Dict] = None
+        self.done: Dict[str, int] = {}
+        self.attempts: Dict[str, int] = {}
+        self.dead_letter: Dict[str, str] = {}
+        
+        if os.path.exists(path):
+            self._replay()
+    
+    def _replay(self) -> None:
+        with open(self.path, 'rb+') as f:
+            intact = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # A crash mid-write leaves at most one torn line at the end;
+                    # cut it off so the next record starts on a line of its own
+                    f.truncate(intact)
+                    break
+                intact += len(line)
+                
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                
+                if event['event'] == 'plan':
+                    self.plan = event
+                    continue
+                
+                key = event['unit']
+                if event['event'] == 'done':
+                    self.done[key] = event['rows']
+                    self.dead_letter.pop(key, None)
+                elif event['event'] == 'retry':
+                    self.attempts[key] = event['attempt']
+                elif event['event'] == 'dead':
+                    self.attempts[key] = event['attempt']
+                    self.dead_letter[key] = event['error']
+                elif event['event'] == 'requeue':
+                    self.attempts.pop(key, None)
+                    self.dead_letter.pop(key, None)
+    
+    def record(self, event: str, **fields) -> None:
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'event': event, 'at': datetime.utcnow().isoformat(), **fields}) + '\n')
+    
+    def start(self, units: List[Unit], **params) -> None:
+        """Record a new plan (the journal must be empty)"""
+        self.plan = {'event': 'plan', 'units': units, **params}
+        self.record('plan', units=units, **params)
+
+
+def _init_worker(rate_limit_state_file: str) -> None:
+    # Imported here so worker processes build their own sessions, engines
+    # and rate limiter handles after the fork. The HTTP cache is off: each
+    # unit is a different range, and the SQLite cache file would be written
+    # by every worker at once
+    from ..extractors.coingecko_extractor import CoinGeckoExtractor
+    from ..extractors.rate_limiter import TokenBucketRateLimiter
+    from ..utils.db_connection import DatabaseConnection
+    
+    rate_limiter = TokenBucketRateLimiter(Settings.API_CALLS_PER_MINUTE, state_file=rate_limit_state_file)
+    _worker['extractor'] = CoinGeckoExtractor(max_workers=1, rate_limiter=rate_limiter, use_cache=False)
+    _worker['db'] = DatabaseConnection()
+
+
+def _run_unit(unit: Unit, interval: Optional[str]) -> int:
+    """Fetch and load one unit in a worker process; returns rows loaded"""
+    from ..utils.transforms import flatten_historical_data
+    
+    coin_id, start, end = unit
+    history = _worker['extractor'].get_coin_history_range(
+        coin_id, datetime.fromisoformat(start), datetime.fromisoformat(end), interval
+    )
+    df = flatten_historical_data([history])
+    if df.empty:
+        return 0
+    return _worker['db'].insert_historical_frame(df)
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 600.0) -> float:
+    """Exponential backoff with full jitter for the given (1-based) attempt"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def run_backfill(coin_ids: List[str], start: datetime, end: datetime, journal_path: str,
+                 processes: int = 4, shard_days: int = 90, interval: Optional[str] = None,
+                 max_attempts: int = 5, retry_base_seconds: float = 5.0, retry_dead_letter: bool = False,
+                 log_writer: Optional[ExtractionLogWriter] = None) -> Dict:
+    """
+    Backfill history for many coins across a process pool, resumably
+    
+    The backfill is split into (coin, date range) units fetched from
+    /market_chart/range and loaded by worker processes. Every worker's
+    extractor draws from the same token bucket through a shared state file
+    (API_RATE_LIMIT_STATE_FILE, or ``<journal>.ratelimit`` if unset), so the
+    pool as a whole stays within the API budget.
+    
+    Progress is appended to ``journal_path`` as units finish. Failed units
+    are re-queued after a jittered exponential backoff; after
+    ``max_attempts`` they go to the dead-letter list and are skipped. If the
+    journal already exists, its plan is resumed (the coin_ids/start/end/
+    shard_days arguments are ignored) and only units without a 'done'
+    record run again; ``retry_dead_letter`` gives dead-lettered units a
+    fresh set of attempts.
+    
+    If a worker process dies (e.g. killed for running out of memory), the
+    pool is replaced and every unit that was in flight counts as a failed
+    attempt, so it is retried or dead-lettered like any other failure.
+    
+    Args:
+        coin_ids: Coins to backfill
+        start: Earliest point to cover (naive UTC)
+        end: Latest point to cover (naive UTC)
+        journal_path: Checkpoint file (JSON lines)
+        processes: Worker processes
+        shard_days: Days per unit
+        interval: Optional data granularity passed to the API
+        max_attempts: Attempts per unit before it is dead-lettered
+        retry_base_seconds: Base delay of the retry backoff
+        retry_dead_letter: Re-queue units dead-lettered by an earlier run
+        log_writer: Background extraction_log writer (optional)
+    
+    Returns:
+        Statistics: units planned, already done, completed, retried,
+        dead-lettered, rows loaded, pool restarts, and the dead-letter list
+    """
+    logger = logging.getLogger(__name__)
+    journal = BackfillJournal(journal_path)
+    
+    if journal.plan is None:
+        journal.start(plan_units(coin_ids, start, end, shard_days), start=start.isoformat(),
+                      end=end.isoformat(), shard_days=shard_days, interval=interval)
+    else:
+        interval = journal.plan.get('interval')
+        logger.info(f"Resuming backfill from {journal_path}: {len(journal.done)} of "
+                    f"{len(journal.plan['units'])} units already done")
+    
+    if retry_dead_letter:
+        for key in list(journal.dead_letter):
+            journal.record('requeue', unit=key)
+        journal.attempts = {key: n for key, n in journal.attempts.items() if key not in journal.dead_letter}
+        journal.dead_letter.clear()
+    
+    units = [tuple(unit) for unit in journal.plan['units']]
+    pending = deque(unit for unit in units
+                    if unit_key(unit) not in journal.done and unit_key(unit) not in journal.dead_letter)
+    stats = {
+        'units': len(units),
+        'already_done': sum(unit_key(unit) in journal.done for unit in units),
+        'completed': 0,
+        'retried': 0,
+        'dead_lettered': 0,
+        'rows_loaded': 0,
+        'pool_restarts': 0,
+    }
+    
+    rate_limit_state_file = Settings.API_RATE_LIMIT_STATE_FILE or f"{journal_path}.ratelimit"
+    
+    with track_run('historical', log_writer) as summary:
+        retry_heap: List[Tuple[float, int, Unit]] = []
+        sequence = 0
+        
+        def new_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                       initargs=(rate_limit_state_file,))
+        
+        def fail(unit: Unit, error: Exception) -> None:
+            nonlocal sequence
+            key = unit_key(unit)
+            attempt = journal.attempts.get(key, 0) + 1
+            journal.attempts[key] = attempt
+            
+            if attempt >= max_attempts:
+                journal.dead_letter[key] = str(error)
+                journal.record('dead', unit=key, attempt=attempt, error=str(error))
+                stats['dead_lettered'] += 1
+                logger.error(f"Backfill unit {key} dead-lettered after {attempt} attempts: {error}")
+            else:
+                delay = backoff_delay(attempt, retry_base_seconds)
+                journal.record('retry', unit=key, attempt=attempt, error=str(error))
+                heapq.heappush(retry_heap, (time.time() + delay, sequence, unit))
+                sequence += 1
+                stats['retried'] += 1
+                logger.warning(f"Backfill unit {key} failed (attempt {attempt}); retrying in {delay:.1f}s: {error}")
+        
+        def settle(future: Future, unit: Unit) -> bool:
+            """Record a finished unit; returns True if the pool broke under it"""
+            key = unit_key(unit)
+            
+            try:
+                rows = future.result()
+            except BrokenProcessPool as e:
+                fail(unit, e)
+                return True
+            except Exception as e:
+                fail(unit, e)
+                return False
+            
+            journal.done[key] = rows
+            journal.record('done', unit=key, rows=rows)
+            stats['completed'] += 1
+            stats['rows_loaded'] += rows
+            
+            finished = stats['already_done'] + stats['completed']
+            if finished % 50 == 0 or finished == len(units):
+                logger.info(f"Backfill progress: {finished}/{len(units)} units, {stats['rows_loaded']} rows")
+            return False
+        
+        executor = new_pool()
+        in_flight: Dict[Future, Unit] = {}
+        
+        try:
+            while pending or retry_heap or in_flight:
+                now = time.time()
+                while retry_heap and retry_heap[0][0] <= now:
+                    pending.append(heapq.heappop(retry_heap)[2])
+                
+                # Keep every worker busy plus one queued unit each
+                broken = False
+                while pending and len(in_flight) < processes * 2:
+                    unit = pending.popleft()
+                    try:
+                        in_flight[executor.submit(_run_unit, unit, interval)] = unit
+                    except BrokenProcessPool:
+                        pending.appendleft(unit)
+                        broken = True
+                        break
+                
+                if not broken:
+                    if not in_flight:
+                        time.sleep(max(0.0, retry_heap[0][0] - time.time()))
+                        continue
+                    
+                    timeout = max(0.0, retry_heap[0][0] - time.time()) if retry_heap else None
+                    done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                    
+                    for future in done:
+                        broken = settle(future, in_flight.pop(future)) or broken
+                
+                if broken:
+                    # A dead worker fails every unit still queued in the pool;
+                    # settle them all, then carry on with a fresh pool
+                    wait(in_flight)
+                    for future, unit in list(in_flight.items()):
+                        settle(future, unit)
+                    in_flight.clear()
+                    
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_pool()
+                    stats['pool_restarts'] += 1
+                    logger.warning("Backfill worker process died; restarted the process pool")
+        finally:
+            executor.shutdown(cancel_futures=True)
+        
+        summary['records_extracted'] = stats['completed'] + stats['dead_lettered']
+        summary['records_inserted'] = stats['rows_loaded']
+        if journal.dead_letter:
+            summary['status'] = 'partial'
+    
+    stats['dead_letter'] = dict(journal.dead_letter)
+    return stats
@@ -0,0 +1,153 @@
+from typing import Dict, List, Optional
+
+from ..utils.change_detection import SnapshotChangeDetector
+from ..utils.exchange_rates import ExchangeRateCache
+from ..utils.market_batch import MarketSnapshotBatch
+from ..utils.metrics import ExtractionLogWriter, metrics, track_run
+from ..utils.transforms import flatten_historical_data
+from .streaming import StreamingPipeline
+
+
+def run_market_snapshot(extractor, db, limit: int,
+                        pipeline: Optional[StreamingPipeline] = None,
+                        log_writer: Optional[ExtractionLogWriter] = None,
+                        detector: Optional[SnapshotChangeDetector] = None) -> Dict:
+    """
+    Stream the top ``limit`` coins from /coins/markets into raw_data
+    
+    Pages are decoded into typed MarketSnapshotBatch columns and loaded as
+    they arrive rather than after the whole universe has been fetched. With
+    a ``detector``, coins unchanged since their last load are skipped. The
+    run is recorded in the metrics registry and, with a ``log_writer``, in
+    raw_data.extraction_log as 'market_data'.
+    
+    Args:
+        extractor: CoinGeckoExtractor
+        db: DatabaseConnection
+        limit: Number of coins to snapshot
+        pipeline: Pipeline runner (defaults to a fresh StreamingPipeline)
+        log_writer: Background extraction_log writer (optional)
+        detector: Change detector shared across runs (optional)
+        
+    Returns:
+        Pipeline statistics, plus the extracted ``coin_ids`` in rank order and
+        ``records_skipped`` (unchanged coins not written)
+    """
+    pipeline = pipeline or StreamingPipeline(name='market_snapshot')
+    coin_ids: List[str] = []
+    skipped = 0
+    
+    def load(batch: MarketSnapshotBatch) -> int:
+        nonlocal skipped
+        coin_ids.extend(batch.ids)
+        if detector is None:
+            return db.insert_cryptocurrency_data(batch)
+        
+        changed = detector.changed(batch)
+        skipped += len(batch) - len(changed)
+        if not len(changed):
+            return 0
+        
+        records_inserted = db.insert_cryptocurrency_data(changed)
+        detector.commit(changed)
+        return records_inserted
+    
+    with track_run('market_data', log_writer) as summary:
+        stats = pipeline.run(extractor.iter_market_snapshot_batches(limit), load,
+                             transform=MarketSnapshotBatch.concat, record_count=len)
+        summary['records_extracted'] = stats['records_extracted']
+        summary['records_inserted'] = stats['records_loaded']
+        if stats['records_loaded'] + skipped < stats['records_extracted']:
+            summary['status'] = 'partial'
+    
+    if skipped:
+        metrics.inc('pipeline_records_total', skipped, job='market_data', stage='skipped')
+    
+    stats['coin_ids'] = coin_ids
+    stats['records_skipped'] = skipped
+    return stats
+
+
+def run_history_sweep(extractor, db, coin_ids: List[str], days: int,
+                      pipeline: Optional[StreamingPipeline] = None,
+                      log_writer: Optional[ExtractionLogWriter] = None) -> Dict:
+    """
+    Stream missing history for ``coin_ids`` into raw_data.historical_data
+    
+    Each coin only fetches the span after its stored watermark. Chunks of
+    coins are flattened in the extraction thread and merged into the
+    database in the caller's thread. The run is logged as 'historical'
+    (records_extracted counts coins, records_inserted counts rows).
+    
+    Args:
+        extractor: CoinGeckoExtractor
+        db: DatabaseConnection
+        coin_ids: Coins to refresh
+        days: History window to keep covered
+        pipeline: Pipeline runner (defaults to a fresh StreamingPipeline)
+        log_writer: Background extraction_log writer (optional)
+        
+    Returns:
+        Pipeline statistics
+    """
+    pipeline = pipeline or StreamingPipeline(name='history_sweep')
+    with track_run('historical', log_writer) as summary:
+        watermarks = db.get_history_watermarks(coin_ids)
+        source = extractor.iter_batch_data(coin_ids, days=days, watermarks=watermarks)
+        stats = pipeline.run(source, db.insert_historical_frame, transform=flatten_historical_data)
+        summary['records_extracted'] = stats['records_extracted']
+        summary['records_inserted'] = stats['records_loaded']
+    
+    return stats
+
+
+def run_global_snapshot(extractor, db, log_writer: Optional[ExtractionLogWriter] = None) -> Dict:
+    """
+    Load one /global market statistics row into raw_data.global_market_data
+    
+    Logged as 'global' in raw_data.extraction_log when a ``log_writer`` is given.
+    
+    Args:
+        extractor: CoinGeckoExtractor
+        db: DatabaseConnection
+        log_writer: Background extraction_log writer (optional)
+        
+    Returns:
+        Dictionary with ``records_extracted`` and ``records_loaded``
+    """
+    with track_run('global', log_writer) as summary:
+        data = extractor.get_global_market_data()
+        summary['records_extracted'] = 1
+        summary['records_inserted'] = db.insert_global_market_data(data)
+    
+    return {'records_extracted': summary['records_extracted'], 'records_loaded': summary['records_inserted']}
+
+
+def run_exchange_rates(cache: ExchangeRateCache, log_writer: Optional[ExtractionLogWriter] = None,
+                       force: bool = False) -> Dict:
+    """
+    Refresh raw_data.exchange_rates from /exchange_rates once the cached rates expire
+    
+    Nothing is fetched or logged while the stored rates are younger than the
+    cache's TTL. A fetch is logged as 'exchange_rates' when a ``log_writer``
+    is given.
+    
+    Args:
+        cache: ExchangeRateCache with an extractor
+        log_writer: Background extraction_log writer (optional)
+        force: Fetch even if the stored rates are still fresh
+        
+    Returns:
+        Dictionary with ``records_extracted``, ``records_loaded`` and
+        ``fetched`` (False if the cached rates were still fresh)
+    """
+    if not force and not cache.is_stale():
+        return {'records_extracted': 0, 'records_loaded': 0, 'fetched': False}
+    
+    with track_run('exchange_rates', log_writer) as summary:
+        data = cache.extractor.get_exchange_rates()
+        summary['records_extracted'] = len(data.get('rates', {}))
+        summary['records_inserted'] = cache.db.insert_exchange_rates(data)
+    
+    return {'records_extracted': summary['records_extracted'], 'records_loaded': summary['records_inserted'],
+            'fetched': True}
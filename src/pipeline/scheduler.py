@@ -0,0 +1,236 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from ..utils.change_detection import SnapshotChangeDetector
+from ..utils.exchange_rates import ExchangeRateCache
+from ..utils.metrics import ExtractionLogWriter, metrics
+from .jobs import run_exchange_rates, run_global_snapshot, run_history_sweep, run_market_snapshot
+from .streaming import StreamingPipeline
+
+# Task priorities; lower values run first when several tasks are due
+PRIORITY_SNAPSHOT = 0
+PRIORITY_GLOBAL = 1
+PRIORITY_HISTORY = 2
+PRIORITY_MAINTENANCE = 3
+
+
+class PollingScheduler:
+    """
+    Single-threaded multi-cadence scheduler for a long-running extractor
+    
+    Periodic jobs wait in a timer heap ordered by due time. Once due they
+    move to a ready heap ordered by (priority, due time), and the next task
+    run is always the most urgent ready one. Bulk work is split into small
+    tasks with ``submit``, so a due snapshot takes the next slot instead of
+    waiting for a whole history sweep to finish.
+    
+    Every task runs on the thread that calls ``run_forever``, so tasks that
+    close over one extractor and one DatabaseConnection share a single rate
+    budget and connection pool without extra locking. A periodic job whose
+    previous run is still queued is skipped rather than queued twice, and a
+    job that falls behind resumes on its cadence instead of catching up.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            clock: Monotonic time source in seconds
+        """
+        self.clock = clock
+        self._jobs: Dict[str, Dict] = {}
+        self._timers: List = []
+        self._ready: List = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self.logger = logging.getLogger(__name__)
+    
+    def every(self, name: str, interval: float, func: Callable[[], None],
+              priority: int = PRIORITY_MAINTENANCE, run_now: bool = True) -> None:
+        """
+        Register a periodic job
+        
+        Args:
+            name: Job name used in logs and metrics
+            interval: Seconds between runs
+            func: Called without arguments; may ``submit`` follow-up tasks under the same name
+            priority: Task priority (lower runs first)
+            run_now: Run as soon as the scheduler starts rather than after one interval
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        
+        self._jobs[name] = {'interval': interval, 'func': func, 'priority': priority}
+        due = self.clock() + (0 if run_now else interval)
+        heapq.heappush(self._timers, (due, next(self._seq), name))
+    
+    def submit(self, name: str, func: Callable[[], None], priority: int,
+               due: Optional[float] = None) -> None:
+        """Queue a one-off task, ready to run now"""
+        heapq.heappush(self._ready, (priority, self.clock() if due is None else due, next(self._seq), name, func))
+    
+    def pending(self, name: str) -> int:
+        """Number of queued tasks for ``name``"""
+        return sum(1 for task in self._ready if task[3] == name)
+    
+    def _release_due(self, now: float) -> None:
+        while self._timers and self._timers[0][0] <= now:
+            due, _, name = heapq.heappop(self._timers)
+            job = self._jobs[name]
+            
+            if self.pending(name):
+                self.logger.warning(f"Skipping {name}: the previous run is still queued")
+                metrics.inc('scheduler_skipped_total', job=name)
+            else:
+                self.submit(name, job['func'], job['priority'], due)
+            
+            # Next slot on the job's cadence that is still in the future
+            missed = int((now - due) // job['interval'])
+            heapq.heappush(self._timers, (due + (missed + 1) * job['interval'], next(self._seq), name))
+    
+    def run_pending(self) -> bool:
+        """
+        Run the most urgent due task
+        
+        Returns:
+            False if nothing was due
+        """
+        self._release_due(self.clock())
+        if not self._ready:
+            return False
+        
+        _, due, _, name, func = heapq.heappop(self._ready)
+        started = self.clock()
+        metrics.observe('scheduler_lag_seconds', max(0.0, started - due), job=name)
+        
+        try:
+            func()
+            status = 'success'
+        except Exception as e:
+            status = 'failed'
+            self.logger.exception(f"Scheduled task {name} failed: {e}")
+        
+        metrics.inc('scheduler_tasks_total', job=name, status=status)
+        metrics.observe('scheduler_task_seconds', self.clock() - started, job=name)
+        return True
+    
+    def run_forever(self, after_task: Optional[Callable[[], None]] = None) -> None:
+        """
+        Run tasks until ``stop`` is called
+        
+        Args:
+            after_task: Called after every task (e.g. to export metrics)
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            if self.run_pending():
+                if after_task:
+                    after_task()
+                continue
+            
+            timeout = max(0.0, self._timers[0][0] - self.clock()) if self._timers else None
+            self._stop.wait(timeout)
+    
+    def stop(self) -> None:
+        """Stop after the running task; safe to call from a signal handler"""
+        self._stop.set()
+
+
+def schedule_extraction_jobs(scheduler: PollingScheduler, extractor, db, limit: int, days: int,
+                             snapshot_interval: float = 60, global_interval: float = 300,
+                             history_interval: float = 3600, history_unit_size: int = 10,
+                             log_writer: Optional[ExtractionLogWriter] = None,
+                             make_pipeline: Optional[Callable[[str], StreamingPipeline]] = None,
+                             detector: Optional[SnapshotChangeDetector] = None,
+                             rate_cache: Optional[ExchangeRateCache] = None) -> None:
+    """
+    Register the market snapshot, global statistics and history sweep jobs
+    
+    The hourly history sweep is queued as one low-priority task per
+    ``history_unit_size`` coins (top ``limit`` by the latest snapshot), so
+    snapshots preempt it between units. The sweep is written to
+    extraction_log as a single 'historical' run once its last unit finishes,
+    which then queues a refresh of analytics.coin_daily_metrics. With a
+    ``rate_cache``, the cached exchange rates are checked every
+    ``global_interval`` and fetched again once their TTL has passed.
+    
+    Args:
+        scheduler: Scheduler to register the jobs with
+        extractor: Shared CoinGeckoExtractor
+        db: Shared DatabaseConnection
+        limit: Coins per snapshot and history sweep
+        days: History window to keep covered
+        snapshot_interval: Seconds between market snapshots
+        global_interval: Seconds between /global loads
+        history_interval: Seconds between history sweeps
+        history_unit_size: Coins per history task
+        log_writer: Background extraction_log writer (optional)
+        make_pipeline: Builds a StreamingPipeline for a job name (defaults to StreamingPipeline defaults)
+        detector: Change detector kept across snapshots (optional)
+        rate_cache: Exchange-rate cache for non-USD reporting currencies (optional)
+    """
+    make_pipeline = make_pipeline or (lambda name: StreamingPipeline(name=name))
+    
+    def market_snapshot():
+        run_market_snapshot(extractor, db, limit, make_pipeline('market_snapshot'), log_writer, detector)
+    
+    def global_snapshot():
+        run_global_snapshot(extractor, db, log_writer)
+    
+    def history_sweep():
+        coin_ids = db.get_latest_prices().index[:limit].tolist()
+        if not coin_ids:
+            return
+        
+        units = [coin_ids[i:i + history_unit_size] for i in range(0, len(coin_ids), history_unit_size)]
+        sweep = {'remaining': len(units), 'coins': 0, 'rows': 0, 'failed': 0,
+                 'start_time': datetime.utcnow(), 'started': time.perf_counter()}
+        
+        def finish():
+            failed = sweep['failed']
+            status = 'success' if not failed else 'partial' if failed < len(units) else 'failed'
+            duration = time.perf_counter() - sweep['started']
+            scheduler.logger.info(f"History sweep {status}: {sweep['rows']} rows for {sweep['coins']} coins "
+                                  f"in {len(units)} units ({duration:.1f}s)")
+            if log_writer is not None:
+                log_writer.submit('historical', status,
+                                  records_extracted=sweep['coins'],
+                                  records_inserted=sweep['rows'],
+                                  error_message=f"{failed} of {len(units)} units failed" if failed else None,
+                                  start_time=sweep['start_time'],
+                                  end_time=datetime.utcnow(),
+                                  duration_seconds=int(round(duration)))
+            
+            # Daily metrics for the refreshed window, behind any due snapshot
+            start = datetime.utcnow().date() - timedelta(days=days)
+            scheduler.submit('market_metrics', lambda: db.refresh_market_metrics(start), PRIORITY_MAINTENANCE)
+        
+        def unit_task(unit: List[str]) -> Callable[[], None]:
+            def run_unit():
+                try:
+                    stats = run_history_sweep(extractor, db, unit, days, make_pipeline('history_sweep'))
+                    sweep['coins'] += stats['records_extracted']
+                    sweep['rows'] += stats['records_loaded']
+                except Exception:
+                    sweep['failed'] += 1
+                    raise
+                finally:
+                    sweep['remaining'] -= 1
+                    if not sweep['remaining']:
+                        finish()
+            return run_unit
+        
+        for unit in units:
+            scheduler.submit('history_sweep', unit_task(unit), PRIORITY_HISTORY)
+    
+    scheduler.every('market_snapshot', snapshot_interval, market_snapshot, PRIORITY_SNAPSHOT)
+    scheduler.every('global_snapshot', global_interval, global_snapshot, PRIORITY_GLOBAL)
+    scheduler.every('history_sweep', history_interval, history_sweep, PRIORITY_HISTORY)
+    scheduler.every('maintain_partitions', 86400, db.maintain_partitions, PRIORITY_MAINTENANCE)
+    if rate_cache is not None:
+        scheduler.every('exchange_rates', global_interval, lambda: run_exchange_rates(rate_cache, log_writer),
+                        PRIORITY_GLOBAL)
@@ -0,0 +1,130 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Marks the end of the stream on the hand-off queue
+_END = object()
+
+
+class StreamingPipeline:
+    """
+    Bounded-memory extract -> transform -> load runner
+    
+    A producer thread pulls records from the source iterator, groups them
+    into fixed-size chunks, transforms each chunk and hands it to the loader
+    through a bounded queue. The caller's thread loads chunks as they arrive,
+    so network fetches and database writes overlap. When the loader falls
+    behind, the queue fills up and the producer blocks, which stops it from
+    pulling more records from the source: a slow database throttles
+    extraction instead of growing memory.
+    
+    At most ``max_pending_chunks + 2`` chunks are held at any time (one being
+    built, the queued ones, and one being loaded).
+    """
+    
+    def __init__(self, chunk_size: int = 50, max_pending_chunks: int = 4, name: str = 'pipeline'):
+        """
+        Args:
+            chunk_size: Records per chunk handed to transform/load
+            max_pending_chunks: Capacity of the queue between the stages
+            name: Label used in log messages
+        """
+        if chunk_size < 1 or max_pending_chunks < 1:
+            raise ValueError("chunk_size and max_pending_chunks must be positive")
+        
+        self.chunk_size = chunk_size
+        self.max_pending_chunks = max_pending_chunks
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+    
+    def run(self, source: Iterable[Any], load: Callable[[Any], int],
+            transform: Optional[Callable[[List[Any]], Any]] = None,
+            record_count: Optional[Callable[[Any], int]] = None) -> Dict[str, Any]:
+        """
+        Stream records from ``source`` into ``load``
+        
+        Args:
+            source: Iterable of extracted records (consumed lazily)
+            load: Called with each transformed chunk; returns rows written
+            transform: Optional function applied to each list of records
+            record_count: For sources that yield batches of records, returns
+                the number of records in one item; chunks then close once
+                they hold ``chunk_size`` records rather than items
+            
+        Returns:
+            Run statistics (records, chunks, rows loaded, timings, peak queue depth)
+        """
+        handoff = queue.Queue(maxsize=self.max_pending_chunks)
+        stop = threading.Event()
+        stats = {
+            'records_extracted': 0,
+            'chunks': 0,
+            'records_loaded': 0,
+            'producer_blocked_seconds': 0.0,
+            'peak_queue_depth': 0,
+        }
+        errors: List[BaseException] = []
+        
+        def put(item) -> bool:
+            """Block on a full queue, giving up if the loader has stopped"""
+            started = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    handoff.put(item, timeout=0.1)
+                    stats['producer_blocked_seconds'] += time.perf_counter() - started
+                    stats['peak_queue_depth'] = max(stats['peak_queue_depth'], handoff.qsize())
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce() -> None:
+            chunk = []
+            chunk_records = 0
+            try:
+                for record in source:
+                    count = record_count(record) if record_count else 1
+                    chunk.append(record)
+                    chunk_records += count
+                    stats['records_extracted'] += count
+                    
+                    if chunk_records >= self.chunk_size:
+                        if not put(transform(chunk) if transform else chunk):
+                            return
+                        chunk = []
+                        chunk_records = 0
+                
+                if chunk:
+                    put(transform(chunk) if transform else chunk)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                put(_END)
+        
+        started = time.perf_counter()
+        producer = threading.Thread(target=produce, name=f'{self.name}-extract', daemon=True)
+        producer.start()
+        
+        try:
+            while True:
+                item = handoff.get()
+                if item is _END:
+                    break
+                
+                stats['records_loaded'] += load(item) or 0
+                stats['chunks'] += 1
+        finally:
+            stop.set()
+            producer.join()
+        
+        if errors:
+            raise errors[0]
+        
+        stats['duration_seconds'] = time.perf_counter() - started
+        self.logger.info(
+            f"{self.name}: {stats['records_extracted']} records in {stats['chunks']} chunks, "
+            f"{stats['records_loaded']} rows loaded in {stats['duration_seconds']:.1f}s"
+        )
+        return stats
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Rebuild raw tables from the Parquet landing zone
+
+Usage:
+    python src/replay.py --table history --start 2024-05-01 --end 2024-05-31
+    python src/replay.py --table all --method copy
+
+Reads the batches written to LANDING_ZONE_DIR by earlier runs (memory-mapped)
+and loads them into raw_data.* without calling the CoinGecko API.
+"""
+
+import argparse
+import sys
+import os
+import time
+from datetime import date
+
+# Add repository root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.db_connection import DatabaseConnection
+
+TABLES = {
+    'market': 'raw_data.cryptocurrency_data',
+    'history': 'raw_data.historical_data',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--table', choices=[*TABLES, 'all'], default='all', help='Raw table(s) to replay')
+    parser.add_argument('--start', type=date.fromisoformat, help='First landed day (YYYY-MM-DD)')
+    parser.add_argument('--end', type=date.fromisoformat, help='Last landed day (YYYY-MM-DD)')
+    parser.add_argument('--method', choices=['upsert', 'copy', 'insert', 'auto'],
+                        help='Load path (defaults to the live load path)')
+    args = parser.parse_args()
+    
+    print("🚀 Replaying landing zone")
+    print("=" * 50)
+    
+    db = DatabaseConnection()
+    if db.landing_zone is None:
+        print("❌ LANDING_ZONE_DIR is not set.")
+        return 1
+    if not db.test_connection():
+        print("❌ Database connection failed. Please check your setup.")
+        return 1
+    
+    tables = TABLES.values() if args.table == 'all' else [TABLES[args.table]]
+    for table_name in tables:
+        started = time.perf_counter()
+        loaded = db.replay_landing_zone(table_name, args.start, args.end, args.method)
+        print(f"   ✅ {table_name}: {loaded} records in {time.perf_counter() - started:.1f}s")
+    
+    db.close_connection()
+    print("=" * 50)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+import io
+import json
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Loadable columns of the raw tables and their types, mirroring
+# sql/init/02_create_raw_tables.sql (SERIAL ids and created_at defaults are
+# left to Postgres)
+RAW_TABLE_COLUMNS: Dict[str, Dict[str, str]] = {
+    'raw_data.cryptocurrency_data': {
+        'id': 'text',
+        'symbol': 'text',
+        'name': 'text',
+        'image': 'text',
+        'current_price': 'decimal',
+        'market_cap': 'bigint',
+        'market_cap_rank': 'integer',
+        'fully_diluted_valuation': 'bigint',
+        'total_volume': 'bigint',
+        'high_24h': 'decimal',
+        'low_24h': 'decimal',
+        'price_change_24h': 'decimal',
+        'price_change_percentage_24h': 'decimal',
+        'market_cap_change_24h': 'bigint',
+        'market_cap_change_percentage_24h': 'decimal',
+        'circulating_supply': 'bigint',
+        'total_supply': 'bigint',
+        'max_supply': 'bigint',
+        'ath': 'decimal',
+        'ath_change_percentage': 'decimal',
+        'ath_date': 'timestamp',
+        'atl': 'decimal',
+        'atl_change_percentage': 'decimal',
+        'atl_date': 'timestamp',
+        'roi': 'json',
+        'last_updated': 'timestamp',
+        'extracted_at': 'timestamp',
+    },
+    'raw_data.historical_data': {
+        'coin_id': 'text',
+        'timestamp': 'timestamp',
+        'price': 'decimal',
+        'market_cap': 'bigint',
+        'volume': 'bigint',
+        'extracted_at': 'timestamp',
+    },
+    'raw_data.global_market_data': {
+        'active_cryptocurrencies': 'integer',
+        'upcoming_icos': 'integer',
+        'ongoing_icos': 'integer',
+        'ended_icos': 'integer',
+        'markets': 'integer',
+        'total_market_cap': 'json',
+        'total_volume': 'json',
+        'market_cap_percentage': 'json',
+        'market_cap_change_percentage_24h_usd': 'decimal',
+        'updated_at': 'integer',
+        'extracted_at': 'timestamp',
+    },
+}
+
+# Per-coin latest market snapshot (see 04_create_analytics_tables.sql); rows
+# come from raw_data.cryptocurrency_data with id renamed to coin_id
+LATEST_PRICE_COLUMNS: Dict[str, str] = {
+    'coin_id': 'text',
+    'symbol': 'text',
+    'name': 'text',
+    'current_price': 'decimal',
+    'market_cap': 'bigint',
+    'market_cap_rank': 'integer',
+    'total_volume': 'bigint',
+    'high_24h': 'decimal',
+    'low_24h': 'decimal',
+    'price_change_24h': 'decimal',
+    'price_change_percentage_24h': 'decimal',
+    'circulating_supply': 'bigint',
+    'last_updated': 'timestamp',
+    'extracted_at': 'timestamp',
+}
+
+# Natural keys used to merge batches idempotently (see 06_create_constraints.sql)
+UPSERT_KEYS: Dict[str, List[str]] = {
+    'raw_data.historical_data': ['coin_id', 'timestamp'],
+    'analytics.latest_prices': ['coin_id'],
+    'analytics.coin_daily_metrics': ['coin_id', 'date'],
+    'raw_data.exchange_rates': ['currency', 'date'],
+}
+
+# Value ranges of the integer column types
+INTEGER_BOUNDS = {
+    'bigint': (-2 ** 63, 2 ** 63 - 1),
+    'integer': (-2 ** 31, 2 ** 31 - 1),
+}
+
+# Rows written to the COPY buffer per round trip
+COPY_CHUNK_SIZE = 50000
+
+
+def _coerce_integer(series: pd.Series, column: str, column_type: str) -> pd.Series:
+    values = pd.to_numeric(series, errors='coerce').astype('float64').round()
+    low, high = INTEGER_BOUNDS[column_type]
+    
+    # float64 cannot represent 2**63 - 1 exactly, so compare against the bound
+    # that survives the round trip
+    out_of_range = (values < low) | (values >= float(high))
+    if out_of_range.any():
+        logger.warning(f"Nulling {int(out_of_range.sum())} out-of-range values in {column} ({column_type})")
+        values = values.mask(out_of_range)
+    
+    return values.astype('Int64')
+
+
+def _coerce_timestamp(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series
+    else:
+        values = pd.to_datetime(series, utc=True, errors='coerce', format='ISO8601')
+    
+    if getattr(values.dt, 'tz', None) is not None:
+        values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+    
+    # Format once in NumPy; pandas' per-value datetime formatting dominates COPY time
+    text = np.datetime_as_string(values.to_numpy().astype('datetime64[us]'), unit='us')
+    return pd.Series(text, index=series.index, dtype='object').mask(values.isna().to_numpy())
+
+
+def _coerce_json(series: pd.Series) -> pd.Series:
+    return series.map(lambda x: x if isinstance(x, str) else (json.dumps(x) if x else None))
+
+
+def prepare_copy_frame(df: pd.DataFrame, column_types: Dict[str, str]) -> pd.DataFrame:
+    """
+    Project and convert a DataFrame to the target table's column types
+    
+    Columns not present in the table are dropped, so extra API fields never
+    reach Postgres. Integer columns are rounded into nullable Int64, decimals
+    become float64, timestamps are normalised to naive UTC and JSON values are
+    serialised once.
+    
+    Args:
+        df: Source DataFrame
+        column_types: Ordered mapping of table column name to type
+    
+    Returns:
+        DataFrame whose columns are a subset of the table's, in table order
+    """
+    columns = [column for column in column_types if column in df.columns]
+    out = pd.DataFrame(index=df.index)
+    
+    for column in columns:
+        column_type = column_types[column]
+        series = df[column]
+        
+        if column_type in INTEGER_BOUNDS:
+            out[column] = _coerce_integer(series, column, column_type)
+        elif column_type == 'decimal':
+            out[column] = pd.to_numeric(series, errors='coerce').astype('float64')
+        elif column_type == 'timestamp':
+            out[column] = _coerce_timestamp(series)
+        elif column_type == 'json':
+            out[column] = _coerce_json(series)
+        else:
+            out[column] = series.where(series.notna(), None)
+    
+    return out
+
+
+def copy_dataframe(engine, df: pd.DataFrame, table_name: str,
+                   column_types: Optional[Dict[str, str]] = None,
+                   chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """
+    Bulk-load a DataFrame with COPY FROM STDIN
+    
+    Rows are streamed as CSV through an in-memory buffer over the engine's
+    psycopg2 connection, in chunks, inside a single transaction.
+    
+    Args:
+        engine: SQLAlchemy engine using the psycopg2 driver
+        df: Rows to load
+        table_name: Target table name with schema
+        column_types: Column type mapping (defaults to RAW_TABLE_COLUMNS)
+        chunk_size: Rows per COPY buffer
+    
+    Returns:
+        Number of rows loaded
+    """
+    column_types = column_types or RAW_TABLE_COLUMNS[table_name]
+    frame = prepare_copy_frame(df, column_types)
+    if frame.empty:
+        return 0
+    
+    column_list = ', '.join(f'"{column}"' for column in frame.columns)
+    copy_sql = f"COPY {table_name} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '')"
+    
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            copy_chunks(cursor, frame, copy_sql, chunk_size)
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+    
+    return len(frame)
+
+
+def upsert_dataframe(engine, df: pd.DataFrame, table_name: str, key_columns: Optional[List[str]] = None,
+                     column_types: Optional[Dict[str, str]] = None,
+                     chunk_size: int = COPY_CHUNK_SIZE, newer_column: Optional[str] = None) -> int:
+    """
+    Merge a DataFrame into a table keyed on its natural key
+    
+    Rows are COPYed into a temporary staging table, de-duplicated on the key
+    (keeping the most recently extracted row) and merged with
+    INSERT ... ON CONFLICT DO UPDATE. Rows whose values are unchanged are left
+    alone, so re-loading an overlapping window writes no new tuples.
+    
+    Args:
+        engine: SQLAlchemy engine using the psycopg2 driver
+        df: Rows to merge
+        table_name: Target table name with schema
+        key_columns: Conflict target columns (defaults to UPSERT_KEYS)
+        column_types: Column type mapping (defaults to RAW_TABLE_COLUMNS)
+        chunk_size: Rows per COPY buffer
+        newer_column: If set, existing rows are only replaced by rows whose
+            value in this column is at least as recent
+    
+    Returns:
+        Number of rows inserted or updated
+    """
+    key_columns = key_columns or UPSERT_KEYS[table_name]
+    column_types = column_types or RAW_TABLE_COLUMNS[table_name]
+    frame = prepare_copy_frame(df, column_types)
+    if frame.empty:
+        return 0
+    
+    columns = [f'"{column}"' for column in frame.columns]
+    keys = [f'"{column}"' for column in key_columns]
+    updates = [column for column in columns if column not in keys]
+    column_list = ', '.join(columns)
+    key_list = ', '.join(keys)
+    order_by = key_list + (', "extracted_at" DESC' if 'extracted_at' in frame.columns else '')
+    
+    if updates:
+        conflict_action = f"""DO UPDATE SET
+            {', '.join(f'{column} = EXCLUDED.{column}' for column in updates)}
+        WHERE ({', '.join(f'target.{column}' for column in updates)})
+            IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in updates)})"""
+        if newer_column:
+            conflict_action += f'\n          AND EXCLUDED."{newer_column}" >= target."{newer_column}"'
+    else:
+        # Every column is part of the key, so a conflicting row is already identical
+        conflict_action = "DO NOTHING"
+    
+    merge_sql = f"""
+        INSERT INTO {table_name} AS target ({column_list})
+        SELECT DISTINCT ON ({key_list}) {column_list}
+        FROM pg_temp.upsert_staging
+        ORDER BY {order_by}
+        ON CONFLICT ({key_list}) {conflict_action}
+    """
+    
+    raw_connection = engine.raw_connection()
+    try:
+        with raw_connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE upsert_staging ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM {table_name} WITH NO DATA"
+            )
+            copy_chunks(
+                cursor, frame,
+                f"COPY pg_temp.upsert_staging ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '')",
+                chunk_size
+            )
+            cursor.execute(merge_sql)
+            merged = cursor.rowcount
+        raw_connection.commit()
+    except Exception:
+        raw_connection.rollback()
+        raise
+    finally:
+        raw_connection.close()
+    
+    return merged
+
+
+def copy_chunks(cursor, frame: pd.DataFrame, copy_sql: str, chunk_size: int = COPY_CHUNK_SIZE) -> None:
+    """
+    Stream a prepared DataFrame through an open psycopg2 cursor
+    
+    Args:
+        cursor: psycopg2 cursor (the caller owns the transaction)
+        frame: DataFrame produced by prepare_copy_frame
+        copy_sql: COPY ... FROM STDIN statement
+        chunk_size: Rows per COPY buffer
+    """
+    for start in range(0, len(frame), chunk_size):
+        buffer = io.StringIO()
+        frame.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=False, na_rep='')
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
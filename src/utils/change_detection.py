@@ -0,0 +1,85 @@
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .market_batch import MarketSnapshotBatch
+
+Signature = Tuple[int, float, float]
+
+
+def _signatures(last_updated, current_price, market_cap_rank) -> List[Signature]:
+    """
+    Per-row (last_updated, price, rank) signatures
+    
+    Prices are compared at the 8 decimal places raw_data keeps, so values
+    read back from Postgres match the float the API returned. Nulls map to
+    fixed sentinels so that an unchanged null compares equal.
+    """
+    updated = np.asarray(last_updated, dtype='datetime64[ns]').astype('int64')
+    price = np.rint(np.asarray(current_price, dtype='float64') * 1e8)
+    rank = np.asarray(market_cap_rank, dtype='float64')
+    return list(zip(updated.tolist(),
+                    np.where(np.isnan(price), -1.0, price).tolist(),
+                    np.where(np.isnan(rank), -1.0, rank).tolist()))
+
+
+class SnapshotChangeDetector:
+    """
+    Drops market snapshot rows for coins that have not changed since their last load
+    
+    CoinGecko refreshes a coin's ``last_updated`` only when its quote moves,
+    so at a one-minute poll most rows repeat the previous snapshot. The
+    detector keeps the (last_updated, current_price, market_cap_rank) of the
+    last row loaded for every coin and lets a row through only when one of
+    them differs. State is updated with ``commit`` after a successful load,
+    so rows from a failed load are offered again on the next poll.
+    """
+    
+    def __init__(self):
+        self._seen: Dict[str, Signature] = {}
+        self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_database(cls, db) -> 'SnapshotChangeDetector':
+        """Detector warmed from analytics.latest_prices"""
+        detector = cls()
+        detector.warm(db.get_latest_prices())
+        return detector
+    
+    def warm(self, latest: pd.DataFrame) -> None:
+        """
+        Seed the state from latest-state rows
+        
+        Args:
+            latest: analytics.latest_prices rows indexed by coin_id (see DatabaseConnection.get_latest_prices)
+        """
+        signatures = _signatures(latest['last_updated'].to_numpy(),
+                                 latest['current_price'].to_numpy(dtype='float64', na_value=np.nan),
+                                 latest['market_cap_rank'].to_numpy(dtype='float64', na_value=np.nan))
+        self._seen.update(zip(latest.index.tolist(), signatures))
+        self.logger.info(f"Change detection warmed with {len(signatures)} coins")
+    
+    def __len__(self) -> int:
+        return len(self._seen)
+    
+    def changed(self, batch: MarketSnapshotBatch) -> MarketSnapshotBatch:
+        """
+        Rows of ``batch`` that differ from the last committed row of their coin
+        
+        Args:
+            batch: Decoded /coins/markets rows
+        
+        Returns:
+            Batch with only new or changed coins (``batch`` itself if every row changed)
+        """
+        signatures = _signatures(batch['last_updated'], batch['current_price'], batch['market_cap_rank'])
+        mask = np.fromiter((self._seen.get(coin_id) != signature
+                            for coin_id, signature in zip(batch.ids, signatures)), dtype=bool, count=len(batch))
+        return batch if mask.all() else batch.take(mask)
+    
+    def commit(self, batch: MarketSnapshotBatch) -> None:
+        """Record ``batch`` as loaded"""
+        signatures = _signatures(batch['last_updated'], batch['current_price'], batch['market_cap_rank'])
+        self._seen.update(zip(batch.ids, signatures))
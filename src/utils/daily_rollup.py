@@ -0,0 +1,246 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .bulk_loader import copy_chunks, prepare_copy_frame
+
+DAILY_PRICES_TABLE = 'staging.daily_prices'
+
+# Columns written to staging.daily_prices (price_change and
+# price_change_percentage are derived from open/close in SQL)
+DAILY_PRICE_COLUMNS: Dict[str, str] = {
+    'coin_id': 'text',
+    'date': 'timestamp',
+    'open_time': 'timestamp',
+    'open_price': 'decimal',
+    'high_price': 'decimal',
+    'low_price': 'decimal',
+    'close_time': 'timestamp',
+    'close_price': 'decimal',
+    'volume': 'bigint',
+    'market_cap': 'bigint',
+}
+
+BAR_COLUMNS = list(DAILY_PRICE_COLUMNS)
+
+NS_PER_DAY = 24 * 3600 * 10 ** 9
+
+# Merge an incoming bar into the stored one. The stored bar may already
+# cover other points of the same day, so open/close are taken from
+# whichever side has the earlier open / later close.
+_OPEN_PRICE = ("CASE WHEN bar.open_time IS NULL OR EXCLUDED.open_time < bar.open_time "
+               "THEN EXCLUDED.open_price ELSE bar.open_price END")
+_TAKES_CLOSE = "bar.close_time IS NULL OR EXCLUDED.close_time >= bar.close_time"
+_CLOSE_PRICE = f"CASE WHEN {_TAKES_CLOSE} THEN EXCLUDED.close_price ELSE bar.close_price END"
+_MERGED = {
+    'open_time': "LEAST(bar.open_time, EXCLUDED.open_time)",
+    'open_price': _OPEN_PRICE,
+    'high_price': "GREATEST(bar.high_price, EXCLUDED.high_price)",
+    'low_price': "LEAST(bar.low_price, EXCLUDED.low_price)",
+    'close_time': "GREATEST(bar.close_time, EXCLUDED.close_time)",
+    'close_price': _CLOSE_PRICE,
+    'volume': f"CASE WHEN {_TAKES_CLOSE} THEN COALESCE(EXCLUDED.volume, bar.volume) ELSE bar.volume END",
+    'market_cap': f"CASE WHEN {_TAKES_CLOSE} THEN COALESCE(EXCLUDED.market_cap, bar.market_cap) ELSE bar.market_cap END",
+    'price_change': f"({_CLOSE_PRICE}) - ({_OPEN_PRICE})",
+    'price_change_percentage': f"""CASE
+                WHEN ({_OPEN_PRICE}) > 0
+                 AND ABS((({_CLOSE_PRICE}) - ({_OPEN_PRICE})) / ({_OPEN_PRICE}) * 100) < 1e6
+                THEN (({_CLOSE_PRICE}) - ({_OPEN_PRICE})) / ({_OPEN_PRICE}) * 100
+                ELSE NULL
+            END""",
+}
+
+MERGE_SQL = f"""
+    INSERT INTO {DAILY_PRICES_TABLE} AS bar (
+        {', '.join(BAR_COLUMNS)}, price_change, price_change_percentage
+    )
+    SELECT
+        {', '.join(BAR_COLUMNS)},
+        close_price - open_price,
+        CASE
+            WHEN open_price > 0 AND ABS((close_price - open_price) / open_price * 100) < 1e6
+            THEN (close_price - open_price) / open_price * 100
+            ELSE NULL
+        END
+    FROM pg_temp.rollup_staging
+    ON CONFLICT (coin_id, date) DO UPDATE SET
+        {', '.join(f'{column} = {expression}' for column, expression in _MERGED.items())}
+    WHERE ({', '.join(f'bar.{column}' for column in BAR_COLUMNS[2:])})
+        IS DISTINCT FROM ({', '.join(_MERGED[column] for column in BAR_COLUMNS[2:])})
+"""
+
+
+def aggregate_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Combine bars (or raw points) into one bar per coin and UTC day
+    
+    A raw point is a bar whose open and close are the same point, so the same
+    reduction serves both rolling up fresh history and folding new bars into
+    pending ones. Open comes from the earliest open_time, close (and the
+    volume/market cap that go with it) from the latest close_time.
+    
+    Args:
+        bars: DataFrame with BAR_COLUMNS except ``date``
+    
+    Returns:
+        DataFrame with BAR_COLUMNS, one row per coin-day
+    """
+    bars = bars[bars['open_price'].notna()]
+    if bars.empty:
+        return pd.DataFrame({column: [] for column in BAR_COLUMNS})
+    
+    codes, coins = pd.factorize(bars['coin_id'])
+    open_time = bars['open_time'].to_numpy('datetime64[ns]').view('int64')
+    close_time = bars['close_time'].to_numpy('datetime64[ns]').view('int64')
+    day = open_time // NS_PER_DAY
+    
+    # Group boundaries over rows sorted by coin, day, open_time
+    order = np.lexsort((open_time, day, codes))
+    group_codes, group_days = codes[order], day[order]
+    starts = np.flatnonzero(np.r_[True, (np.diff(group_codes) != 0) | (np.diff(group_days) != 0)])
+    
+    high = bars['high_price'].to_numpy('float64')[order]
+    low = bars['low_price'].to_numpy('float64')[order]
+    
+    # Latest close per group: sort by close_time within the same groups
+    close_order = np.lexsort((close_time, day, codes))
+    ends = np.r_[starts[1:], len(order)] - 1
+    close_rows = close_order[ends]
+    
+    return pd.DataFrame({
+        'coin_id': coins[group_codes[starts]],
+        'date': (group_days[starts] * NS_PER_DAY).astype('datetime64[ns]'),
+        'open_time': open_time[order][starts].astype('datetime64[ns]'),
+        'open_price': bars['open_price'].to_numpy('float64')[order][starts],
+        'high_price': np.fmax.reduceat(high, starts),
+        'low_price': np.fmin.reduceat(low, starts),
+        'close_time': close_time[close_rows].astype('datetime64[ns]'),
+        'close_price': bars['close_price'].to_numpy('float64')[close_rows],
+        'volume': bars['volume'].to_numpy('float64')[close_rows],
+        'market_cap': bars['market_cap'].to_numpy('float64')[close_rows],
+    })
+
+
+def points_to_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    View flattened historical rows as single-point bars
+    
+    Args:
+        df: DataFrame with coin_id, timestamp, price, market_cap, volume
+    
+    Returns:
+        DataFrame accepted by aggregate_bars
+    """
+    timestamps = pd.to_datetime(df['timestamp'], utc=True).dt.tz_localize(None)
+    prices = pd.to_numeric(df['price'], errors='coerce')
+    return pd.DataFrame({
+        'coin_id': df['coin_id'].to_numpy(),
+        'open_time': timestamps.to_numpy(),
+        'open_price': prices.to_numpy(),
+        'high_price': prices.to_numpy(),
+        'low_price': prices.to_numpy(),
+        'close_time': timestamps.to_numpy(),
+        'close_price': prices.to_numpy(),
+        'volume': pd.to_numeric(df['volume'], errors='coerce').to_numpy(),
+        'market_cap': pd.to_numeric(df['market_cap'], errors='coerce').to_numpy(),
+    })
+
+
+class DailyRollup:
+    """
+    Maintains daily OHLCV bars in staging.daily_prices as history is loaded
+    
+    Points passed to ``update`` are reduced to per coin-day bars with NumPy
+    and folded into the bars pending in memory. ``flush`` merges the pending
+    bars into staging.daily_prices: open_time/close_time are stored with
+    each bar, so a partial day written earlier is extended rather than
+    overwritten, and re-loading the same points leaves the table unchanged.
+    
+    Volume and market cap are the values at the day's close. CoinGecko
+    reports a rolling 24h volume at every point, so summing them would
+    overcount.
+    """
+    
+    def __init__(self, table_name: str = DAILY_PRICES_TABLE):
+        self.table_name = table_name
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pending = pd.DataFrame({column: [] for column in BAR_COLUMNS})
+    
+    @property
+    def pending(self) -> int:
+        """Number of coin-day bars waiting to be flushed"""
+        return len(self._pending)
+    
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Fold flattened historical rows into the pending bars
+        
+        Args:
+            df: DataFrame with coin_id, timestamp, price, market_cap, volume
+        
+        Returns:
+            Number of pending bars after the update
+        """
+        if df.empty:
+            return self.pending
+        
+        bars = aggregate_bars(points_to_bars(df))
+        with self._lock:
+            if not self._pending.empty:
+                bars = aggregate_bars(pd.concat([self._pending, bars], ignore_index=True))
+            self._pending = bars
+            return len(bars)
+    
+    def flush(self, engine) -> int:
+        """
+        Merge pending bars into staging.daily_prices
+        
+        Args:
+            engine: SQLAlchemy engine using the psycopg2 driver
+        
+        Returns:
+            Number of bars inserted or changed
+        """
+        with self._lock:
+            bars, self._pending = self._pending, self._pending.iloc[0:0]
+        
+        if bars.empty:
+            return 0
+        
+        frame = prepare_copy_frame(bars, DAILY_PRICE_COLUMNS)
+        column_list = ', '.join(BAR_COLUMNS)
+        merge_sql = MERGE_SQL.replace(DAILY_PRICES_TABLE, self.table_name, 1)
+        
+        raw_connection = engine.raw_connection()
+        try:
+            with raw_connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE rollup_staging ON COMMIT DROP AS "
+                    f"SELECT {column_list} FROM {self.table_name} WITH NO DATA"
+                )
+                copy_chunks(
+                    cursor, frame,
+                    f"COPY pg_temp.rollup_staging ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '')"
+                )
+                cursor.execute(merge_sql)
+                merged = cursor.rowcount
+            raw_connection.commit()
+        except Exception:
+            raw_connection.rollback()
+            # Keep the bars so the next flush retries them
+            with self._lock:
+                self._pending = aggregate_bars(pd.concat([bars, self._pending], ignore_index=True))
+            raise
+        finally:
+            raw_connection.close()
+        
+        today = np.datetime64(datetime.utcnow().date(), 'ns')
+        partial = int((bars['date'].to_numpy('datetime64[ns]') >= today).sum())
+        self.logger.info(f"Rolled up {len(bars)} daily bars ({len(bars) - partial} finished, "
+                         f"{partial} partial) into {self.table_name}; {merged} changed")
+        return merged
@@ -1,14 +1,24 @@
 import psycopg2
 import pandas as pd
 from sqlalchemy import create_engine, text
-import os
-from typing import List, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 import logging
-from dotenv import load_dotenv
+import numpy as np
 import json
+import threading
+import time
+from datetime import date, datetime, timedelta
 
-# Load environment variables
-load_dotenv()
+from ..config.settings import Settings
+from .bulk_loader import (LATEST_PRICE_COLUMNS, RAW_TABLE_COLUMNS, UPSERT_KEYS, copy_dataframe,
+                          prepare_copy_frame, upsert_dataframe)
+from .daily_rollup import DailyRollup
+from .exchange_rates import RATE_COLUMNS, RATES_TABLE, rates_frame
+from .landing_zone import LANDED_TABLES, LandingZone
+from .market_batch import MarketSnapshotBatch
+from .market_metrics import CONTEXT_DAYS, METRICS_TABLE, compute_market_metrics, write_market_metrics
+from .metrics import metrics
+from .transforms import flatten_historical_data
 
 class DatabaseConnection:
     def __init__(self):
@@ -20,19 +30,46 @@ class DatabaseConnection:
             pool_pre_ping=True
         )
         
+        # Batches at least this large are loaded with COPY instead of INSERT
+        self.bulk_load_threshold = Settings.BULK_LOAD_THRESHOLD
+        
+        # Historical batches are merged on (coin_id, timestamp) by default so
+        # re-extracting overlapping windows doesn't duplicate rows
+        self.historical_load_method = Settings.HISTORICAL_LOAD_METHOD
+        
+        # Monthly partition policy per raw table: (months to keep, months to pre-create)
+        months_ahead = Settings.PARTITION_MONTHS_AHEAD
+        self.partition_policy = {
+            'raw_data.cryptocurrency_data': (Settings.RAW_MARKET_RETENTION_MONTHS, months_ahead),
+            'raw_data.historical_data': (Settings.RAW_HISTORY_RETENTION_MONTHS, months_ahead),
+        }
+        self.partition_detach_only = Settings.PARTITION_DETACH_ONLY
+        
+        # Daily OHLCV bars kept up to date in staging.daily_prices as history loads
+        self.daily_rollup = DailyRollup() if Settings.DAILY_ROLLUP_ENABLED else None
+        
+        # Latest-state reads (get_latest_prices etc.) are cached in-process,
+        # cleared whenever a load commits and otherwise kept for at most
+        # LATEST_CACHE_TTL seconds to pick up loads from other processes
+        self.latest_cache_ttl = Settings.LATEST_CACHE_TTL
+        self._latest_cache = {}
+        self._latest_cache_generation = 0
+        self._latest_cache_lock = threading.Lock()
+        
+        # Raw batches are also written to a Parquet landing zone when
+        # LANDING_ZONE_DIR is set, so raw tables can be rebuilt offline
+        self.landing_zone = LandingZone(Settings.LANDING_ZONE_DIR) if Settings.LANDING_ZONE_DIR else None
+        
+        # Rows per chunk fetched by iter_query's server-side cursors
+        self.query_chunk_size = Settings.QUERY_CHUNK_SIZE
+        
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
     
     def _build_connection_string(self) -> str:
-        """Build PostgreSQL connection string from environment variables"""
-        host = os.getenv('DB_HOST', 'localhost')
-        port = os.getenv('DB_PORT', '5432')
-        database = os.getenv('DB_NAME', 'coingecko_db')
-        username = os.getenv('DB_USER', 'airflow')
-        password = os.getenv('DB_PASSWORD', 'airflow')
-        
-        return f"postgresql://{username}:{password}@{host}:{port}/{database}"
+        """Build PostgreSQL connection string from the settings"""
+        return Settings.get_database_url()
     
     def test_connection(self) -> bool:
         """Test database connection"""
@@ -45,116 +82,505 @@ class DatabaseConnection:
             self.logger.error(f"❌ Database connection failed: {e}")
             return False
     
-    def insert_cryptocurrency_data(self, data: List[Dict], table_name: str = 'raw_data.cryptocurrency_data') -> int:
+    def _load_dataframe(self, df: pd.DataFrame, table_name: str, method: Optional[str] = None) -> int:
+        """
+        Append a DataFrame to a table using COPY or multi-row INSERT
+        
+        Args:
+            df: Rows to load
+            table_name: Target table name with schema
+            method: 'copy', 'insert', 'upsert' (merge on the table's natural key),
+                or None/'auto' to pick COPY for batches of at least
+                ``bulk_load_threshold`` rows into a known raw table
+            
+        Returns:
+            Number of records loaded
+        """
+        column_types = RAW_TABLE_COLUMNS.get(table_name)
+        if method in (None, 'auto'):
+            method = 'copy' if column_types and len(df) >= self.bulk_load_threshold else 'insert'
+        
+        with metrics.timer('db_load_seconds', table=table_name, method=method):
+            loaded = self._load_with(df, table_name, method, column_types)
+        
+        metrics.inc('db_rows_loaded_total', loaded, table=table_name, method=method)
+        return loaded
+    
+    def _load_with(self, df: pd.DataFrame, table_name: str, method: str,
+                   column_types: Optional[Dict[str, str]]) -> int:
+        """Load ``df`` with a resolved method (see _load_dataframe)"""
+        if method == 'upsert':
+            if table_name not in UPSERT_KEYS:
+                raise ValueError(f"No natural key defined for {table_name}; upsert is unavailable")
+            return upsert_dataframe(self.engine, df, table_name)
+        
+        if method == 'copy':
+            if column_types is None:
+                raise ValueError(f"No column type mapping for {table_name}; COPY is unavailable")
+            return copy_dataframe(self.engine, df, table_name, column_types)
+        
+        # Only send columns the table knows about (the API adds extra fields)
+        if column_types:
+            df = df[[column for column in column_types if column in df.columns]]
+        
+        # Split schema and table name
+        schema_table = table_name.split('.')
+        if len(schema_table) == 2:
+            schema, table = schema_table
+        else:
+            schema, table = None, table_name
+        
+        df.to_sql(
+            table,
+            self.engine,
+            schema=schema,
+            if_exists='append',
+            index=False,
+            method='multi'
+        )
+        
+        return len(df)
+    
+    def insert_cryptocurrency_data(self, data: Union[List[Dict], MarketSnapshotBatch],
+                                   table_name: str = 'raw_data.cryptocurrency_data',
+                                   method: Optional[str] = None) -> int:
         """
         Insert cryptocurrency data into PostgreSQL with schema support
         
+        Loads into raw_data.cryptocurrency_data also refresh the per-coin
+        analytics.latest_prices rows and the table's extraction watermark.
+        
         Args:
-            data: List of cryptocurrency data dictionaries
+            data: MarketSnapshotBatch, or list of cryptocurrency data dictionaries
             table_name: Target table name with schema (e.g., 'raw_data.cryptocurrency_data')
+            method: Load path ('copy' or 'insert'); chosen by batch size if None
+            
+        Returns:
+            Number of records inserted
+        """
+        if isinstance(data, MarketSnapshotBatch):
+            return self.insert_cryptocurrency_frame(data.to_frame(), table_name, method)
+        
+        df = pd.DataFrame(data)
+        
+        # Handle JSON columns
+        if 'roi' in df.columns:
+            df['roi'] = df['roi'].apply(lambda x: json.dumps(x) if x else None)
+        
+        return self.insert_cryptocurrency_frame(df, table_name, method)
+    
+    def insert_cryptocurrency_frame(self, df: pd.DataFrame, table_name: str = 'raw_data.cryptocurrency_data',
+                                    method: Optional[str] = None, land: bool = True) -> int:
+        """
+        Insert a market snapshot DataFrame (``roi`` already JSON-encoded)
+        
+        Args:
+            df: Market rows as built by insert_cryptocurrency_data
+            table_name: Target table name with schema
+            method: Load path ('copy' or 'insert'); chosen by batch size if None
+            land: Also write the batch to the landing zone, if one is configured
             
         Returns:
             Number of records inserted
         """
         try:
-            df = pd.DataFrame(data)
+            if land:
+                self._land(df, table_name)
             
-            # Handle JSON columns
-            if 'roi' in df.columns:
-                df['roi'] = df['roi'].apply(lambda x: json.dumps(x) if x else None)
+            records_inserted = self._load_dataframe(df, table_name, method)
             
-            # Split schema and table name
-            schema_table = table_name.split('.')
-            if len(schema_table) == 2:
-                schema, table = schema_table
-            else:
-                schema, table = None, table_name
-            
-            # Insert data using pandas to_sql with schema support
-            records_inserted = df.to_sql(
-                table, 
-                self.engine, 
-                schema=schema,
-                if_exists='append', 
-                index=False,
-                method='multi'
-            )
+            self.logger.info(f"Successfully inserted {records_inserted} records into {table_name}")
+            
+            if table_name == 'raw_data.cryptocurrency_data':
+                self._update_latest_state(df, table_name)
             
-            self.logger.info(f"Successfully inserted {len(df)} records into {table_name}")
-            return len(df)
+            return records_inserted
             
         except Exception as e:
             self.logger.error(f"Error inserting data into {table_name}: {e}")
             raise
     
-    def insert_historical_data(self, data: List[Dict], table_name: str = 'raw_data.historical_data') -> int:
+    def insert_historical_data(self, data: List[Dict], table_name: str = 'raw_data.historical_data',
+                               method: Optional[str] = None) -> int:
         """
         Insert historical price data into PostgreSQL
         
         Args:
             data: List of historical data dictionaries
             table_name: Target table name with schema
+            method: Load path ('upsert', 'copy', 'insert' or 'auto'); defaults
+                to HISTORICAL_LOAD_METHOD ('upsert')
+            
+        Returns:
+            Number of records inserted or updated
+        """
+        return self.insert_historical_frame(flatten_historical_data(data), table_name, method)
+    
+    def insert_historical_frame(self, df: pd.DataFrame, table_name: str = 'raw_data.historical_data',
+                                method: Optional[str] = None, land: bool = True) -> int:
+        """
+        Insert already-flattened historical rows (see flatten_historical_data)
+        
+        Rows loaded into raw_data.historical_data are also rolled up into
+        daily bars in staging.daily_prices (disable with DAILY_ROLLUP_ENABLED=false).
+        
+        Args:
+            df: DataFrame with coin_id, timestamp, price, market_cap, volume, extracted_at
+            table_name: Target table name with schema
+            method: Load path ('upsert', 'copy', 'insert' or 'auto'); defaults
+                to HISTORICAL_LOAD_METHOD ('upsert')
+            land: Also write the batch to the landing zone, if one is configured
+            
+        Returns:
+            Number of records inserted or updated
+        """
+        try:
+            if df.empty:
+                return 0
+            
+            if land:
+                self._land(df, table_name)
+            
+            records_inserted = self._load_dataframe(df, table_name, method or self.historical_load_method)
+            
+            self.logger.info(f"Successfully inserted {records_inserted} historical records into {table_name}")
+            
+            if self.daily_rollup is not None and table_name == 'raw_data.historical_data':
+                with metrics.timer('db_load_seconds', table=self.daily_rollup.table_name, method='rollup'):
+                    self.daily_rollup.update(df)
+                    bars = self.daily_rollup.flush(self.engine)
+                metrics.inc('db_rows_loaded_total', bars, table=self.daily_rollup.table_name, method='rollup')
+            
+            if table_name == 'raw_data.historical_data':
+                self._record_watermark(table_name, df)
+                self.invalidate_latest_cache()
+            
+            return records_inserted
+            
+        except Exception as e:
+            self.logger.error(f"Error inserting historical data: {e}")
+            raise
+    
+    def insert_global_market_data(self, data: Dict, table_name: str = 'raw_data.global_market_data') -> int:
+        """
+        Insert one /global payload (see CoinGeckoExtractor.get_global_market_data)
+        
+        Args:
+            data: Global market data dictionary
+            table_name: Target table name with schema
             
         Returns:
             Number of records inserted
         """
         try:
-            processed_data = []
+            row = {**data.get('data', {}), 'extracted_at': data.get('extracted_at')}
+            df = prepare_copy_frame(pd.DataFrame([row]), RAW_TABLE_COLUMNS[table_name])
             
-            for coin_data in data:
-                coin_id = coin_data['coin_id']
-                extracted_at = coin_data['extracted_at']
-                
-                # Process price data
-                if 'prices' in coin_data:
-                    for timestamp, price in coin_data['prices']:
-                        processed_data.append({
-                            'coin_id': coin_id,
-                            'timestamp': pd.to_datetime(timestamp, unit='ms'),
-                            'price': price,
-                            'market_cap': None,
-                            'volume': None,
-                            'extracted_at': extracted_at
-                        })
-                
-                # Process market cap data
-                if 'market_caps' in coin_data:
-                    for i, (timestamp, market_cap) in enumerate(coin_data['market_caps']):
-                        if i < len(processed_data):
-                            processed_data[i]['market_cap'] = market_cap
-                
-                # Process volume data
-                if 'total_volumes' in coin_data:
-                    for i, (timestamp, volume) in enumerate(coin_data['total_volumes']):
-                        if i < len(processed_data):
-                            processed_data[i]['volume'] = volume
-            
-            if processed_data:
-                df = pd.DataFrame(processed_data)
-                
-                # Split schema and table name
-                schema_table = table_name.split('.')
-                if len(schema_table) == 2:
-                    schema, table = schema_table
-                else:
-                    schema, table = None, table_name
-                
-                records_inserted = df.to_sql(
-                    table,
-                    self.engine,
-                    schema=schema,
-                    if_exists='append',
-                    index=False,
-                    method='multi'
+            records_inserted = self._load_dataframe(df, table_name, 'insert')
+            
+            self.logger.info(f"Successfully inserted {records_inserted} records into {table_name}")
+            return records_inserted
+            
+        except Exception as e:
+            self.logger.error(f"Error inserting data into {table_name}: {e}")
+            raise
+    
+    def insert_exchange_rates(self, data: Dict, table_name: str = RATES_TABLE) -> int:
+        """
+        Merge one /exchange_rates payload (see CoinGeckoExtractor.get_exchange_rates)
+        
+        Rows are keyed on currency and day, so the day's latest fetch replaces
+        earlier ones. The fetch time is recorded as the table's watermark,
+        which ExchangeRateCache reads to decide when to fetch again.
+        
+        Args:
+            data: Exchange rates payload
+            table_name: Target table name with schema
+            
+        Returns:
+            Number of rate rows inserted or changed
+        """
+        try:
+            df = rates_frame(data)
+            records_merged = upsert_dataframe(self.engine, df, table_name, UPSERT_KEYS[RATES_TABLE], RATE_COLUMNS,
+                                              newer_column='extracted_at')
+            self._record_watermark(table_name, df)
+            
+            self.logger.info(f"Merged {len(df)} exchange rates into {table_name} ({records_merged} changed)")
+            return records_merged
+            
+        except Exception as e:
+            self.logger.error(f"Error inserting data into {table_name}: {e}")
+            raise
+            
+        finally:
+            self.invalidate_latest_cache()
+    
+    def _land(self, df: pd.DataFrame, table_name: str) -> None:
+        """
+        Write a raw batch to the landing zone before it is loaded
+        
+        A failed write is logged rather than raised so a full disk doesn't
+        stop ingestion; the batch is still loaded.
+        """
+        if self.landing_zone is None or table_name not in LANDED_TABLES:
+            return
+        
+        try:
+            with metrics.timer('landing_write_seconds', table=table_name):
+                path = self.landing_zone.write(df, table_name)
+            self.logger.debug(f"Landed {len(df)} rows for {table_name} at {path}")
+            
+        except Exception as e:
+            self.logger.error(f"Error writing {table_name} batch to the landing zone: {e}")
+    
+    def replay_landing_zone(self, table_name: str, start: Optional[date] = None, end: Optional[date] = None,
+                            method: Optional[str] = None) -> int:
+        """
+        Load landed Parquet batches into a raw table without calling the API
+        
+        Each landed day is read memory-mapped and loaded in one call, with
+        the same side effects as a live load (daily rollup, latest prices,
+        watermarks). Replaying into emptied tables with ``method='copy'`` is
+        the fastest way to rebuild them. History replays with the default
+        upsert are idempotent; market snapshots are appended, so replay them
+        only over a range that has been emptied.
+        
+        Args:
+            table_name: 'raw_data.cryptocurrency_data' or 'raw_data.historical_data'
+            start: First landed day to replay
+            end: Last landed day to replay
+            method: Load path passed to the loader
+            
+        Returns:
+            Number of records loaded
+        """
+        if self.landing_zone is None:
+            raise ValueError("No landing zone configured; set LANDING_ZONE_DIR")
+        if table_name not in LANDED_TABLES:
+            raise ValueError(f"{table_name} is not kept in the landing zone")
+        
+        loaded = 0
+        for day, df in self.landing_zone.replay(table_name, start, end):
+            if table_name == 'raw_data.historical_data':
+                loaded += self.insert_historical_frame(df, table_name, method, land=False)
+            else:
+                loaded += self.insert_cryptocurrency_frame(df, table_name, method, land=False)
+        
+        self.logger.info(f"Replayed {loaded} records into {table_name} from the landing zone")
+        return loaded
+    
+    def refresh_market_metrics(self, start: Optional[date] = None, table_name: str = METRICS_TABLE) -> int:
+        """
+        Recompute analytics.coin_daily_metrics from staging.daily_prices
+        
+        All coins are read in one query and their rolling windows computed
+        together with NumPy (see compute_market_metrics). Days before
+        ``start`` are read only as window context and not rewritten.
+        
+        Args:
+            start: First day to refresh (all days if None)
+            table_name: Target table name with schema
+            
+        Returns:
+            Number of metric rows inserted or changed
+        """
+        query = "SELECT coin_id, date, close_price, volume, market_cap FROM staging.daily_prices"
+        params = {}
+        if start is not None:
+            query += " WHERE date >= :since"
+            params['since'] = start - timedelta(days=CONTEXT_DAYS)
+        
+        with metrics.timer('db_load_seconds', table=table_name, method='metrics'):
+            prices = self.execute_query(query, params)
+            frame = compute_market_metrics(prices)
+            if start is not None:
+                frame = frame[frame['date'] >= pd.Timestamp(start)]
+            merged = write_market_metrics(self.engine, frame, table_name)
+        metrics.inc('db_rows_loaded_total', merged, table=table_name, method='metrics')
+        
+        self.logger.info(f"Computed {len(frame)} daily metric rows; {merged} changed in {table_name}")
+        return merged
+    
+    def _update_latest_state(self, df: pd.DataFrame, table_name: str) -> None:
+        """
+        Upsert the newest row per coin into analytics.latest_prices and advance
+        the table's extraction watermark
+        
+        The raw rows are already committed at this point; a failure here is
+        logged rather than raised, and the next load brings the latest state
+        up to date again.
+        """
+        try:
+            latest = df.rename(columns={'id': 'coin_id'})
+            with metrics.timer('db_load_seconds', table='analytics.latest_prices', method='upsert'):
+                updated = upsert_dataframe(
+                    self.engine, latest, 'analytics.latest_prices',
+                    column_types=LATEST_PRICE_COLUMNS, newer_column='extracted_at'
                 )
-                
-                self.logger.info(f"Successfully inserted {len(df)} historical records into {table_name}")
-                return len(df)
+            metrics.inc('db_rows_loaded_total', updated, table='analytics.latest_prices', method='upsert')
+            self._record_watermark(table_name, df)
+            self.logger.info(f"Updated {updated} rows in analytics.latest_prices")
             
-            return 0
+        except Exception as e:
+            self.logger.error(f"Error updating latest state from {table_name}: {e}")
+            
+        finally:
+            self.invalidate_latest_cache()
+    
+    def _record_watermark(self, table_name: str, df: pd.DataFrame) -> None:
+        """Advance raw_data.extraction_watermarks to the batch's newest extracted_at"""
+        if 'extracted_at' not in df.columns:
+            return
+        
+        extracted_at = pd.to_datetime(df['extracted_at'], utc=True, errors='coerce', format='ISO8601').max()
+        if pd.isna(extracted_at):
+            return
+        
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("""
+                    INSERT INTO raw_data.extraction_watermarks (table_name, last_extracted_at, updated_at)
+                    VALUES (:table_name, :extracted_at, CURRENT_TIMESTAMP)
+                    ON CONFLICT (table_name) DO UPDATE SET
+                        last_extracted_at = GREATEST(
+                            raw_data.extraction_watermarks.last_extracted_at, EXCLUDED.last_extracted_at
+                        ),
+                        updated_at = CURRENT_TIMESTAMP
+                """),
+                {'table_name': table_name, 'extracted_at': extracted_at.tz_localize(None).to_pydatetime()}
+            )
+    
+    def invalidate_latest_cache(self) -> None:
+        """Drop cached latest-state reads (called after every committed load)"""
+        with self._latest_cache_lock:
+            self._latest_cache.clear()
+            self._latest_cache_generation += 1
+    
+    def _cached_latest(self, key, loader):
+        """Return a cached latest-state read, calling ``loader`` on a miss"""
+        with self._latest_cache_lock:
+            entry = self._latest_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.latest_cache_ttl:
+                return entry[1]
+            generation = self._latest_cache_generation
+        
+        value = loader()
+        
+        # Don't cache a read that raced with a load committing
+        with self._latest_cache_lock:
+            if generation == self._latest_cache_generation:
+                self._latest_cache[key] = (time.monotonic(), value)
+        return value
+    
+    def get_latest_prices(self, coin_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get the most recently extracted market data per coin
+        
+        Args:
+            coin_ids: Restrict to these coins (all coins if None)
+            
+        Returns:
+            DataFrame of analytics.latest_prices rows indexed by coin_id, ordered by rank
+        """
+        def load():
+            return self.execute_query(
+                "SELECT * FROM analytics.latest_prices ORDER BY market_cap_rank NULLS LAST"
+            ).set_index('coin_id')
+        
+        latest = self._cached_latest('latest_prices', load)
+        if coin_ids is None:
+            return latest.copy()
+        return latest[latest.index.isin(coin_ids)].copy()
+    
+    def get_latest_price(self, coin_id: str) -> Optional[Dict]:
+        """
+        Get the most recently extracted market data for one coin
+        
+        Served from the cached get_latest_prices snapshot when present,
+        otherwise a primary-key read of analytics.latest_prices.
+        
+        Args:
+            coin_id: CoinGecko coin ID
+            
+        Returns:
+            Dictionary of the coin's latest values, or None if it was never loaded
+        """
+        with self._latest_cache_lock:
+            entry = self._latest_cache.get('latest_prices')
+            snapshot = entry[1] if entry and time.monotonic() - entry[0] < self.latest_cache_ttl else None
+        
+        if snapshot is not None:
+            if coin_id not in snapshot.index:
+                return None
+            return {'coin_id': coin_id, **snapshot.loc[coin_id].to_dict()}
+        
+        def load():
+            result = self.execute_query(
+                "SELECT * FROM analytics.latest_prices WHERE coin_id = :coin_id", {'coin_id': coin_id}
+            )
+            return result.iloc[0].to_dict() if not result.empty else None
+        
+        return self._cached_latest(('latest_price', coin_id), load)
+    
+    def get_exchange_rates(self, currencies: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get the latest cached exchange rate per currency
+        
+        Args:
+            currencies: Restrict to these currency codes (all cached currencies if None)
+            
+        Returns:
+            DataFrame of analytics.v_exchange_rates rows indexed by currency
+        """
+        def load():
+            return self.execute_query("SELECT * FROM analytics.v_exchange_rates").set_index('currency')
+        
+        rates = self._cached_latest('exchange_rates', load)
+        if currencies is None:
+            return rates.copy()
+        return rates[rates.index.isin(currencies)].copy()
+    
+    def maintain_partitions(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Pre-create upcoming monthly partitions and retire expired ones
+        
+        For each partitioned raw table, partitions are ensured from the start
+        of the retention window through PARTITION_MONTHS_AHEAD months ahead,
+        and partitions entirely older than the retention window are detached
+        (and dropped unless PARTITION_DETACH_ONLY is set). A retention of 0
+        months keeps everything. See sql/init/08_create_partitions.sql.
+        
+        Returns:
+            Mapping of table name to ``created``/``retired`` partition names
+        """
+        report = {}
+        
+        try:
+            with self.engine.begin() as conn:
+                for table_name, (retain_months, months_ahead) in self.partition_policy.items():
+                    months_back = retain_months if retain_months > 0 else 1
+                    ensured = conn.execute(
+                        text("SELECT raw_data.ensure_monthly_partitions(:table_name, :months_back, :months_ahead)"),
+                        {'table_name': table_name, 'months_back': months_back, 'months_ahead': months_ahead}
+                    ).scalars().all()
+                    
+                    retired = []
+                    if retain_months > 0:
+                        retired = conn.execute(
+                            text("SELECT raw_data.drop_expired_partitions(:table_name, :retain_months, :detach_only)"),
+                            {'table_name': table_name, 'retain_months': retain_months,
+                             'detach_only': self.partition_detach_only}
+                        ).scalars().all()
+                    
+                    report[table_name] = {'created': ensured, 'retired': retired}
+                    if retired:
+                        self.logger.info(f"Retired {len(retired)} expired partitions of {table_name}: {retired}")
+            
+            return report
             
         except Exception as e:
-            self.logger.error(f"Error inserting historical data: {e}")
+            self.logger.error(f"Error maintaining partitions: {e}")
             raise
     
     def insert_extraction_log(self, extraction_type: str, status: str, **kwargs) -> None:
@@ -167,78 +593,217 @@ class DatabaseConnection:
             **kwargs: Additional log parameters
         """
         try:
-            log_data = {
-                'extraction_type': extraction_type,
-                'status': status,
-                'records_extracted': kwargs.get('records_extracted'),
-                'records_inserted': kwargs.get('records_inserted'),
-                'error_message': kwargs.get('error_message'),
-                'start_time': kwargs.get('start_time'),
-                'end_time': kwargs.get('end_time'),
-                'duration_seconds': kwargs.get('duration_seconds')
-            }
-            
-            df = pd.DataFrame([log_data])
-            df.to_sql('extraction_log', self.engine, schema='raw_data', if_exists='append', index=False)
-            
+            self.insert_extraction_logs([{'extraction_type': extraction_type, 'status': status, **kwargs}])
             self.logger.info(f"Logged extraction: {extraction_type} - {status}")
             
         except Exception as e:
             self.logger.error(f"Error logging extraction: {e}")
     
+    def insert_extraction_logs(self, entries: List[Dict]) -> int:
+        """
+        Write several extraction_log rows in one statement
+        
+        Args:
+            entries: Dicts with extraction_type, status and optionally
+                records_extracted, records_inserted, error_message,
+                start_time, end_time, duration_seconds
+            
+        Returns:
+            Number of rows written
+        """
+        if not entries:
+            return 0
+        
+        columns = ['extraction_type', 'status', 'records_extracted', 'records_inserted',
+                   'error_message', 'start_time', 'end_time', 'duration_seconds']
+        rows = [{column: entry.get(column) for column in columns} for entry in entries]
+        for row in rows:
+            row['start_time'] = row['start_time'] or datetime.utcnow()
+        
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(f"INSERT INTO raw_data.extraction_log ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(':' + column for column in columns)})"),
+                rows
+            )
+        
+        return len(rows)
+    
     def execute_query(self, query: str, params: Optional[Dict] = None) -> Optional[pd.DataFrame]:
         """
         Execute a SQL query and return results as DataFrame
         
+        Runs in its own transaction, which is committed on success. Any
+        statement that returns rows (SELECT, WITH ..., INSERT ... RETURNING)
+        yields a DataFrame; for large results use iter_query instead.
+        
         Args:
             query: SQL query string
             params: Optional parameters for the query
             
         Returns:
-            Query results as DataFrame or None for non-SELECT queries
+            Query results as DataFrame or None for statements without rows
         """
         try:
-            with self.engine.connect() as conn:
-                if params:
-                    result = conn.execute(text(query), params)
-                else:
-                    result = conn.execute(text(query))
+            with self.engine.begin() as conn:
+                result = conn.execute(text(query), params or {})
                 
-                # If it's a SELECT query, return DataFrame
-                if query.strip().upper().startswith('SELECT'):
-                    return pd.DataFrame(result.fetchall(), columns=result.keys())
+                if result.returns_rows:
+                    return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
                 
-                # For non-SELECT queries, commit and return None
-                conn.commit()
                 return None
                 
         except Exception as e:
             self.logger.error(f"Error executing query: {e}")
             raise
     
+    def iter_query(self, query: str, params: Optional[Dict] = None, chunk_size: Optional[int] = None,
+                   as_numpy: bool = False) -> Iterator[Union[pd.DataFrame, Dict[str, np.ndarray]]]:
+        """
+        Stream the rows of a query in chunks through a server-side cursor
+        
+        The query runs on a named (server-side) psycopg2 cursor, so only one
+        chunk is held in memory at a time regardless of the result size.
+        NUMERIC values are converted to float. The connection stays open
+        until the iterator is exhausted or closed.
+        
+        Args:
+            query: SELECT, WITH ... SELECT or VALUES statement (anything a
+                cursor can be declared for)
+            params: Optional parameters for the query
+            chunk_size: Rows per chunk (defaults to QUERY_CHUNK_SIZE)
+            as_numpy: Yield ``{column: ndarray}`` dicts instead of DataFrames
+            
+        Yields:
+            DataFrames (or dicts of column arrays) of at most ``chunk_size`` rows
+        """
+        chunk_size = chunk_size or self.query_chunk_size
+        
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(
+                text(query), params or {}
+            )
+            columns = list(result.keys())
+            for rows in result.partitions(chunk_size):
+                frame = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+                yield {column: frame[column].to_numpy() for column in columns} if as_numpy else frame
+    
+    def iter_historical_data(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             coin_ids: Optional[List[str]] = None, chunk_size: Optional[int] = None,
+                             as_numpy: bool = False) -> Iterator[Union[pd.DataFrame, Dict[str, np.ndarray]]]:
+        """
+        Stream raw_data.historical_data ordered by coin and timestamp
+        
+        Args:
+            start: Earliest timestamp (inclusive)
+            end: Latest timestamp (exclusive)
+            coin_ids: Restrict to these coins
+            chunk_size: Rows per chunk (defaults to QUERY_CHUNK_SIZE)
+            as_numpy: Yield ``{column: ndarray}`` dicts instead of DataFrames
+            
+        Yields:
+            Chunks with coin_id, timestamp, price, market_cap, volume
+        """
+        conditions: List[str] = []
+        params: Dict[str, Any] = {}
+        if start is not None:
+            conditions.append("timestamp >= :start")
+            params['start'] = start
+        if end is not None:
+            conditions.append("timestamp < :end")
+            params['end'] = end
+        if coin_ids is not None:
+            conditions.append("coin_id = ANY(:coin_ids)")
+            params['coin_ids'] = list(coin_ids)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT coin_id, timestamp, price, market_cap, volume
+            FROM raw_data.historical_data
+            {where}
+            ORDER BY coin_id, timestamp
+        """
+        return self.iter_query(query, params, chunk_size, as_numpy)
+    
     def get_latest_extraction_time(self, table_name: str = 'raw_data.cryptocurrency_data') -> Optional[str]:
         """
         Get the latest extraction timestamp from a table
         
+        Reads the load-time watermark in raw_data.extraction_watermarks, falling
+        back to MAX(extracted_at) for tables without one.
+        
         Args:
             table_name: Name of the table to check (with schema)
             
         Returns:
             Latest extraction timestamp or None
         """
-        try:
-            query = f"SELECT MAX(extracted_at) as latest_time FROM {table_name}"
-            result = self.execute_query(query)
+        def load():
+            result = self.execute_query(
+                "SELECT last_extracted_at as latest_time FROM raw_data.extraction_watermarks "
+                "WHERE table_name = :table_name",
+                {'table_name': table_name}
+            )
+            if result.empty:
+                result = self.execute_query(f"SELECT MAX(extracted_at) as latest_time FROM {table_name}")
             
             if result is not None and not result.empty:
                 return result.iloc[0]['latest_time']
             
             return None
+        
+        try:
+            return self._cached_latest(('extraction_time', table_name), load)
             
         except Exception as e:
             self.logger.error(f"Error getting latest extraction time: {e}")
             return None
     
+    def get_history_watermarks(self, coin_ids: List[str],
+                               table_name: str = 'raw_data.historical_data') -> Dict[str, datetime]:
+        """
+        Get the latest stored timestamp per coin
+        
+        Uses one LATERAL lookup per coin so each probe is a single descent of
+        the (coin_id, timestamp DESC) index rather than a scan of the table.
+        
+        Args:
+            coin_ids: CoinGecko coin IDs to look up
+            table_name: Historical table name with schema
+            
+        Returns:
+            Mapping of coin ID to latest timestamp (coins with no history are omitted)
+        """
+        if not coin_ids:
+            return {}
+        
+        query = f"""
+        SELECT c.coin_id, latest.timestamp as latest_timestamp
+        FROM unnest(CAST(:coin_ids AS VARCHAR[])) AS c(coin_id)
+        CROSS JOIN LATERAL (
+            SELECT h.timestamp
+            FROM {table_name} h
+            WHERE h.coin_id = c.coin_id
+            ORDER BY h.timestamp DESC
+            LIMIT 1
+        ) latest
+        """
+        
+        try:
+            result = self.execute_query(query, {'coin_ids': list(coin_ids)})
+            
+            if result is None or result.empty:
+                return {}
+            
+            return {
+                row.coin_id: row.latest_timestamp.to_pydatetime()
+                for row in result.itertuples(index=False)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error getting history watermarks: {e}")
+            return {}
+    
     def get_table_row_count(self, table_name: str) -> int:
         """
         Get the number of rows in a table
@@ -0,0 +1,142 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+RATES_TABLE = 'raw_data.exchange_rates'
+
+# Columns written to raw_data.exchange_rates
+RATE_COLUMNS: Dict[str, str] = {
+    'currency': 'text',
+    'date': 'timestamp',
+    'name': 'text',
+    'unit': 'text',
+    'rate_type': 'text',
+    'btc_rate': 'decimal',
+    'usd_rate': 'decimal',
+    'extracted_at': 'timestamp',
+}
+
+
+def parse_currencies(value: str) -> List[str]:
+    """Lower-cased currency codes from a comma-separated list, first occurrence kept"""
+    codes = [code.strip().lower() for code in value.split(',') if code.strip()]
+    return list(dict.fromkeys(codes))
+
+
+def rates_frame(data: Dict) -> pd.DataFrame:
+    """
+    Flatten an /exchange_rates payload into raw_data.exchange_rates rows
+    
+    CoinGecko quotes every currency per BTC; ``usd_rate`` re-bases them on
+    USD, the currency all prices are extracted in.
+    
+    Args:
+        data: Payload from CoinGeckoExtractor.get_exchange_rates
+    
+    Returns:
+        DataFrame with RATE_COLUMNS, one row per currency
+    """
+    rates = data.get('rates', {})
+    usd = (rates.get('usd') or {}).get('value')
+    if not usd:
+        raise ValueError("Exchange rates payload has no USD rate")
+    
+    extracted_at = pd.Timestamp(data.get('extracted_at') or datetime.utcnow())
+    frame = pd.DataFrame.from_dict(rates, orient='index').rename(columns={'type': 'rate_type', 'value': 'btc_rate'})
+    frame.index.name = 'currency'
+    frame = frame.reset_index()
+    frame['usd_rate'] = pd.to_numeric(frame['btc_rate'], errors='coerce') / float(usd)
+    frame['date'] = extracted_at.normalize()
+    frame['extracted_at'] = extracted_at
+    return frame.reindex(columns=list(RATE_COLUMNS))
+
+
+def convert_currency(frame: pd.DataFrame, columns: Sequence[str], usd_rates: pd.Series,
+                     currencies: Sequence[str]) -> pd.DataFrame:
+    """
+    Repeat USD rows once per currency with ``columns`` converted
+    
+    All currencies are converted in one broadcast multiply of the
+    (rows x columns) values by the currencies' rates.
+    
+    Args:
+        frame: Rows with USD values
+        columns: Columns holding USD amounts
+        usd_rates: Units per USD indexed by currency (see ExchangeRateCache.rates)
+        currencies: Currency codes to convert to
+    
+    Returns:
+        DataFrame with the rows of ``frame`` for each currency in turn and a
+        ``currency`` column
+    """
+    missing = [currency for currency in currencies if currency not in usd_rates.index]
+    if missing:
+        raise ValueError(f"No cached exchange rate for {', '.join(missing)}")
+    
+    rates = usd_rates.reindex(currencies).to_numpy('float64')
+    values = frame[list(columns)].to_numpy('float64', na_value=np.nan)
+    converted = (rates[:, None, None] * values[None, :, :]).reshape(-1, len(columns))
+    
+    result = frame.iloc[np.tile(np.arange(len(frame)), len(rates))].copy()
+    result[list(columns)] = converted
+    result.insert(0, 'currency', np.repeat(np.asarray(currencies, dtype=object), len(frame)))
+    return result
+
+
+class ExchangeRateCache:
+    """
+    Exchange rates cached in raw_data.exchange_rates with a time-to-live
+    
+    Market and history data are only ever extracted in USD; other reporting
+    currencies are derived from these rates. One /exchange_rates call covers
+    every currency, and it is only made once the stored rates are older than
+    ``ttl`` seconds, so adding a currency costs no extra API calls. The age
+    is read from raw_data.extraction_watermarks, which every process shares.
+    """
+    
+    def __init__(self, db, extractor=None, ttl: float = 3600):
+        self.db = db
+        self.extractor = extractor
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+    
+    def age(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Seconds since the stored rates were fetched, or None if there are none"""
+        fetched_at = self.db.get_latest_extraction_time(RATES_TABLE)
+        if fetched_at is None or pd.isna(fetched_at):
+            return None
+        return ((now or datetime.utcnow()) - pd.Timestamp(fetched_at).to_pydatetime()).total_seconds()
+    
+    def is_stale(self, now: Optional[datetime] = None) -> bool:
+        age = self.age(now)
+        return age is None or age >= self.ttl
+    
+    def refresh(self, force: bool = False) -> int:
+        """
+        Fetch /exchange_rates if the stored rates have expired
+        
+        Args:
+            force: Fetch even if the stored rates are still fresh
+        
+        Returns:
+            Number of rate rows inserted or changed (0 if nothing was fetched)
+        """
+        if not force and not self.is_stale():
+            return 0
+        if self.extractor is None:
+            raise RuntimeError("Exchange rates have expired and no extractor was given to refresh them")
+        
+        return self.db.insert_exchange_rates(self.extractor.get_exchange_rates())
+    
+    def rates(self) -> pd.Series:
+        """Units per USD of every cached currency, refreshed first if expired and an extractor is set"""
+        if self.extractor is not None:
+            self.refresh()
+        return self.db.get_exchange_rates()['usd_rate'].astype('float64')
+    
+    def convert(self, frame: pd.DataFrame, columns: Sequence[str], currencies: Sequence[str]) -> pd.DataFrame:
+        """convert_currency with the cached rates"""
+        return convert_currency(frame, columns, self.rates(), currencies)
@@ -0,0 +1,133 @@
+import logging
+import os
+import uuid
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+# Raw tables whose load batches are kept in the landing zone
+LANDED_TABLES = ('raw_data.cryptocurrency_data', 'raw_data.historical_data')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "The Parquet landing zone needs pyarrow; install it with 'pip install pyarrow' "
+            "or unset LANDING_ZONE_DIR"
+        ) from e
+    return pyarrow, pyarrow.parquet
+
+
+class LandingZone:
+    """
+    Date-partitioned Parquet copy of every raw batch loaded into Postgres
+    
+    Batches are written to ``<root>/<table>/date=YYYY-MM-DD/<time>-<id>.parquet``
+    (partitioned by the UTC day they were landed) before they are loaded,
+    so raw tables can be rebuilt from local files instead of the API.
+    Files are written to a temporary name and renamed into place, so
+    readers never see a partial file. Replay opens them memory-mapped.
+    
+    Requires pyarrow, which is imported when the zone is created.
+    """
+    
+    def __init__(self, root: str, compression: str = 'zstd'):
+        """
+        Args:
+            root: Landing zone directory
+            compression: Parquet codec
+        """
+        self.pa, self.pq = _require_pyarrow()
+        self.root = root
+        self.compression = compression
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(root, exist_ok=True)
+    
+    def _partition_dir(self, table_name: str, day: date) -> str:
+        return os.path.join(self.root, table_name, f"date={day.isoformat()}")
+    
+    def write(self, df: pd.DataFrame, table_name: str, landed_at: Optional[datetime] = None) -> Optional[str]:
+        """
+        Land one batch
+        
+        Args:
+            df: Batch as passed to the loader
+            table_name: Raw table the batch is loaded into
+            landed_at: Partition timestamp (defaults to now, UTC)
+        
+        Returns:
+            Path of the new file, or None for an empty batch
+        """
+        if df.empty:
+            return None
+        
+        landed_at = landed_at or datetime.utcnow()
+        directory = self._partition_dir(table_name, landed_at.date())
+        os.makedirs(directory, exist_ok=True)
+        
+        path = os.path.join(directory, f"{landed_at:%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet")
+        table = self.pa.Table.from_pandas(df, preserve_index=False)
+        self.pq.write_table(table, path + '.tmp', compression=self.compression)
+        os.replace(path + '.tmp', path)
+        
+        return path
+    
+    def partitions(self, table_name: str, start: Optional[date] = None,
+                   end: Optional[date] = None) -> List[Tuple[date, List[str]]]:
+        """
+        List landed files per day
+        
+        Args:
+            table_name: Raw table name
+            start: First day to include
+            end: Last day to include
+        
+        Returns:
+            (day, sorted file paths) pairs in day order
+        """
+        table_dir = os.path.join(self.root, table_name)
+        if not os.path.isdir(table_dir):
+            return []
+        
+        result = []
+        for entry in sorted(os.listdir(table_dir)):
+            if not entry.startswith('date='):
+                continue
+            day = date.fromisoformat(entry[len('date='):])
+            if (start and day < start) or (end and day > end):
+                continue
+            
+            directory = os.path.join(table_dir, entry)
+            files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                           if name.endswith('.parquet'))
+            if files:
+                result.append((day, files))
+        
+        return result
+    
+    def read_day(self, files: List[str]) -> pd.DataFrame:
+        """Read a day's files, memory-mapped, into one DataFrame"""
+        tables = [self.pq.read_table(path, memory_map=True) for path in files]
+        table = self.pa.concat_tables(tables, promote_options='default') if len(tables) > 1 else tables[0]
+        return table.to_pandas()
+    
+    def replay(self, table_name: str, start: Optional[date] = None,
+               end: Optional[date] = None) -> Iterator[Tuple[date, pd.DataFrame]]:
+        """
+        Yield landed batches one day at a time
+        
+        Args:
+            table_name: Raw table name
+            start: First day to replay
+            end: Last day to replay
+        
+        Yields:
+            (day, DataFrame with every batch landed that day)
+        """
+        for day, files in self.partitions(table_name, start, end):
+            self.logger.info(f"Replaying {len(files)} landed files for {table_name} on {day}")
+            yield day, self.read_day(files)
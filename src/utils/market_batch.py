@@ -0,0 +1,124 @@
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .bulk_loader import RAW_TABLE_COLUMNS
+
+MARKET_COLUMNS: Dict[str, str] = RAW_TABLE_COLUMNS['raw_data.cryptocurrency_data']
+
+# NumPy dtype used for each column type; integers stay float64 (NaN for
+# nulls) and are rounded into range by the loader
+COLUMN_DTYPES = {
+    'text': 'object',
+    'json': 'object',
+    'decimal': 'float64',
+    'bigint': 'float64',
+    'integer': 'float64',
+    'timestamp': 'datetime64[ns]',
+}
+
+
+def _parse_timestamps(values: List[Optional[str]]) -> np.ndarray:
+    parsed = pd.to_datetime(pd.Series(values, dtype='object'), utc=True, errors='coerce', format='ISO8601')
+    return parsed.dt.tz_localize(None).to_numpy('datetime64[ns]')
+
+
+class MarketSnapshotBatch:
+    """
+    Struct-of-arrays market snapshot with the columns of raw_data.cryptocurrency_data
+    
+    Built straight from the /coins/markets payload: one typed NumPy array per
+    table column, with timestamps parsed as vectors, numbers as float64 and
+    ``roi`` serialised to JSON once. The source dicts are not modified or
+    kept, and fields the table has no column for are dropped.
+    """
+    
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: Equal-length arrays keyed by MARKET_COLUMNS name
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Column lengths differ: {sorted(lengths)}")
+        self.columns = columns
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Dict], extracted_at: Optional[datetime] = None) -> 'MarketSnapshotBatch':
+        """
+        Decode a /coins/markets page
+        
+        Args:
+            records: Coin dicts as returned by the API
+            extracted_at: Extraction time for every row (defaults to now, UTC)
+        
+        Returns:
+            New batch with one row per record
+        """
+        columns = {}
+        for column, column_type in MARKET_COLUMNS.items():
+            if column == 'extracted_at':
+                continue
+            
+            values = [record.get(column) for record in records]
+            if column_type == 'timestamp':
+                columns[column] = _parse_timestamps(values)
+            elif column_type == 'json':
+                columns[column] = np.array([json.dumps(value) if value else None for value in values], dtype='object')
+            else:
+                columns[column] = np.array(values, dtype=COLUMN_DTYPES[column_type])
+        
+        columns['extracted_at'] = np.full(
+            len(records), np.datetime64(extracted_at or datetime.utcnow(), 'ns'), dtype='datetime64[ns]'
+        )
+        return cls(columns)
+    
+    @classmethod
+    def empty(cls) -> 'MarketSnapshotBatch':
+        return cls({column: np.array([], dtype=COLUMN_DTYPES[column_type])
+                    for column, column_type in MARKET_COLUMNS.items()})
+    
+    @classmethod
+    def concat(cls, batches: Iterable['MarketSnapshotBatch']) -> 'MarketSnapshotBatch':
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        return cls({column: np.concatenate([batch.columns[column] for batch in batches])
+                    for column in batches[0].columns})
+    
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+    
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+    
+    @property
+    def ids(self) -> List[str]:
+        return self.columns['id'].tolist()
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the batch, including string objects"""
+        total = 0
+        for values in self.columns.values():
+            total += values.nbytes
+            if values.dtype == object:
+                total += sum(len(value) + 49 for value in values if isinstance(value, str))
+        return total
+    
+    def take(self, indices) -> 'MarketSnapshotBatch':
+        """Select rows by position or boolean mask"""
+        return MarketSnapshotBatch({column: values[indices] for column, values in self.columns.items()})
+    
+    def sort_by_rank(self) -> 'MarketSnapshotBatch':
+        """Rows ordered by market_cap_rank, unranked coins last"""
+        return self.take(np.argsort(self.columns['market_cap_rank'], kind='stable'))
+    
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view in table column order (columns are not copied)"""
+        return pd.DataFrame(self.columns, copy=False)
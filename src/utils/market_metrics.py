@@ -0,0 +1,139 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .bulk_loader import UPSERT_KEYS, upsert_dataframe
+
+METRICS_TABLE = 'analytics.coin_daily_metrics'
+
+# Columns written to analytics.coin_daily_metrics
+METRIC_COLUMNS: Dict[str, str] = {
+    'coin_id': 'text',
+    'date': 'timestamp',
+    'close_price': 'decimal',
+    'return_1d': 'decimal',
+    'moving_average_7d': 'decimal',
+    'moving_average_30d': 'decimal',
+    'volatility_7d': 'decimal',
+    'volatility_30d': 'decimal',
+    'price_change_percentage_7d': 'decimal',
+    'price_change_percentage_30d': 'decimal',
+    'volume_to_market_cap_ratio': 'decimal',
+}
+
+# Longest lookback of any metric; incremental refreshes read this many
+# earlier days so the windows of the first refreshed day are complete
+CONTEXT_DAYS = 30
+
+# Values at or beyond these magnitudes don't fit the table's DECIMAL(10, 4)
+# and DECIMAL(10, 6) columns and only come from broken quotes
+PERCENT_LIMIT = 1e6
+RATIO_LIMIT = 1e4
+
+
+def _positions(codes: np.ndarray) -> np.ndarray:
+    """Row number of each row within its run of equal ``codes`` (rows sorted by code)"""
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, len(codes)])
+    return np.arange(len(codes)) - np.repeat(starts, lengths)
+
+
+def _lag(values: np.ndarray, positions: np.ndarray, periods: int) -> np.ndarray:
+    """``values`` shifted by ``periods`` rows within each coin (NaN where there is no earlier row)"""
+    lagged = np.full(len(values), np.nan)
+    lagged[periods:] = values[:-periods]
+    lagged[positions < periods] = np.nan
+    return lagged
+
+
+def _rolling(values: np.ndarray, positions: np.ndarray, window: int, reducer) -> np.ndarray:
+    """
+    Reduce each row's trailing ``window`` rows of the same coin
+    
+    Every window is a strided view into ``values``, so all coins are reduced
+    in one call. Windows that would cross into the previous coin, or that
+    contain a NaN, give NaN.
+    """
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        result[window - 1:] = reducer(sliding_window_view(values, window), axis=1)
+    result[positions < window - 1] = np.nan
+    return result
+
+
+def _sample_std(windows: np.ndarray, axis: int) -> np.ndarray:
+    return np.std(windows, axis=axis, ddof=1)
+
+
+def _bounded(values: np.ndarray, limit: float) -> np.ndarray:
+    return np.where(np.abs(values) < limit, values, np.nan)
+
+
+def compute_market_metrics(prices: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rolling metrics for every coin from daily close prices
+    
+    Windows count rows, like the ROWS frames in fact_daily_metrics, so a
+    missing day shortens the calendar span rather than leaving a gap.
+    Returns and price changes are percentages; volatility is the sample
+    standard deviation of the daily returns in the window.
+    
+    Args:
+        prices: staging.daily_prices rows with coin_id, date, close_price,
+            volume and market_cap (any order)
+    
+    Returns:
+        DataFrame with METRIC_COLUMNS, one row per coin-day, sorted by coin and date
+    """
+    if prices.empty:
+        return pd.DataFrame({column: [] for column in METRIC_COLUMNS})
+    
+    codes, coins = pd.factorize(prices['coin_id'])
+    dates = prices['date'].to_numpy('datetime64[ns]')
+    order = np.lexsort((dates, codes))
+    codes, dates = codes[order], dates[order]
+    positions = _positions(codes)
+    
+    close = prices['close_price'].to_numpy('float64', na_value=np.nan)[order]
+    volume = prices['volume'].to_numpy('float64', na_value=np.nan)[order]
+    market_cap = prices['market_cap'].to_numpy('float64', na_value=np.nan)[order]
+    
+    def change(periods: int) -> np.ndarray:
+        previous = _lag(close, positions, periods)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return _bounded(np.where(previous > 0, (close - previous) / previous * 100, np.nan), PERCENT_LIMIT)
+    
+    returns = change(1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = _bounded(np.where(market_cap > 0, volume / market_cap, np.nan), RATIO_LIMIT)
+    
+    return pd.DataFrame({
+        'coin_id': coins[codes],
+        'date': dates,
+        'close_price': close,
+        'return_1d': returns,
+        'moving_average_7d': _rolling(close, positions, 7, np.mean),
+        'moving_average_30d': _rolling(close, positions, 30, np.mean),
+        'volatility_7d': _bounded(_rolling(returns, positions, 7, _sample_std), PERCENT_LIMIT),
+        'volatility_30d': _bounded(_rolling(returns, positions, 30, _sample_std), PERCENT_LIMIT),
+        'price_change_percentage_7d': change(7),
+        'price_change_percentage_30d': change(30),
+        'volume_to_market_cap_ratio': ratio,
+    })
+
+
+def write_market_metrics(engine, metrics_frame: pd.DataFrame, table_name: str = METRICS_TABLE) -> int:
+    """
+    Merge computed metrics into analytics.coin_daily_metrics
+    
+    Args:
+        engine: SQLAlchemy engine using the psycopg2 driver
+        metrics_frame: Output of compute_market_metrics
+        table_name: Target table name with schema
+    
+    Returns:
+        Number of rows inserted or changed
+    """
+    return upsert_dataframe(engine, metrics_frame, table_name, UPSERT_KEYS[METRICS_TABLE], METRIC_COLUMNS)
@@ -0,0 +1,283 @@
+import functools
+import json
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# HELP text for the metrics recorded by the pipeline
+METRIC_HELP = {
+    'coingecko_request_seconds': 'CoinGecko HTTP request latency by endpoint',
+    'coingecko_responses_total': 'CoinGecko HTTP responses by endpoint and status code',
+    'coingecko_retries_total': 'CoinGecko requests retried after HTTP 429',
+    'coingecko_response_bytes_total': 'CoinGecko response body bytes received',
+    'coingecko_cache_total': 'Response cache lookups by result',
+    'extractor_call_seconds': 'CoinGeckoExtractor method duration',
+    'db_load_seconds': 'DatabaseConnection load duration by table and method',
+    'db_rows_loaded_total': 'Rows written by DatabaseConnection loaders',
+    'landing_write_seconds': 'Parquet landing zone write duration by table',
+    'pipeline_run_seconds': 'Pipeline job duration',
+    'pipeline_records_total': 'Records extracted, loaded and skipped as unchanged by pipeline jobs',
+    'scheduler_lag_seconds': 'Delay between a scheduled task becoming due and starting',
+    'scheduler_task_seconds': 'Scheduled task duration',
+    'scheduler_tasks_total': 'Scheduled tasks run by job and status',
+    'scheduler_skipped_total': 'Periodic runs skipped because the previous run was still queued',
+}
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> LabelKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + '}'
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process counters and latency histograms
+    
+    Metrics are identified by name plus labels. Counters only go up;
+    histograms keep cumulative bucket counts, a sum and a count, which is
+    all the Prometheus text format needs and costs O(buckets) memory per
+    series regardless of traffic.
+    """
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[LabelKey, float] = {}
+        self._histograms: Dict[LabelKey, List] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add ``value`` to a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record one duration in a histogram"""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            
+            counts = histogram[0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+    
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Time the enclosed block into histogram ``name`` (also on error)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def timed(self, name: str, **labels) -> Callable:
+        """Decorator timing every call of a function into histogram ``name``"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+    
+    def to_dict(self) -> Dict:
+        """
+        Snapshot of all series
+        
+        Returns:
+            ``{'counters': [...], 'histograms': [...]}`` with one entry per series
+        """
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': count,
+                    'sum': round(total, 6),
+                    'mean': round(total / count, 6) if count else None,
+                    'buckets': dict(zip(map(str, self.buckets), counts)),
+                }
+                for (name, labels), (counts, total, count) in sorted(self._histograms.items())
+            ]
+        return {'counters': counters, 'histograms': histograms}
+    
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+    
+    def to_prometheus(self) -> str:
+        """Render all series in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (list(h[0]), h[1], h[2])) for key, h in self._histograms.items())
+        
+        lines = []
+        described = set()
+        
+        def describe(name: str, kind: str):
+            if name not in described:
+                described.add(name)
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+        
+        for (name, labels), value in counters:
+            describe(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        
+        for (name, labels), (counts, total, count) in histograms:
+            describe(name, 'histogram')
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {bucket_count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry used by the extractor, loaders and pipeline jobs
+metrics = MetricsRegistry()
+
+
+class ExtractionLogWriter:
+    """
+    Writes run summaries to raw_data.extraction_log from a background thread
+    
+    ``submit`` only enqueues, so callers never wait on the database. The
+    writer thread batches whatever has queued up (at most ``batch_size``
+    entries, or after ``flush_interval`` seconds) into a single multi-row
+    insert via ``db.insert_extraction_logs``. ``close`` flushes the rest.
+    """
+    
+    def __init__(self, db, batch_size: int = 50, flush_interval: float = 2.0):
+        """
+        Args:
+            db: DatabaseConnection
+            batch_size: Maximum entries per insert
+            flush_interval: Seconds to wait for more entries before writing
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+        self.written = 0
+        self.dropped = 0
+        
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='extraction-log-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, extraction_type: str, status: str, **kwargs) -> None:
+        """Queue one extraction_log row (same arguments as insert_extraction_log)"""
+        if self._closed.is_set():
+            raise RuntimeError("ExtractionLogWriter is closed")
+        self._queue.put({'extraction_type': extraction_type, 'status': status, **kwargs})
+    
+    def _run(self) -> None:
+        while not (self._closed.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                self.written += self.db.insert_extraction_logs(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                self.logger.error(f"Dropped {len(batch)} extraction log entries: {e}")
+    
+    def close(self, timeout: Optional[float] = 30) -> None:
+        """Write everything queued so far and stop the writer thread"""
+        self._closed.set()
+        self._thread.join(timeout)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+@contextmanager
+def track_run(extraction_type: str, log_writer: Optional[ExtractionLogWriter] = None,
+              registry: Optional[MetricsRegistry] = None) -> Iterator[Dict]:
+    """
+    Time a pipeline job and record its summary
+    
+    The caller fills ``records_extracted`` / ``records_inserted`` (and may
+    set ``status``, e.g. to 'partial') in the yielded dict. On exit the
+    duration and record counts go into the registry and, if a writer is
+    given, a row is queued for extraction_log. A block that raises is
+    logged as 'failed' and the error is re-raised.
+    
+    Args:
+        extraction_type: extraction_log type, e.g. 'market_data' or 'historical'
+        log_writer: Background writer for extraction_log (optional)
+        registry: Metrics registry (defaults to the module registry)
+    """
+    registry = registry or metrics
+    summary = {'records_extracted': 0, 'records_inserted': 0, 'status': 'success'}
+    start_time = datetime.utcnow()
+    started = time.perf_counter()
+    error_message = None
+    
+    try:
+        yield summary
+    except Exception as e:
+        summary['status'], error_message = 'failed', str(e)
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        status = summary['status']
+        
+        registry.observe('pipeline_run_seconds', duration, job=extraction_type, status=status)
+        registry.inc('pipeline_records_total', summary['records_extracted'], job=extraction_type, stage='extracted')
+        registry.inc('pipeline_records_total', summary['records_inserted'], job=extraction_type, stage='loaded')
+        
+        if log_writer is not None:
+            log_writer.submit(
+                extraction_type, status,
+                records_extracted=summary['records_extracted'],
+                records_inserted=summary['records_inserted'],
+                error_message=error_message,
+                start_time=start_time,
+                end_time=datetime.utcnow(),
+                duration_seconds=int(round(duration)),
+            )
@@ -0,0 +1,84 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+HISTORICAL_COLUMNS = ['coin_id', 'timestamp', 'price', 'market_cap', 'volume', 'extracted_at']
+
+
+def _series_array(points) -> np.ndarray:
+    """Convert a list of [timestamp_ms, value] pairs into an (n, 2) float64 array"""
+    if not points:
+        return np.empty((0, 2), dtype='float64')
+    return np.asarray(points, dtype='float64').reshape(-1, 2)
+
+
+def _align_to(timestamps: np.ndarray, points) -> np.ndarray:
+    """
+    Look up a series' values at the given millisecond timestamps
+    
+    Args:
+        timestamps: int64 timestamps to align to
+        points: List of [timestamp_ms, value] pairs
+    
+    Returns:
+        float64 array of values, NaN where the series has no matching timestamp
+    """
+    values = np.full(len(timestamps), np.nan)
+    series = _series_array(points)
+    if not len(series) or not len(timestamps):
+        return values
+    
+    series_ts = series[:, 0].astype('int64')
+    order = np.argsort(series_ts, kind='stable')
+    series_ts = series_ts[order]
+    
+    position = np.searchsorted(series_ts, timestamps)
+    position = np.minimum(position, len(series_ts) - 1)
+    matched = series_ts[position] == timestamps
+    values[matched] = series[order, 1][position[matched]]
+    return values
+
+
+def flatten_historical_data(data: List[Dict]) -> pd.DataFrame:
+    """
+    Flatten market_chart payloads into raw_data.historical_data rows
+    
+    Each coin's ``prices``, ``market_caps`` and ``total_volumes`` arrays are
+    converted to NumPy and joined on their millisecond timestamp, so market cap
+    and volume always land on the matching coin and point in time. Timestamps
+    are converted for the whole batch in one vectorized call.
+    
+    Args:
+        data: List of historical data dictionaries from CoinGeckoExtractor
+    
+    Returns:
+        DataFrame with one row per price point, in HISTORICAL_COLUMNS order
+    """
+    coin_ids, extracted_ats = [], []
+    timestamps, prices, market_caps, volumes = [], [], [], []
+    
+    for coin_data in data:
+        price_series = _series_array(coin_data.get('prices'))
+        if not len(price_series):
+            continue
+        
+        ts = price_series[:, 0].astype('int64')
+        timestamps.append(ts)
+        prices.append(price_series[:, 1])
+        market_caps.append(_align_to(ts, coin_data.get('market_caps')))
+        volumes.append(_align_to(ts, coin_data.get('total_volumes')))
+        coin_ids.append(np.full(len(ts), coin_data['coin_id'], dtype='object'))
+        extracted_ats.append(np.full(len(ts), coin_data['extracted_at'], dtype='object'))
+    
+    if not timestamps:
+        return pd.DataFrame(columns=HISTORICAL_COLUMNS)
+    
+    return pd.DataFrame({
+        'coin_id': np.concatenate(coin_ids),
+        'timestamp': pd.to_datetime(np.concatenate(timestamps), unit='ms'),
+        'price': np.concatenate(prices),
+        'market_cap': np.concatenate(market_caps),
+        'volume': np.concatenate(volumes),
+        'extracted_at': np.concatenate(extracted_ats),
+    })
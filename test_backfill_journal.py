@@ -0,0 +1,90 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from src.pipeline import backfill
+from src.pipeline.backfill import BackfillJournal, plan_units, run_backfill, unit_key
+
+
+def fake_run_unit(unit, interval):
+    return 10
+
+
+def test_plan_units_splits_ranges_per_coin():
+    units = plan_units(['bitcoin', 'ethereum'], datetime(2024, 1, 1), datetime(2024, 1, 11), shard_days=4)
+    
+    assert units == [
+        ('bitcoin', '2024-01-01T00:00:00', '2024-01-05T00:00:00'),
+        ('ethereum', '2024-01-01T00:00:00', '2024-01-05T00:00:00'),
+        ('bitcoin', '2024-01-05T00:00:00', '2024-01-09T00:00:00'),
+        ('ethereum', '2024-01-05T00:00:00', '2024-01-09T00:00:00'),
+        ('bitcoin', '2024-01-09T00:00:00', '2024-01-11T00:00:00'),
+        ('ethereum', '2024-01-09T00:00:00', '2024-01-11T00:00:00'),
+    ]
+
+
+def test_plan_units_edge_cases():
+    start = datetime(2024, 1, 1)
+    
+    assert plan_units(['bitcoin'], start, start) == []
+    assert plan_units(['bitcoin'], start, datetime(2024, 1, 2), shard_days=90) == [
+        ('bitcoin', '2024-01-01T00:00:00', '2024-01-02T00:00:00'),
+    ]
+    with pytest.raises(ValueError):
+        plan_units(['bitcoin'], start, datetime(2024, 1, 2), shard_days=0)
+
+
+def test_journal_replays_events(tmp_path):
+    path = str(tmp_path / 'backfill.jsonl')
+    units = plan_units(['bitcoin', 'ethereum', 'solana'], datetime(2024, 1, 1), datetime(2024, 1, 2))
+    keys = [unit_key(unit) for unit in units]
+    
+    journal = BackfillJournal(path)
+    journal.start(units, start='2024-01-01T00:00:00', end='2024-01-02T00:00:00', shard_days=90, interval=None)
+    journal.record('retry', unit=keys[0], attempt=1, error='timeout')
+    journal.record('done', unit=keys[0], rows=24)
+    journal.record('dead', unit=keys[1], attempt=5, error='HTTP 404')
+    journal.record('retry', unit=keys[2], attempt=1, error='timeout')
+    
+    # A crash mid-write leaves a torn last line
+    with open(path, 'a') as f:
+        f.write('{"event": "done", "unit"')
+    
+    replayed = BackfillJournal(path)
+    assert [tuple(unit) for unit in replayed.plan['units']] == units
+    assert replayed.done == {keys[0]: 24}
+    assert replayed.dead_letter == {keys[1]: 'HTTP 404'}
+    assert replayed.attempts == {keys[0]: 1, keys[1]: 5, keys[2]: 1}
+    
+    replayed.record('requeue', unit=keys[1])
+    assert keys[1] not in BackfillJournal(path).dead_letter
+
+
+def test_resume_skips_completed_units(tmp_path, monkeypatch):
+    monkeypatch.setattr(backfill, '_init_worker', lambda rate_limit_state_file: None)
+    monkeypatch.setattr(backfill, '_run_unit', fake_run_unit)
+    path = str(tmp_path / 'backfill.jsonl')
+    start, end = datetime(2024, 1, 1), datetime(2024, 1, 9)
+    units = plan_units(['bitcoin', 'ethereum'], start, end, shard_days=4)
+    
+    journal = BackfillJournal(path)
+    journal.start(units, start=start.isoformat(), end=end.isoformat(), shard_days=4, interval=None)
+    journal.record('done', unit=unit_key(units[0]), rows=96)
+    journal.record('done', unit=unit_key(units[1]), rows=96)
+    
+    # The stored plan wins over the arguments of the resumed run
+    stats = run_backfill(['dogecoin'], start, end, path, processes=2, shard_days=1)
+    assert stats['units'] == 4
+    assert stats['already_done'] == 2
+    assert stats['completed'] == 2
+    assert stats['rows_loaded'] == 20
+    
+    with open(path) as f:
+        done = [event['unit'] for event in map(json.loads, f) if event['event'] == 'done']
+    assert sorted(done) == sorted(unit_key(unit) for unit in units)
+    
+    # Nothing is left to run a second time
+    stats = run_backfill(['dogecoin'], start, end, path, processes=2)
+    assert stats['already_done'] == 4
+    assert stats['completed'] == 0
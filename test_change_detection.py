@@ -0,0 +1,76 @@
+import pandas as pd
+
+from src.utils.change_detection import SnapshotChangeDetector
+from src.utils.market_batch import MarketSnapshotBatch
+
+
+def coin(coin_id, price, rank, last_updated='2024-05-01T12:00:00.000Z'):
+    return {'id': coin_id, 'symbol': coin_id[:3], 'name': coin_id.title(), 'current_price': price,
+            'market_cap_rank': rank, 'last_updated': last_updated}
+
+
+def snapshot(*records):
+    return MarketSnapshotBatch.from_records(list(records))
+
+
+def test_first_run_passes_every_coin():
+    detector = SnapshotChangeDetector()
+    batch = snapshot(coin('bitcoin', 64000.5, 1), coin('ethereum', 3100.25, 2), coin('stale', None, None))
+    
+    assert len(detector) == 0
+    assert detector.changed(batch) is batch
+
+
+def test_unchanged_coins_are_skipped():
+    detector = SnapshotChangeDetector()
+    detector.commit(snapshot(coin('bitcoin', 64000.5, 1), coin('ethereum', 3100.25, 2), coin('stale', None, None)))
+    
+    changed = detector.changed(snapshot(
+        coin('bitcoin', 64000.5, 1),
+        coin('ethereum', 3100.25, 2),
+        coin('stale', None, None),
+    ))
+    assert len(changed) == 0
+
+
+def test_changed_and_new_coins_pass():
+    detector = SnapshotChangeDetector()
+    detector.commit(snapshot(coin('bitcoin', 64000.5, 1), coin('ethereum', 3100.25, 2),
+                             coin('solana', 150.0, 5), coin('tether', 1.0, 3)))
+    
+    changed = detector.changed(snapshot(
+        coin('bitcoin', 64000.5, 1),
+        coin('ethereum', 3100.26, 2),
+        coin('solana', 150.0, 4),
+        coin('tether', 1.0, 3, last_updated='2024-05-01T12:01:00.000Z'),
+        coin('dogecoin', 0.15, 8),
+    ))
+    assert changed.ids == ['ethereum', 'solana', 'tether', 'dogecoin']
+
+
+def test_state_only_moves_on_commit():
+    detector = SnapshotChangeDetector()
+    detector.commit(snapshot(coin('bitcoin', 64000.5, 1)))
+    moved = snapshot(coin('bitcoin', 64100.0, 1))
+    
+    # Not committed (e.g. the load failed): offered again on the next poll
+    assert len(detector.changed(moved)) == 1
+    assert len(detector.changed(moved)) == 1
+    
+    detector.commit(moved)
+    assert len(detector.changed(moved)) == 0
+
+
+def test_warm_from_latest_prices():
+    latest = pd.DataFrame({
+        'last_updated': pd.to_datetime(['2024-05-01 12:00:00', '2024-05-01 12:00:00']),
+        'current_price': [64000.5, 3100.25],
+        'market_cap_rank': [1, 2],
+    }, index=pd.Index(['bitcoin', 'ethereum'], name='coin_id'))
+    
+    detector = SnapshotChangeDetector()
+    detector.warm(latest)
+    assert len(detector) == 2
+    
+    changed = detector.changed(snapshot(coin('bitcoin', 64000.5, 1), coin('ethereum', 3105.0, 2)))
+    assert changed.ids == ['ethereum']
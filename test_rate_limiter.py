@@ -0,0 +1,99 @@
+from email.utils import parsedate_to_datetime
+
+from src.extractors.rate_limiter import TokenBucketRateLimiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_limiter(calls_per_minute: float, clock: FakeClock, **kwargs) -> TokenBucketRateLimiter:
+    return TokenBucketRateLimiter(calls_per_minute, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_acquire_paces_calls_evenly():
+    clock = FakeClock()
+    limiter = make_limiter(60, clock)
+    
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 1.0
+    assert limiter.acquire() == 1.0
+    
+    # Idle time refills the bucket, but only up to its capacity
+    clock.sleep(10)
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 1.0
+
+
+def test_burst_allows_back_to_back_calls():
+    clock = FakeClock()
+    limiter = make_limiter(60, clock, burst=3)
+    
+    assert [limiter.acquire() for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire() == 1.0
+
+
+def test_throttle_halves_rate_and_blocks_for_retry_after():
+    clock = FakeClock()
+    limiter = make_limiter(120, clock)
+    limiter.acquire()
+    
+    limiter.record_throttled(retry_after=5)
+    assert limiter.current_rate == 60
+    assert limiter.acquire() == 5
+    
+    # Halved rate: one call per second instead of two
+    assert limiter.acquire() == 1.0
+
+
+def test_throttles_in_one_pause_halve_once():
+    clock = FakeClock()
+    limiter = make_limiter(120, clock)
+    
+    limiter.record_throttled(retry_after=5)
+    limiter.record_throttled(retry_after=5)
+    assert limiter.current_rate == 60
+    
+    clock.sleep(5)
+    limiter.record_throttled(retry_after=5)
+    assert limiter.current_rate == 30
+
+
+def test_rate_never_drops_below_minimum_and_recovers():
+    clock = FakeClock()
+    limiter = make_limiter(100, clock, min_calls_per_minute=40)
+    
+    for _ in range(3):
+        limiter.record_throttled(retry_after=0)
+        clock.sleep(1)
+    assert limiter.current_rate == 40
+    
+    limiter.record_success()
+    assert limiter.current_rate == 45
+    for _ in range(20):
+        limiter.record_success()
+    assert limiter.current_rate == 100
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('1.5') == 1.5
+    assert parse_retry_after('-3') == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('soon') is None
+
+
+def test_parse_retry_after_http_date():
+    header = 'Wed, 21 Oct 2015 07:28:00 GMT'
+    sent_at = parsedate_to_datetime(header).timestamp()
+    
+    assert parse_retry_after(header, now=sent_at - 30) == 30
+    assert parse_retry_after(header, now=sent_at + 30) == 0
@@ -0,0 +1,95 @@
+from src.pipeline.scheduler import PRIORITY_HISTORY, PRIORITY_SNAPSHOT, PollingScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def next_due(scheduler: PollingScheduler, name: str) -> float:
+    return min(due for due, _, job in scheduler._timers if job == name)
+
+
+def test_every_reschedules_on_cadence():
+    clock = FakeClock()
+    scheduler = PollingScheduler(clock)
+    runs = []
+    scheduler.every('snapshot', 60, lambda: runs.append(clock()), PRIORITY_SNAPSHOT)
+    scheduler.every('later', 60, lambda: None, run_now=False)
+    
+    assert next_due(scheduler, 'later') == 1060
+    assert scheduler.run_pending()
+    assert runs == [1000]
+    assert next_due(scheduler, 'snapshot') == 1060
+    
+    clock.advance(30)
+    assert not scheduler.run_pending()
+    
+    clock.advance(35)
+    assert scheduler.run_pending()
+    assert runs == [1000, 1065]
+    # The next run stays on the original cadence rather than drifting with the lag
+    assert next_due(scheduler, 'snapshot') == 1120
+
+
+def test_missed_ticks_are_skipped_not_caught_up():
+    clock = FakeClock()
+    scheduler = PollingScheduler(clock)
+    runs = []
+    scheduler.every('snapshot', 60, lambda: runs.append(clock()))
+    assert scheduler.run_pending()
+    
+    # Stalled for three and a half intervals: one run, then back on the cadence
+    clock.advance(210)
+    scheduler._release_due(clock())
+    assert scheduler.pending('snapshot') == 1
+    assert next_due(scheduler, 'snapshot') == 1240
+    
+    assert scheduler.run_pending()
+    assert not scheduler.run_pending()
+    assert runs == [1000, 1210]
+
+
+def test_due_job_is_not_queued_twice():
+    clock = FakeClock()
+    scheduler = PollingScheduler(clock)
+    scheduler.every('snapshot', 60, lambda: None)
+    
+    scheduler._release_due(clock())
+    clock.advance(60)
+    scheduler._release_due(clock())
+    
+    assert scheduler.pending('snapshot') == 1
+    assert next_due(scheduler, 'snapshot') == 1120
+
+
+def test_snapshot_preempts_history_units():
+    clock = FakeClock()
+    scheduler = PollingScheduler(clock)
+    order = []
+    
+    def unit(index):
+        def run():
+            order.append(f'unit-{index}')
+            clock.advance(25)
+        return run
+    
+    def sweep():
+        order.append('sweep')
+        for index in range(4):
+            scheduler.submit('history_sweep', unit(index), PRIORITY_HISTORY)
+    
+    scheduler.every('snapshot', 60, lambda: order.append('snapshot'), PRIORITY_SNAPSHOT, run_now=False)
+    scheduler.every('history_sweep', 3600, sweep, PRIORITY_HISTORY)
+    
+    while scheduler.run_pending():
+        pass
+    
+    # The snapshot comes due during unit-2 and runs before unit-3
+    assert order == ['sweep', 'unit-0', 'unit-1', 'unit-2', 'snapshot', 'unit-3']